@@ -0,0 +1,92 @@
+RECORDS = 'records'
+COLUMNAR = 'columnar'
+
+
+def is_columnar(section):
+  return isinstance(section, dict) and section.get('format') == COLUMNAR
+
+
+def is_records(section):
+  return isinstance(section, list) and all(isinstance(row, dict) for row in section)
+
+
+def encode_columnar(records: list):
+  """
+  Encodes a list of records as a column header plus value arrays. Dict valued
+  columns (stat maps) share one list of category ids per column and store
+  each row as values aligned to it. Must stay in sync with
+  dags/util.py records_to_columnar, which writes the stored sections
+  """
+  columns = []
+  maps = {}
+
+  for row in records:
+    for col, val in row.items():
+      if col not in columns:
+        columns.append(col)
+
+      if isinstance(val, dict):
+        keys = maps.setdefault(col, [])
+        keys.extend([k for k in val.keys() if k not in keys])
+
+  values = []
+  for col in columns:
+    keys = maps.get(col)
+
+    if keys is None:
+      values.append([row.get(col) for row in records])
+    else:
+      values.append([
+        [row[col].get(k) for k in keys] if isinstance(row.get(col), dict) else None
+        for row in records
+      ])
+
+  return {
+    'format': COLUMNAR,
+    'length': len(records),
+    'columns': columns,
+    'values': values,
+    'maps': maps
+  }
+
+
+def decode_columnar(section: dict):
+  """
+  Decodes a columnar section back to records, omitting missing values
+  """
+  records = [{} for _ in range(int(section['length']))]
+  maps = section.get('maps', {})
+
+  for col, col_values in zip(section['columns'], section['values']):
+    keys = maps.get(col)
+
+    for row, val in zip(records, col_values):
+      if val is None:
+        continue
+
+      if keys is None:
+        row[col] = val
+      else:
+        row[col] = {k: v for k, v in zip(keys, val) if v is not None}
+
+  return records
+
+
+def convert_sections(item: dict, section_format: str, skip_fields: list = None):
+  """
+  Converts every section of a league item to the requested format
+  """
+  skip_fields = skip_fields or []
+  converted = {}
+
+  for key, section in item.items():
+    if key not in skip_fields and section_format == COLUMNAR and is_records(section):
+      section = encode_columnar(section)
+    elif key not in skip_fields and section_format == RECORDS and is_columnar(section):
+      section = decode_columnar(section)
+
+    converted[key] = section
+
+  converted['sectionFormat'] = section_format
+
+  return converted
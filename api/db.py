@@ -0,0 +1,157 @@
+import os
+import re
+import weakref
+import psycopg2
+import psycopg2.pool
+from contextlib import contextmanager
+
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+
+DB_CONFIG = {
+    "host": "aws-0-us-east-1.pooler.supabase.com",
+    "port": "5432",
+    "database": "postgres",
+    "user": "postgres.lsygyiijbumuybwyuvrn",
+}
+
+# Hot lookups prepared server side once per connection
+PREPARED_STATEMENTS = [
+    "get_league_info",
+    "update_last_viewed",
+    "update_last_viewed_bulk",
+    "update_last_updated",
+]
+
+BROKEN_CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+param_re = re.compile(r"%\((\w+)\)s")
+
+
+def load_sql_files(sql_dir=SQL_DIR):
+    """
+    Reads every sql file once, keyed by file name without extension
+    """
+    queries = {}
+    for filename in os.listdir(sql_dir):
+        if filename.endswith(".sql"):
+            with open(os.path.join(sql_dir, filename), "r") as f:
+                queries[os.path.splitext(filename)[0]] = f.read()
+
+    return queries
+
+
+def to_prepared(query):
+    """
+    Converts named %(param)s placeholders to positional $n for PREPARE,
+    returning the statement and the ordered parameter names
+    """
+    names = []
+
+    def replace(match):
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    return param_re.sub(replace, query), names
+
+
+SQL = load_sql_files()
+PREPARED = {name: to_prepared(SQL[name]) for name in PREPARED_STATEMENTS if name in SQL}
+
+pool = None
+
+# Statements prepared on each connection, entries go away with the connection
+# so a new one reusing a freed address is never assumed prepared
+prepared_conns = weakref.WeakKeyDictionary()
+
+
+def init_pool(password, minconn=1, maxconn=2):
+    global pool
+
+    if pool is None:
+        pool = psycopg2.pool.SimpleConnectionPool(minconn, maxconn, password=password, **DB_CONFIG)
+
+    return pool
+
+
+def release(conn, broken=False):
+    if broken or conn.closed:
+        prepared_conns.pop(conn, None)
+        pool.putconn(conn, close=True)
+    else:
+        pool.putconn(conn)
+
+
+def prepare(conn, cursor, name):
+    prepared = prepared_conns.setdefault(conn, set())
+
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {PREPARED[name][0]}")
+        prepared.add(name)
+
+
+def execute(name, params=None, fetch=False, retries=1):
+    """
+    Runs a named sql file in its own transaction, using the server side
+    prepared statement when available. Connections dropped by the pooler
+    are discarded and the statement retried on a fresh one
+    """
+    params = params or {}
+
+    for attempt in range(retries + 1):
+        conn = pool.getconn()
+
+        try:
+            with conn.cursor() as cursor:
+                if name in PREPARED:
+                    prepare(conn, cursor, name)
+                    names = PREPARED[name][1]
+                    placeholders = ", ".join(["%s"] * len(names))
+
+                    cursor.execute(f"EXECUTE {name} ({placeholders})", [params[n] for n in names])
+                else:
+                    cursor.execute(SQL[name], params)
+
+                res = cursor.fetchall() if fetch else cursor.rowcount
+
+            conn.commit()
+            release(conn)
+
+            return res
+        except BROKEN_CONNECTION_ERRORS as e:
+            print(f"Database connection broken, attempt {attempt + 1}: {e}")
+            release(conn, broken=True)
+
+            if attempt == retries:
+                raise
+        except Exception:
+            conn.rollback()
+            release(conn)
+            raise
+
+
+@contextmanager
+def transaction():
+    """
+    Yields a cursor for multiple statements committed together
+    """
+    conn = pool.getconn()
+
+    if conn.closed:
+        release(conn, broken=True)
+        conn = pool.getconn()
+
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+        conn.commit()
+        release(conn)
+    except BROKEN_CONNECTION_ERRORS:
+        release(conn, broken=True)
+        raise
+    except Exception:
+        conn.rollback()
+        release(conn)
+        raise
@@ -14,6 +14,9 @@ def get_current_espn_league_year():
     return league_year
 
 def get_espn_league_status(league_id, cookies):
+    """
+    Status of a league in the current season, and that season
+    """
     league_year = get_current_espn_league_year()
 
     url = base_url.format(league_year, league_id)
@@ -21,7 +24,7 @@ def get_espn_league_status(league_id, cookies):
     res = requests.get(url, cookies=cookies)
 
     if res.status_code == 200:
-        return "VALID"
+        return "VALID", league_year
     else:
         data = res.json()
         if data.get("details"):
@@ -29,4 +32,4 @@ def get_espn_league_status(league_id, cookies):
         else:
             status = "INVALID_LEAGUE_ID"
 
-    return status
\ No newline at end of file
+    return status, league_year
\ No newline at end of file
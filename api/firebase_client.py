@@ -0,0 +1,45 @@
+import os
+import json
+from google.oauth2 import service_account
+from google.auth.transport.requests import AuthorizedSession
+
+
+SCOPES = [
+  "https://www.googleapis.com/auth/userinfo.email",
+  "https://www.googleapis.com/auth/firebase.database"
+]
+
+authed_session = None
+
+
+def get_authed_session():
+  """
+  Builds the firebase session once per container, the access token is
+  reused and refreshed by the session only when expired
+  """
+  global authed_session
+
+  if authed_session is None:
+    auth_json = json.loads(os.environ['google_auth_json'])
+    credentials = service_account.Credentials.from_service_account_info(auth_json, scopes=SCOPES)
+    authed_session = AuthorizedSession(credentials)
+
+  return authed_session
+
+
+def patch_firebase(url, payload):
+  r = get_authed_session().patch(url, data=json.dumps(payload))
+
+  if r.status_code == 200:
+    print("Data successfully sent to firebase")
+  else:
+    print(r.status_code, r.text)
+
+  return r.status_code == 200
+
+
+def patch_firebase_paths(root_url, updates):
+  """
+  Multi-path update, keys of updates are paths relative to root_url
+  """
+  return patch_firebase(f"{root_url.rstrip('/')}.json", updates)
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+
+
+# Entries younger than the ttl are served without checking dynamodb
+CACHE_TTL_SECONDS = 60
+CACHE_MAX_ENTRIES = 32
+
+league_cache = OrderedDict()
+
+
+def get_cached_league(key, validate_fn):
+  """
+  Returns a cached league item, after the ttl the entry is only reused if
+  validate_fn returns the same updatedAt it was cached with
+  """
+  entry = league_cache.get(key)
+  if entry is None:
+    return None
+
+  if time.time() - entry['cachedAt'] >= CACHE_TTL_SECONDS:
+    if validate_fn() != entry['updatedAt']:
+      league_cache.pop(key, None)
+      return None
+
+    entry['cachedAt'] = time.time()
+
+  league_cache.move_to_end(key)
+
+  return entry
+
+
+def set_cached_league(key, item, sections=None):
+  """
+  Caches a league item, sections is None for a full item or the set of
+  sections that were fetched (present or not) for a projected item
+  """
+  entry = {
+    'item': item,
+    'updatedAt': item.get('updatedAt'),
+    'sections': None if sections is None else set(sections),
+    'cachedAt': time.time(),
+    'bodies': {}
+  }
+
+  league_cache[key] = entry
+  league_cache.move_to_end(key)
+
+  while len(league_cache) > CACHE_MAX_ENTRIES:
+    league_cache.popitem(last=False)
+
+  return entry
+
+
+def get_uncached_sections(entry, sections=None):
+  """
+  Sections still to be fetched for an entry, None meaning the full item
+  """
+  if entry['sections'] is None:
+    return []
+  if sections is None:
+    return None
+
+  return [s for s in sections if s not in entry['sections']]
+
+
+def merge_cached_league(entry, item, sections):
+  entry['item'].update(item)
+  entry['sections'].update(sections)
+  entry['bodies'] = {}
+
+  return entry
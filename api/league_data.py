@@ -1,14 +1,122 @@
 import json
+import time
 import boto3
 from decimal import Decimal
 
-from util import invoke_lambda
+from util import invoke_lambda_async
+from columnar import (
+  RECORDS,
+  COLUMNAR,
+  convert_sections
+)
+from league_cache import (
+  get_cached_league,
+  set_cached_league,
+  get_uncached_sections,
+  merge_cached_league
+)
 
 
 dynamodb_table_name = 'fantasyLeagueData'
 
 lambda_client = boto3.client('lambda', region_name='us-east-1')
 
+# Reused across invocations of a warm container
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table(dynamodb_table_name)
+
+# Returned with every projected read
+BASE_FIELDS = ['leagueId', 'leagueYear', 'updatedAt', 'platform', 'allLeagueKeys', 'sectionFormat']
+
+# Repeat views are aggregated per warm container and flushed in one async
+# invoke, a league's first view in a container is always written at once
+VIEW_FLUSH_INTERVAL_SECONDS = 60
+VIEW_FLUSH_MAX_PENDING = 50
+
+pending_views = {}
+flushed_leagues = set()
+last_view_flush = time.time()
+
+
+def record_league_view(league_id):
+  """
+  Counts a league view in memory, flushing to the bookkeeping lambda for a
+  league not yet written by this container, or once enough time has passed
+  or enough views have accumulated. A container going cold never holds the
+  only view of a league, so lastviewed keeps it in the refresh query
+  """
+  pending_views[league_id] = pending_views.get(league_id, 0) + 1
+
+  is_new = league_id not in flushed_leagues
+  is_stale = time.time() - last_view_flush >= VIEW_FLUSH_INTERVAL_SECONDS
+  is_full = sum(pending_views.values()) >= VIEW_FLUSH_MAX_PENDING
+
+  if is_new or is_stale or is_full:
+    flush_league_views()
+
+
+def flush_league_views():
+  global last_view_flush
+
+  if not pending_views:
+    return
+
+  payload = {
+    "queryStringParameters": {
+      "method": 'lastViewedBulk',
+      "views": dict(pending_views)
+    }
+  }
+
+  try:
+    if invoke_lambda_async(lambda_client, "update_league_info", payload):
+      flushed_leagues.update(pending_views.keys())
+      pending_views.clear()
+      last_view_flush = time.time()
+  except Exception as e:
+    print("Error flushing league views:", e)
+
+
+def parse_sections(sections):
+  """
+  Parses the comma separated sections parameter, None requests the full item
+  """
+  if not sections:
+    return None
+
+  sections = [s.strip() for s in sections.split(',') if s.strip()]
+  return sorted(set(sections) - set(BASE_FIELDS)) or None
+
+
+def fetch_league_item(key, sections=None):
+  """
+  Gets the league item from dynamodb, projected to the sections if given
+  """
+  if sections is None:
+    return table.get_item(Key=key).get('Item')
+
+  fields = BASE_FIELDS + sections
+  names = {f'#f{i}': field for i, field in enumerate(fields)}
+
+  res = table.get_item(
+    Key=key,
+    ProjectionExpression=', '.join(names.keys()),
+    ExpressionAttributeNames=names
+  )
+
+  return res.get('Item')
+
+
+def project_league_item(item, sections=None):
+  if sections is None:
+    return item
+
+  body = {k: item[k] for k in BASE_FIELDS + sections if k in item}
+  body['missingSections'] = [s for s in sections if s not in item]
+
+  return body
+
+
 def get_league_data_from_ddb(event, context):
   print(event)
 
@@ -17,32 +125,50 @@ def get_league_data_from_ddb(event, context):
   league_year = int(event["queryStringParameters"]['leagueYear'])
   
   get_league_id = '48375511' if league_id == '00000001' else league_id
-  
-  dynamodb = boto3.resource('dynamodb')
-  
-  table = dynamodb.Table(dynamodb_table_name)
-  
-  # Getting item from dynamoDB
-  item = table.get_item(Key={"leagueId": get_league_id, "leagueYear": league_year})
-
-  statusCode = 400
-  body = None
-  if 'Item' in item:
-    statusCode = 200
-    body = item['Item']
-      
-  # Run update last viewed lambda
-  if statusCode == 200:
-    payload = {
-      "queryStringParameters": {
-        "leagueId": league_id,
-        "method": 'lastViewed'  
-      }
-    }
+  key = {"leagueId": get_league_id, "leagueYear": league_year}
 
-    invoke_lambda(lambda_client, "update_league_info", payload)
-      
-  return body
+  def get_updated_at():
+    res = table.get_item(Key=key, ProjectionExpression='updatedAt')
+    return res.get('Item', {}).get('updatedAt')
+
+  sections = parse_sections(event["queryStringParameters"].get('sections'))
+  cache_key = (get_league_id, league_year)
+
+  # Serving from memory while the stored item is unchanged
+  entry = get_cached_league(cache_key, get_updated_at)
+  uncached = None if entry is None else get_uncached_sections(entry, sections)
+
+  if entry is None or uncached is None or uncached:
+    item = fetch_league_item(key, uncached or sections)
+
+    if item is None:
+      return None
+
+    if entry is not None and uncached and item.get('updatedAt') == entry['updatedAt']:
+      entry = merge_cached_league(entry, item, uncached)
+    elif entry is not None and uncached:
+      # Stored item changed since caching, refetching all requested sections
+      entry = set_cached_league(cache_key, fetch_league_item(key, sections) or item, sections)
+    else:
+      entry = set_cached_league(cache_key, item, sections)
+
+  # Record view, written to the db asynchronously in batches
+  record_league_view(league_id)
+
+  # Sections converted when stored in a different format than requested
+  section_format = event["queryStringParameters"].get('format') or RECORDS
+  section_format = COLUMNAR if section_format == COLUMNAR else RECORDS
+
+  body_key = ('body', section_format, tuple(sections or []))
+  if body_key not in entry['bodies']:
+    body = project_league_item(entry['item'], sections)
+
+    if body.get('sectionFormat', RECORDS) != section_format:
+      body = convert_sections(body, section_format, BASE_FIELDS + ['missingSections'])
+
+    entry['bodies'][body_key] = body
+
+  return entry['bodies'][body_key]
 
 
 def put_league_data_to_ddb(event, context):
@@ -60,9 +186,6 @@ def put_league_data_to_ddb(event, context):
       'statusCode': 500
     }
 
-  dynamodb = boto3.resource('dynamodb')
-  table = dynamodb.Table(dynamodb_table_name)
-
   response = table.put_item(
     Item=payload
   )
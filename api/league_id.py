@@ -1,9 +1,9 @@
 import json
 import boto3
-import psycopg2
 import psycopg2.extras
 
-from util import invoke_lambda
+import db
+from util import invoke_lambda, invoke_lambda_async
 from espn_helper import get_espn_league_status
 from yahoo_auth import get_yahoo_access_token
 from yahoo_helper import get_all_league_ids
@@ -13,30 +13,24 @@ lambda_client = boto3.client('lambda', region_name='us-east-1')
 
 db_pass = invoke_lambda(lambda_client, 'get_secret', {'key': 'supabase_password'})
 
-conn = psycopg2.connect(
-    host='aws-0-us-east-1.pooler.supabase.com',
-    port='5432',
-    database='postgres',
-    user='postgres.lsygyiijbumuybwyuvrn',
-    password=db_pass
-)
+db.init_pool(db_pass)
 
 
 def get_league_id_status(event, context):
     print(event)
-    
-    cursor = conn.cursor()
 
     league_id = event["queryStringParameters"]['leagueId']
     platform = event["queryStringParameters"]["platform"]
     league_auth_code = event["queryStringParameters"]["leagueAuthCode"]
 
-    get_query = open("sql/get_league_info.sql", "r").read()
-    get_params = {"league_id_re": f"(?<![0-9]){league_id}(?![0-9])"}
-
-    cursor.execute(get_query, get_params)
+    # Short id matches ESPN ids and Yahoo key suffixes, full Yahoo keys match exactly
+    is_full_key = ".l." in league_id
+    get_params = {
+        "short_id": None if is_full_key else league_id,
+        "league_id": league_id,
+    }
 
-    res = cursor.fetchall()
+    res = db.execute("get_league_info", get_params, fetch=True)
 
     if len(res) > 1:
         print("Yahoo and ESPN league found")
@@ -62,12 +56,14 @@ def get_league_id_status(event, context):
     if platform == "espn":
         cookies = {"espn_s2": league_auth_code}
 
-        status = get_espn_league_status(league_id, cookies)
+        # The season validated here names the history job, no extra request after processing
+        status, league_year = get_espn_league_status(league_id, cookies)
         if status != "VALID":
             print(f"Invalid league, status: {status}")
             return {"statusCode": 200, "body": json.dumps(status)}
 
         event["queryStringParameters"]['cookieEspnS2'] = league_auth_code
+        event["queryStringParameters"]['processOnlyCurrent'] = True
         
         try:
             res = invoke_lambda(lambda_client, "process_espn_league", event)
@@ -76,16 +72,18 @@ def get_league_id_status(event, context):
                 print("ERROR: Process ESPN lambda failed")
                 raise Exception
 
-            sql_file = "sql/update_espn_league_after_process.sql"
-            update_query = open(sql_file, "r").read()
             update_params["cookie_espn"] = league_auth_code
 
-            cursor.execute(update_query, update_params)
-            conn.commit()            
+            db.execute("update_espn_league_after_process", update_params)
         except Exception:
             print("Error processing ESPN league")
             return {"statusCode": 200, "body": json.dumps("ERROR")}
 
+        # Previous seasons are processed after returning, once per current season
+        # so the seasons added by a new year are backfilled again
+        history_params = dict(event["queryStringParameters"], processOnlyCurrent=False, processOnlyHistory=True)
+        enqueue_backfill("espn", league_id, [(f"espn:{league_id}:{league_year}:history", history_params)])
+
         print("League processed, returning active")
         return {"statusCode": 200, "body": json.dumps(f"ACTIVE:{league_id}")}        
     
@@ -112,34 +110,43 @@ def get_league_id_status(event, context):
         if ".l." not in full_league_id:
             full_league_id = main_league_id
         
-        sql_file = "sql/update_yahoo_league_after_process.sql"
-        update_query = open(sql_file, "r").read()
         update_params["league_id"] = full_league_id
         update_params["yahoo_refresh_token"] = yahoo_refresh_token
 
-        sql_file_linked = "sql/update_yahoo_linked_leagues.sql"
-        update_query_linked = open(sql_file_linked, "r").read()
-        update_data = []
-
+        # Only the requested league is processed before returning, linked leagues are backfilled.
+        # Access tokens expire within the hour, so jobs carry the refresh token and get a new
+        # access token when they are claimed
+        league_jobs = []
         for league in all_leagues:
-            event["queryStringParameters"]["leagueId"] = league[0]
-            event["queryStringParameters"]["leagueYear"] = league[1]
-            event["queryStringParameters"]["allLeagueKeys"] = all_leagues
+            league_params = dict(
+                event["queryStringParameters"],
+                leagueId=league[0],
+                leagueYear=league[1],
+                allLeagueKeys=all_leagues
+            )
+
+            if league[0] != full_league_id:
+                job_params = dict(league_params, yahooRefreshToken=yahoo_refresh_token)
+                job_params.pop("yahooAccessToken")
+
+                league_jobs.append((f"yahoo:{league[0]}:{league[1]}", job_params))
+                continue
 
             try:
-                res = invoke_lambda(lambda_client, "process_yahoo_league", event)
+                res = invoke_lambda(lambda_client, "process_yahoo_league", {"queryStringParameters": league_params})
 
                 if not res:
                     print("ERROR: Process Yahoo lambda failed")
                     raise Exception
-                else:
-                    update_data.append((league[0], main_league_id))
             except Exception as e:
                 print("Error processing Yahoo league:", e)
+                return {"statusCode": 200, "body": json.dumps("ERROR")}
+
+        with db.transaction() as cursor:
+            cursor.execute(db.SQL["update_yahoo_league_after_process"], update_params)
+            psycopg2.extras.execute_values(cursor, db.SQL["update_yahoo_linked_leagues"], [(full_league_id, main_league_id)])
 
-        cursor.execute(update_query, update_params)
-        psycopg2.extras.execute_values(cursor, update_query_linked, update_data)
-        conn.commit()
+        enqueue_backfill("yahoo", main_league_id, league_jobs)
         
         print("League processed, returning active")
         return {"statusCode": 200, "body": json.dumps(f"ACTIVE:{full_league_id}")}       
@@ -148,46 +155,115 @@ def get_league_id_status(event, context):
     return {"statusCode": 200, "body": json.dumps("ERROR")}
 
 
-sql_last_viewed = """
-    UPDATE public.leagueids
-    SET lastViewed = NOW(), viewCount = viewCount + 1
-    WHERE leagueid = %s
-"""
+def enqueue_backfill(platform, main_league_id, jobs):
+    """
+    Records backfill jobs and hands them to the async backfill lambda, jobs
+    already recorded keep their state so finished ones are never rerun
+    """
+    if not jobs:
+        return
+
+    with db.transaction() as cursor:
+        job_rows = [(job_id, main_league_id, platform) for job_id, _ in jobs]
+        psycopg2.extras.execute_values(cursor, db.SQL["enqueue_backfill_jobs"], job_rows)
+
+    payload = {
+        "platform": platform,
+        "mainLeagueId": main_league_id,
+        "jobs": [{"jobId": job_id, "queryStringParameters": params} for job_id, params in jobs]
+    }
+
+    if not invoke_lambda_async(lambda_client, "process_onboarding_backfill", payload):
+        print(f"Error queueing backfill for {main_league_id}, jobs stay pending")
+
+
+def process_onboarding_backfill(event, context):
+    """
+    Processes historical seasons and linked leagues after onboarding. Each job
+    is claimed before running, so async retries skip finished or running jobs
+    """
+    platform = event["platform"]
+    main_league_id = event["mainLeagueId"]
+    function_name = "process_espn_league" if platform == "espn" else "process_yahoo_league"
+
+    # Yahoo access tokens are minted from the job's refresh token once claimed
+    access_tokens = {}
+
+    num_failed = 0
+    for job in event["jobs"]:
+        job_id = job["jobId"]
+        params = job["queryStringParameters"]
+
+        if db.execute("claim_backfill_job", {"job_id": job_id}) <= 0:
+            print(f"Backfill job {job_id} already done or running, skipping")
+            continue
+
+        refresh_token = params.get("yahooRefreshToken")
+
+        if refresh_token:
+            if refresh_token not in access_tokens:
+                tokens = get_yahoo_access_token(refresh_token)
+                access_tokens[refresh_token] = tokens.get("yahoo_access_token")
+
+                if tokens.get("error"):
+                    print(f"Error auth with yahoo for backfill job {job_id}: {tokens['error']}")
+
+            params = dict(params, yahooAccessToken=access_tokens[refresh_token])
+
+        res = None
+        if platform == "espn" or params.get("yahooAccessToken"):
+            res = invoke_lambda(lambda_client, function_name, {"queryStringParameters": params})
+
+        if res and platform == "yahoo":
+            league_key = job["queryStringParameters"]["leagueId"]
+            with db.transaction() as cursor:
+                psycopg2.extras.execute_values(cursor, db.SQL["update_yahoo_linked_leagues"], [(league_key, main_league_id)])
+
+        status = "DONE" if res else "FAILED"
+        db.execute("finish_backfill_job", {"job_id": job_id, "status": status})
+
+        if not res:
+            num_failed += 1
+            print(f"Backfill job {job_id} failed")
+
+    print(f"Backfill complete, {num_failed}/{len(event['jobs'])} failed...")
+
+    # Raising lets lambda retry the async invoke, finished jobs are skipped
+    if num_failed:
+        raise Exception(f"{num_failed} backfill jobs failed")
+
+    return {"statusCode": 200, "body": json.dumps("Success")}
+
+
+# Bookkeeping methods mapped to their sql files
+update_methods = {
+    'lastViewed': 'update_last_viewed',
+    'lastViewedBulk': 'update_last_viewed_bulk',
+    'lastUpdated': 'update_last_updated',
+}
 
-sql_last_updated = """
-    UPDATE public.leagueids
-    SET lastUpdated = NOW()
-    WHERE leagueid = %s
-"""
 
 def update_league_info(event, context):
     print(event)
-    league_id = event['queryStringParameters'].get('leagueId')
-    method = event['queryStringParameters'].get('method')
-    
-    cursor = conn.cursor()
-    
-    if method == 'lastViewed':
-        params = (league_id,)
-        
-        cursor.execute(sql_last_viewed, params)
-        
-    elif method == 'lastUpdated':
-        params = (league_id,)
-        
-        cursor.execute(sql_last_updated, params)
-        
-        
-    rows_updated = cursor.rowcount
-    
-    if rows_updated > 0:
-        conn.commit()
-    else:
+    params = event['queryStringParameters']
+    method = params.get('method')
+
+    views = params.get('views', {})
+    update_params = {
+        'league_id': params.get('leagueId'),
+        'league_ids': list(params.get('leagueIds', views.keys())),
+        'views': list(views.values()),
+    }
+
+    rows_updated = 0
+    if method in update_methods:
+        rows_updated = db.execute(update_methods[method], update_params)
+
+    if rows_updated <= 0:
         return {
             'statusCode': 500,
             'body': json.dumps('Updated failed') 
         }
-            
 
     return {
         'statusCode': 200,
@@ -1,9 +1,7 @@
-import os
 import json
-from google.oauth2 import service_account
-from google.auth.transport.requests import AuthorizedSession
 
 from util import get_current_espn_league_year
+from firebase_client import patch_firebase_paths
 
 
 LEAGUE_YEAR = get_current_espn_league_year()
@@ -14,30 +12,12 @@ def post_chat_message_to_firebase(event, context):
   print(event)
 
   payload = json.loads(event["body"])
-  date = payload["date"]
-  time = payload["time"]
 
-  auth_file_path = '/tmp/auth.json'
-  auth_json = json.loads(os.environ['google_auth_json'])
+  # Single message or a list of messages written in one request
+  messages = payload if isinstance(payload, list) else [payload]
 
-  with open(auth_file_path, 'w') as outfile:
-      json.dump(auth_json, outfile)
+  updates = {f"{message['date']}/{message['time']}": message for message in messages}
 
-  scopes = [
-      "https://www.googleapis.com/auth/userinfo.email",
-      "https://www.googleapis.com/auth/firebase.database"
-  ]
-  credentials = service_account.Credentials.from_service_account_file(
-      auth_file_path, scopes=scopes)
-  authed_session = AuthorizedSession(credentials)
+  patch_firebase_paths(FIREBASE_URL, updates)
 
-  url = f"{FIREBASE_URL}/{date}/{time}.json"
-
-  r = authed_session.patch(url, data=json.dumps(payload))
-
-  if r.status_code == 200:
-    print("Data successfully sent to firebase")
-  else:
-    print(r.status_code, r.text)
-
-  return
\ No newline at end of file
+  return
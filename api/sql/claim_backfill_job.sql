@@ -0,0 +1,5 @@
+UPDATE backfilljobs
+SET status = 'RUNNING', attempts = attempts + 1, updated = NOW()
+WHERE jobid = %(job_id)s
+  AND (status IN ('PENDING', 'FAILED')
+    OR (status = 'RUNNING' AND (NOW() - updated) > INTERVAL '15 minute'))
\ No newline at end of file
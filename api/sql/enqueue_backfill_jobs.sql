@@ -0,0 +1,5 @@
+INSERT INTO backfilljobs(
+    jobid, leagueid, platform
+)
+VALUES %s
+ON CONFLICT (jobid) DO NOTHING
\ No newline at end of file
@@ -0,0 +1,3 @@
+UPDATE backfilljobs
+SET status = %(status)s, updated = NOW()
+WHERE jobid = %(job_id)s
\ No newline at end of file
@@ -4,4 +4,5 @@ SELECT
   platform,
   leagueid
 FROM leagueids
-WHERE leagueid ~ %(league_id_re)s
\ No newline at end of file
+WHERE regexp_replace(leagueid, '^[0-9]+\.l\.', '') = %(short_id)s
+  OR leagueid = %(league_id)s
\ No newline at end of file
@@ -0,0 +1,3 @@
+-- Short league id, ESPN ids as is and the numeric suffix of Yahoo keys (NNN.l.ID)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS leagueids_short_id_idx
+ON leagueids ((regexp_replace(leagueid, '^[0-9]+\.l\.', '')));
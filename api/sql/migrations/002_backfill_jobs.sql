@@ -0,0 +1,12 @@
+-- Onboarding backfill jobs, one per historical season or linked league
+-- Job ids include the season, espn:<leagueId>:<currentYear>:history and
+-- yahoo:<leagueKey>:<leagueYear>, so a new season is backfilled again
+CREATE TABLE IF NOT EXISTS backfilljobs (
+    jobid TEXT PRIMARY KEY,
+    leagueid TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    attempts INT NOT NULL DEFAULT 0,
+    created TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated TIMESTAMP NOT NULL DEFAULT NOW()
+);
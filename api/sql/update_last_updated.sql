@@ -0,0 +1,3 @@
+UPDATE public.leagueids
+SET lastUpdated = NOW()
+WHERE leagueid = %(league_id)s
\ No newline at end of file
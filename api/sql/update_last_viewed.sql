@@ -0,0 +1,3 @@
+UPDATE public.leagueids
+SET lastViewed = NOW(), viewCount = viewCount + 1
+WHERE leagueid = %(league_id)s
\ No newline at end of file
@@ -0,0 +1,4 @@
+UPDATE public.leagueids l
+SET lastViewed = NOW(), viewCount = l.viewCount + v.views
+FROM unnest(%(league_ids)s::text[], %(views)s::int[]) AS v(leagueid, views)
+WHERE l.leagueid = v.leagueid
\ No newline at end of file
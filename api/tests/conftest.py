@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Handlers import their siblings as top level modules, as in the lambda
+# package. Both packages have a util module, so dags/tests runs as a
+# separate pytest session
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,94 @@
+import sys
+from decimal import Decimal
+
+import pytest
+
+
+class FakeTable:
+  def __init__(self, items):
+    self.items = items
+
+  def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None):
+    item = self.items.get((Key['leagueId'], Key['leagueYear']))
+    if item is None:
+      return {}
+
+    if ProjectionExpression is not None:
+      fields = [ExpressionAttributeNames.get(f, f) for f in ProjectionExpression.split(', ')]
+      item = {k: v for k, v in item.items() if k in fields}
+
+    return {'Item': item}
+
+
+class FakeDynamo:
+  def __init__(self, table):
+    self.table = table
+
+  def Table(self, name):
+    return self.table
+
+
+class FakeLambda:
+  def invoke(self, **kwargs):
+    return {'StatusCode': 202}
+
+
+ITEM = {
+  'leagueId': '123',
+  'leagueYear': 2025,
+  'updatedAt': '2025-01-01T00:00:00',
+  'platform': 'espn',
+  'teams': [{'teamId': Decimal(1), 'teamName': 'A'}],
+  'powerRankings': [{'teamId': Decimal(1), 'rank': Decimal(1)}]
+}
+
+
+@pytest.fixture
+def league_data(monkeypatch):
+  boto3 = pytest.importorskip('boto3')
+  table = FakeTable({('123', 2025): ITEM})
+
+  monkeypatch.setattr(boto3, 'client', lambda *args, **kwargs: FakeLambda())
+  monkeypatch.setattr(boto3, 'resource', lambda *args, **kwargs: FakeDynamo(table))
+
+  for module in ('league_data', 'league_cache'):
+    monkeypatch.delitem(sys.modules, module, raising=False)
+
+  import league_data
+  return league_data
+
+
+def make_event(**params):
+  params = {'leagueId': '123', 'leagueYear': '2025', **params}
+  return {
+    'queryStringParameters': params,
+    'headers': {'Accept-Encoding': 'gzip, deflate, br'}
+  }
+
+
+def test_returns_raw_item(league_data):
+  res = league_data.get_league_data_from_ddb(make_event(), None)
+
+  assert res == ITEM
+
+
+def test_returns_projected_item(league_data):
+  res = league_data.get_league_data_from_ddb(make_event(sections='teams,missing'), None)
+
+  assert res['teams'] == ITEM['teams']
+  assert res['missingSections'] == ['missing']
+  assert 'powerRankings' not in res
+
+
+def test_compress_param_keeps_raw_shape(league_data):
+  # /data is a non-proxy integration, a proxy envelope would reach the client as is
+  res = league_data.get_league_data_from_ddb(make_event(compress='1'), None)
+
+  assert res == ITEM
+  assert not {'statusCode', 'isBase64Encoded', 'body'} & set(res)
+
+
+def test_unknown_league(league_data):
+  res = league_data.get_league_data_from_ddb(make_event(leagueId='999'), None)
+
+  assert res is None
@@ -20,6 +20,19 @@ def invoke_lambda(client, function_name, payload):
   return data
 
 
+def invoke_lambda_async(client, function_name, payload):
+  if not isinstance(payload, str):
+    payload = json.dumps(payload)
+
+  res = client.invoke(
+    FunctionName=function_name,
+    InvocationType='Event',
+    Payload=payload
+  )
+
+  return res['StatusCode'] == 202
+
+
 def get_current_espn_league_year():
     year_url = "https://lm-api-reads.fantasy.espn.com/apis/v3/games/fba/seasons/"
 
@@ -10,7 +10,7 @@ import Compare from './pages/Compare';
 import DraftRecap from './pages/DraftRecap';
 import Error from './pages/Error';
 import LeagueContext from './components/LeagueContext';
-import { fetchDynamo, fetchFirebase } from './utils/webAPI';
+import { fetchLeagueBase, fetchFirebase } from './utils/webAPI';
 
 const maxWidth = 1200;
 
@@ -36,7 +36,7 @@ function App() {
     const statusCommon = queryClient.getQueryState([leagueYear, 'common']);
 
     if (statusLeagueKey === undefined || statusCommon === undefined) {
-      const dataLeague = await queryClient.fetchQuery(leagueKey, fetchDynamo);
+      const dataLeague = await queryClient.fetchQuery(leagueKey, fetchLeagueBase);
       const dataCommon = await queryClient.fetchQuery(
         [leagueYear, 'common'],
         fetchFirebase
@@ -15,6 +15,7 @@ function CompareContainer(props) {
   const scoreboardData = props.data;
   const catSettings = props.settings[0].categoryIds;
   const currentWeek = props.currentWeek;
+  const allPlay = props.allPlay;
 
   const data = [];
   const h2hData = [];
@@ -30,18 +31,35 @@ function CompareContainer(props) {
     return catSettings.includes(o.espnId) && o.name !== 'mins'
   })
 
+  // Precomputed all play result of team against opponent, W/L/T/- per week
+  const getAllPlayResult = (teamId, oppId, week) => {
+    const w = allPlay?.weeks?.indexOf(week);
+    const i = allPlay?.teamIds?.indexOf(teamId);
+    const j = allPlay?.teamIds?.indexOf(oppId);
+
+    if (w === undefined || w < 0 || i < 0 || j < 0) {
+      return undefined;
+    }
+    return allPlay.results[w][i][j];
+  };
+
   // Aggregate and compute relevant H2H Data
   if (!selectedTeams.includes(0)) {
     for (const teamId of selectedTeams) {
       const h2hRow = {}
       h2hRow["rowHeader"] = teams.filter((team) => team.teamId === teamId)?.[0]?.fullTeamName;
       for (let week = 1; week <= currentWeek; week++) {
-        if (teamId === selectedTeams[0]) {
+        const allPlayResult = getAllPlayResult(teamId, selectedTeams[1], week);
+
+        if (teamId === selectedTeams[0] && allPlayResult !== undefined) {
+          h2hRow[`week${week}`] = { W: 'Won', T: 'Tied' }[allPlayResult] || '';
+        } else if (teamId === selectedTeams[0]) {
           const weekData = filteredData.filter((o) => o.week === week && o.teamId === teamId)?.[0];
           const oppWeekData = filteredData.filter((o) => o.week === week && o.teamId === selectedTeams[1])?.[0];
           h2hRow[`week${week}`] = calculateMatchup(weekData, oppWeekData) ? 'Won' : '';
         } else {
-          h2hRow[`week${week}`] = (h2hData[0][`week${week}`] === 'Won') ? '' : 'Won';
+          const firstResult = h2hData[0][`week${week}`];
+          h2hRow[`week${week}`] = firstResult === 'Tied' ? 'Tied' : firstResult === 'Won' ? '' : 'Won';
         }
       }
       h2hData.push(h2hRow);
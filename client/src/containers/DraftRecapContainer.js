@@ -22,20 +22,29 @@ function DraftRecapContainer(props) {
   // );
   const hasEjections = false;
 
+  // Pick values precomputed by the pipeline, keyed by pick number
+  const draftRecap = {};
+  (props.draftRecap || []).forEach((pick) => {
+    draftRecap[pick.pickNumber] = pick;
+  });
+
   // Adjusting raw data, calculating difference
   const data = draft.map((pick) => {
     const team = teams.filter((team) => team.teamId === pick.teamId);
     const player = players.filter(
       (player) => player.playerId === pick.playerId
     )[0];
+    const recap = draftRecap[pick.pickNumber];
 
-    const ranking = ejsChecked
-      ? player?.totalRankingSeason
+    const ranking = recap
+      ? recap.rankingSeason
       : player?.totalRankingSeason;
-    const rating = ejsChecked
-      ? player?.totalRatingSeason
+    const rating = recap
+      ? recap.ratingSeason
       : player?.totalRatingSeason;
-    const difference = ranking ? pick.pickNumber - ranking : null;
+    const difference = recap
+      ? recap.differenceSeason ?? null
+      : ranking ? pick.pickNumber - ranking : null;
 
     return {
       ...pick,
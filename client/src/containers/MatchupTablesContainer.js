@@ -13,6 +13,7 @@ function MatchupTablesContainer(props) {
   const teams = props.teams;
   const settings = props.settings[0].categoryIds;
   const currentWeek = parseInt(props.currentWeek);
+  const winProbabilities = props.winProbabilities;
 
   const cats = categoryDetails.filter((o) => {
     return settings.includes(o.espnId) && o.name !== 'mins';
@@ -35,10 +36,43 @@ function MatchupTablesContainer(props) {
     scoreboardData.filter((row) => row.week === week)
   );
 
+  // Precomputed by the pipeline for the current week, index into team pairs
+  const getPrecomputedStatistics = (week, teamId, awayTeamId) => {
+    if (!winProbabilities || winProbabilities.week !== week) {
+      return null;
+    }
+
+    const i = winProbabilities.teamIds.indexOf(teamId);
+    const j = winProbabilities.teamIds.indexOf(awayTeamId);
+    if (i < 0 || j < 0) {
+      return null;
+    }
+
+    const statistics = {};
+    winProbabilities.categories.forEach((cat, c) => {
+      statistics[cat] = winProbabilities.category[i][j][c] * 100;
+    });
+
+    return {
+      week: week,
+      teamId: teamId,
+      awayId: awayTeamId,
+      fullTeamName: 'Initial Win %',
+      firstName: (winProbabilities.matchup[i][j] * 100).toFixed(0).toString(10),
+      type: 'prob',
+      ...statistics,
+    };
+  };
+
   const statisticData = displayList.map((row) => {
     const week = row.week;
     const teamId = row.teamId;
     const awayTeamId = row.awayId;
+
+    const precomputed = getPrecomputedStatistics(week, teamId, awayTeamId);
+    if (precomputed) {
+      return precomputed;
+    }
     const homeScoreboardData = scoreboardData.filter(
       (d) => d.teamId === teamId && d.week < week
     );
@@ -13,6 +13,7 @@ function TeamRankingsContainer(props) {
   const teams = props.leagueData.teams;
   const catIds = props.leagueData.settings[0].categoryIds;
   const rosters = props.leagueData.rosters;
+  const allPlay = props.leagueData.allPlay;
 
   const periodArray = ['Last7', 'Last15', 'Last30', 'Season'];
   const ratingsKey = `statRatings${period}`;
@@ -30,6 +31,18 @@ function TeamRankingsContainer(props) {
     return [];
   });
 
+  // Season all play record from the precomputed weekly wins, losses and ties
+  const getAllPlayRecord = (teamId) => {
+    const i = allPlay?.teamIds?.indexOf(teamId);
+
+    if (i === undefined || i < 0) {
+      return '';
+    }
+    const total = (key) => (allPlay[key] || []).reduce((a, week) => a + week[i], 0);
+
+    return `${total('wins')}-${total('losses')}-${total('ties')}`;
+  };
+
   const data = teams.map((team) => {
     const teamRoster = rosters.filter(
       (r) => r.teamId === team.teamId && !injuredIds.includes(r.playerId)
@@ -58,6 +71,7 @@ function TeamRankingsContainer(props) {
       ...team,
       ...teamCats,
       all: all,
+      allPlayRecord: getAllPlayRecord(team.teamId),
     };
   });
   catsList.push(categoryDetails.filter((cat) => cat.name === 'all')[0]);
@@ -70,7 +84,8 @@ function TeamRankingsContainer(props) {
   each team for each category and totals for each. Ratings are available
   for different time ranges with 'Last 15' as default. Players in IR 
   slots are excluded from the ratings. Ratings sourced from ESPN for both ESPN 
-  and Yahoo leagues.`;
+  and Yahoo leagues. All-Play is the season record (W-L-T) against every
+  team each week.`;
 
   return (
     <Container>
@@ -1,4 +1,4 @@
-import React, { useContext } from 'react';
+import React, { useContext, useEffect } from 'react';
 import { useQueryClient, useIsFetching } from 'react-query';
 import styled from 'styled-components';
 
@@ -7,6 +7,7 @@ import LeagueContext from '../components/LeagueContext';
 import CompareContainer from '../containers/CompareContainer';
 import TooltipHeader from '../components/TooltipHeader';
 import LoadingIcon from '../components/LoadingIcon';
+import { PAGE_SECTIONS, fetchLeagueSections, getMissingSections } from '../utils/webAPI';
 
 function Compare(props) {
   const { leagueState } = useContext(LeagueContext);
@@ -15,7 +16,14 @@ function Compare(props) {
   const queryClient = useQueryClient();
   const data = queryClient.getQueryData(leagueKey);
 
-  const isDataLoaded = data !== undefined;
+  useEffect(() => {
+    fetchLeagueSections(queryClient, leagueKey, PAGE_SECTIONS.compare);
+  }, [queryClient, leagueKey]);
+
+  const isDataLoaded =
+    data !== undefined &&
+    data !== null &&
+    getMissingSections(data, PAGE_SECTIONS.compare).length === 0;
   const isFetching = useIsFetching() > 0;
 
   const isLoading = !isDataLoaded || isFetching;
@@ -23,6 +31,7 @@ function Compare(props) {
   const scoreboardData = isLoading ? null : data.scoreboard;
   const teamData = isLoading ? null : data.teams;
   const settingsData = isLoading ? null : data.settings;
+  const allPlayData = isLoading ? null : data.allPlay;
 
   let currentWeek = 1;
   let isRotoLeague = false;
@@ -53,6 +62,7 @@ function Compare(props) {
             data={scoreboardData}
             settings={settingsData}
             currentWeek={currentWeek}
+            allPlay={allPlayData}
           />
         </Container>
       )}
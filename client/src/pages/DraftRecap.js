@@ -1,4 +1,4 @@
-import React, { useContext } from 'react';
+import React, { useContext, useEffect } from 'react';
 import { useQueryClient, useIsFetching } from 'react-query';
 
 import Layout from '../components/Layout';
@@ -8,6 +8,7 @@ import DraftRecapContainer from '../containers/DraftRecapContainer';
 import LoadingIcon from '../components/LoadingIcon';
 
 import styled from 'styled-components';
+import { PAGE_SECTIONS, fetchLeagueSections, getMissingSections } from '../utils/webAPI';
 
 function DraftRecap(props) {
   const { leagueState } = useContext(LeagueContext);
@@ -16,7 +17,14 @@ function DraftRecap(props) {
   const queryClient = useQueryClient();
   const data = queryClient.getQueryData(leagueKey);
 
-  const isDataLoaded = data !== undefined;
+  useEffect(() => {
+    fetchLeagueSections(queryClient, leagueKey, PAGE_SECTIONS.draft);
+  }, [queryClient, leagueKey]);
+
+  const isDataLoaded =
+    data !== undefined &&
+    data !== null &&
+    getMissingSections(data, PAGE_SECTIONS.draft).length === 0;
   const isFetching = useIsFetching() > 0;
 
   const isLoading = !isDataLoaded || isFetching;
@@ -25,6 +33,7 @@ function DraftRecap(props) {
   const teamData = isLoading ? null : data.teams;
   const settingsData = isLoading ? null : data.settings;
   const playersData = isLoading ? null : data.players;
+  const draftRecapData = isLoading ? null : data.draftRecap;
 
   const isMissingPlayerData = isLoading ? null : playersData.length === 0;
 
@@ -51,6 +60,7 @@ function DraftRecap(props) {
             teams={teamData}
             settings={settingsData}
             players={playersData}
+            draftRecap={draftRecapData}
           />
         </Container>
       )}
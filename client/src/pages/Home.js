@@ -1,12 +1,24 @@
-import React from 'react';
+import React, { useContext, useEffect } from 'react';
+import { useQueryClient } from 'react-query';
 
 import Layout from '../components/Layout';
 import MessageBoard from '../components/MessageBoard';
 import TooltipHeader from '../components/TooltipHeader';
+import LeagueContext from '../components/LeagueContext';
+import { PAGE_SECTIONS, fetchLeagueSections } from '../utils/webAPI';
 
 import styled from 'styled-components';
 
 function Home(props) {
+  const { leagueState } = useContext(LeagueContext);
+  const leagueKey = leagueState[0];
+
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    fetchLeagueSections(queryClient, leagueKey, PAGE_SECTIONS.home);
+  }, [queryClient, leagueKey]);
+
   const leagueBoardInfo = `League board for messages and daily alerts. Nightly notable 
     statlines are posted according to high gamescore with best free agent game in 
     the format:
@@ -1,4 +1,4 @@
-import React, { useContext } from 'react';
+import React, { useContext, useEffect } from 'react';
 import { useQueryClient, useIsFetching } from 'react-query';
 import styled from 'styled-components';
 
@@ -8,6 +8,7 @@ import MatchupTablesContainer from '../containers/MatchupTablesContainer';
 import TotalsContainer from '../containers/TotalsContainer';
 import TooltipHeader from '../components/TooltipHeader';
 import LoadingIcon from '../components/LoadingIcon';
+import { PAGE_SECTIONS, fetchLeagueSections, getMissingSections } from '../utils/webAPI';
 
 function Scoreboard(props) {
   const { leagueState } = useContext(LeagueContext);
@@ -16,7 +17,14 @@ function Scoreboard(props) {
   const queryClient = useQueryClient();
   const data = queryClient.getQueryData(leagueKey);
 
-  const isDataLoaded = data !== undefined && data !== null;
+  useEffect(() => {
+    fetchLeagueSections(queryClient, leagueKey, PAGE_SECTIONS.scoreboard);
+  }, [queryClient, leagueKey]);
+
+  const isDataLoaded =
+    data !== undefined &&
+    data !== null &&
+    getMissingSections(data, PAGE_SECTIONS.scoreboard).length === 0;
   const isFetching = useIsFetching() > 0;
 
   const isLoading = !isDataLoaded || isFetching;
@@ -24,6 +32,7 @@ function Scoreboard(props) {
   const scoreboardData = isLoading ? null : data.scoreboard;
   const teamData = isLoading ? null : data.teams;
   const settingsData = isLoading ? null : data.settings;
+  const winProbabilities = isLoading ? null : data.winProbabilities;
 
   let currentWeek = 1;
   let isRotoLeague = false;
@@ -71,6 +80,7 @@ function Scoreboard(props) {
             teams={teamData}
             settings={settingsData}
             currentWeek={currentWeek}
+            winProbabilities={winProbabilities}
           />
         </Container>
       )}
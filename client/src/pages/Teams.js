@@ -1,4 +1,4 @@
-import React, { useContext } from 'react';
+import React, { useContext, useEffect } from 'react';
 import { useQueryClient, useIsFetching } from 'react-query';
 import styled from 'styled-components';
 
@@ -7,6 +7,7 @@ import LeagueContext from '../components/LeagueContext';
 import LoadingIcon from '../components/LoadingIcon';
 import TeamRankingsContainer from '../containers/TeamRankingsContainer';
 import RosterContainer from '../containers/RosterContainer';
+import { PAGE_SECTIONS, fetchLeagueSections, getMissingSections } from '../utils/webAPI';
 
 function Teams(props) {
   const { leagueState } = useContext(LeagueContext);
@@ -15,7 +16,14 @@ function Teams(props) {
   const queryClient = useQueryClient();
   const data = queryClient.getQueryData(leagueKey);
 
-  const isDataLoaded = data !== undefined && data !== null;
+  useEffect(() => {
+    fetchLeagueSections(queryClient, leagueKey, PAGE_SECTIONS.teams);
+  }, [queryClient, leagueKey]);
+
+  const isDataLoaded =
+    data !== undefined &&
+    data !== null &&
+    getMissingSections(data, PAGE_SECTIONS.teams).length === 0;
   const isFetching = useIsFetching() > 0;
 
   const isLoading = !isDataLoaded || isFetching;
@@ -99,11 +99,12 @@ function CompareH2HTable(props) {
                                   const headerId = cell.column.id;
                                   const isRowHeader = headerId === 'rowHeader';
                                   const isWinner = cell.value === 'Won'
+                                  const isTied = cell.value === 'Tied'
                                   return (
                                     <td
                                       {...cell.getCellProps()}
                                       style={{
-                                        background: isWinner ? 'limegreen' : 'gainsboro',
+                                        background: isWinner ? 'limegreen' : isTied ? 'yellow' : 'gainsboro',
                                         fontWeight: isRowHeader ? 'bold' : 'normal',
                                       }}
                                     >
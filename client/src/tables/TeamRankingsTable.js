@@ -50,6 +50,10 @@ function TeamRankingsTable(props) {
         Header: 'L',
         accessor: 'losses',
       },
+      {
+        Header: 'All-Play',
+        accessor: 'allPlayRecord',
+      },
     ];
     const catHeaders = cats.map((cat) => {
       return {
@@ -17,17 +17,32 @@ export const fetchFirebase = async ({ queryKey }) => {
   return data;
 };
 
+// League item sections each page reads, fetched as the page is opened so
+// only what is shown is downloaded. Base fields such as allLeagueKeys and
+// updatedAt come with every request
+export const BASE_SECTIONS = ['settings'];
+export const PAGE_SECTIONS = {
+  home: ['daily'],
+  teams: ['teams', 'players', 'rosters', 'allPlay'],
+  scoreboard: ['teams', 'scoreboard', 'winProbabilities'],
+  compare: ['teams', 'scoreboard', 'allPlay'],
+  draft: ['teams', 'players', 'draft', 'draftRecap'],
+};
+
 export const fetchDynamo = async ({ queryKey }) => {
   console.log('Fetching from dynamo with key: ', queryKey);
-  const [leagueId, leagueYear] = queryKey;
+  const [leagueId, leagueYear, sections] = queryKey;
+
+  const params = {
+    leagueId: leagueId,
+    leagueYear: leagueYear,
+  };
+  // Optional list of sections, eg. ['settings', 'teams', 'scoreboard']
+  if (sections) {
+    params.sections = sections.join(',');
+  }
 
-  const fullURL =
-    awsURL +
-    'data?' +
-    new URLSearchParams({
-      leagueId: leagueId,
-      leagueYear: leagueYear,
-    });
+  const fullURL = awsURL + 'data?' + new URLSearchParams(params);
 
   const res = await fetch(fullURL, {
     method: 'GET',
@@ -35,13 +50,59 @@ export const fetchDynamo = async ({ queryKey }) => {
   });
   const data = await res.json();
 
-  if (leagueId === '00000001') {
+  if (data !== null && sections) {
+    data.fetchedSections = sections;
+  }
+
+  if (leagueId === '00000001' && data?.teams) {
     anonymizeTeams(data);
   }
 
   return data;
 };
 
+// League query with only the base sections, pages add theirs to it
+export const fetchLeagueBase = ({ queryKey }) =>
+  fetchDynamo({ queryKey: [queryKey[0], queryKey[1], BASE_SECTIONS] });
+
+export const getMissingSections = (data, sections) => {
+  const fetched = data?.fetchedSections;
+  if (data && !fetched) {
+    return [];
+  }
+
+  return sections.filter((section) => !(fetched || []).includes(section));
+};
+
+// Fetches the sections a page needs that are not loaded yet and merges them
+// into the league query data, before the fetch is reported as finished so
+// pages rerendering on useIsFetching see the merged data
+export const fetchLeagueSections = async (queryClient, leagueKey, sections) => {
+  const data = await queryClient.fetchQuery(leagueKey, fetchLeagueBase, {
+    staleTime: Infinity,
+  });
+
+  const missing = getMissingSections(data, sections);
+  if (data === null || !missing.length) {
+    return data;
+  }
+
+  return queryClient.fetchQuery([...leagueKey, missing], async (context) => {
+    const dataSections = await fetchDynamo(context);
+    const current = queryClient.getQueryData(leagueKey);
+
+    if (dataSections !== null && current) {
+      queryClient.setQueryData(leagueKey, {
+        ...current,
+        ...dataSections,
+        fetchedSections: [...current.fetchedSections, ...missing],
+      });
+    }
+
+    return dataSections;
+  });
+};
+
 export const requestLeagueId = async (payload) => {
   const fullURL = awsURL + 'leagues?' + new URLSearchParams(payload);
 
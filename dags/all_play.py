@@ -0,0 +1,125 @@
+import numpy as np
+
+import consts
+from util import get_category_columns
+from instrumentation import timed
+
+
+def get_week_team_values(scoreboard, weeks: list, team_ids: list, columns: list):
+  """
+  Scatters scoreboard rows into an array of shape (weeks, teams, columns),
+  nan where a team has no result for a week
+  """
+  values = np.full((len(weeks), len(team_ids), len(columns)), np.nan)
+
+  week_idx = np.searchsorted(weeks, scoreboard["week"].to_numpy())
+  team_idx = np.searchsorted(team_ids, scoreboard["teamId"].to_numpy())
+
+  values[week_idx, team_idx, :] = scoreboard[columns].to_numpy(dtype=float)
+
+  return values
+
+
+def get_all_play_results(values: np.ndarray, inverse: np.ndarray, pts: np.ndarray):
+  """
+  Results of every team against every other team for every week, shape
+  (weeks, teams, teams). Categories are won by the higher value unless
+  inverse, ties in categories won are broken by points and a tie in both
+  is a tie for the two teams
+  """
+  diff = values[:, :, None, :] - values[:, None, :, :]
+  signs = np.sign(diff)
+  signs = np.where(inverse, -signs, signs)
+
+  score = np.nansum(signs, axis=-1)
+  pts_diff = pts[:, :, None] - pts[:, None, :]
+
+  won = (score > 0) | ((score == 0) & (pts_diff > 0))
+  tied = (score == 0) & (pts_diff == 0)
+
+  has_data = ~np.isnan(values).all(axis=-1)
+  valid = has_data[:, :, None] & has_data[:, None, :]
+  valid &= ~np.eye(values.shape[1], dtype=bool)[None, :, :]
+
+  return won, tied, valid
+
+
+def get_category_ranks(values: np.ndarray, inverse: np.ndarray):
+  """
+  Rank of each team per week and category, 1 is best and ties share the
+  best rank. Shape (weeks, teams, cats)
+  """
+  better = values[:, None, :, :] > values[:, :, None, :]
+  worse = values[:, None, :, :] < values[:, :, None, :]
+  better = np.where(inverse, worse, better)
+
+  ranks = better.sum(axis=2) + 1.0
+  ranks[np.isnan(values)] = np.nan
+
+  return ranks
+
+
+@timed('analytics.allPlay')
+def compute_all_play(league_data: dict):
+  """
+  Precomputes all play results over teams x teams x weeks with derived all
+  play records and category ranks
+  """
+  scoreboard = league_data["scoreboard"]
+  settings = league_data["settings"]
+
+  if scoreboard.empty or settings.empty:
+    return {}
+
+  current_week = int(settings.iloc[0]["currentWeek"])
+
+  if settings.iloc[0].get("scoringType") in consts.POINTS_SCORING_TYPES:
+    columns, inverse = ['fpts'], [False]
+  else:
+    columns, inverse = get_category_columns(settings)
+
+  inverse = np.array([inv for c, inv in zip(columns, inverse) if c in scoreboard.columns], dtype=bool)
+  columns = [c for c in columns if c in scoreboard.columns]
+
+  if not columns:
+    return {}
+
+  scoreboard = scoreboard[scoreboard["week"] <= current_week]
+  scoreboard = scoreboard.drop_duplicates(subset=["week", "teamId"], keep="last")
+
+  weeks = np.sort(scoreboard["week"].unique())
+  team_ids = np.sort(scoreboard["teamId"].unique())
+
+  values = get_week_team_values(scoreboard, weeks, team_ids, columns)
+
+  if 'pts' in scoreboard.columns:
+    pts = get_week_team_values(scoreboard, weeks, team_ids, ['pts'])[..., 0]
+  else:
+    pts = np.zeros(values.shape[:2])
+
+  won, tied, valid = get_all_play_results(values, inverse, pts)
+  ranks = get_category_ranks(values, inverse)
+
+  wins = (won & valid).sum(axis=2)
+  ties = (tied & valid).sum(axis=2)
+  losses = (~won & ~tied & valid).sum(axis=2)
+
+  # Compact results, one string per team and week, W/L/T against each team
+  symbols = np.select([~valid, won, tied], ['-', 'W', 'T'], 'L')
+  results = [[''.join(row) for row in week] for week in symbols]
+
+  category_ranks = [
+    [[None if np.isnan(r) else int(r) for r in team] for team in week]
+    for week in ranks
+  ]
+
+  return {
+    'teamIds': [int(t) for t in team_ids],
+    'weeks': [int(w) for w in weeks],
+    'categories': columns,
+    'results': results,
+    'wins': wins.tolist(),
+    'losses': losses.tolist(),
+    'ties': ties.tolist(),
+    'categoryRanks': category_ranks
+  }
@@ -4,50 +4,45 @@ import requests
 from datetime import datetime
 import pandas as pd
 
-from rds_operations import rds_run_query
 pd.options.mode.chained_assignment = None
 
 from airflow.decorators import task
 from airflow.operators.python import get_current_context
 
-from util_cloud import authed_session
+from upload_to_cloud import get_authed_session
 
 
-@task
-def create_common_daily_alert():
+# Box score columns posted with each gamescore alert
+ALERT_COLUMNS = [
+  'fullName', 'pts', 'rebs', 'asts', 'stls', 'blks', 'tos', 'fgMade', 'fgAtt',
+  'threes', 'threesAtt', 'ftMade', 'ftAtt', 'mins', 'gs'
+]
+
+
+def create_common_daily_alert(daily: list, date: str):
   """
   Create daily alert for common data (eg. no league specific free agents) by 
-  highest gamescore, ejections
+  highest gamescore, ejections, from the common daily box score records
   """
   # Getting best gamescore alerts
   gamescore_cutoff = 32.5
   min_alerts = 3
 
-  best_gamescores_sql = """
-    (SELECT fullname, pts, rebs, asts, stls, blks, tos, fgmade, fgatt, threes, threesatt, ftmade, ftatt, mins, gs
-    FROM daily
-    WHERE gs >= %s)
-    UNION
-      (SELECT fullname, pts, rebs, asts, stls, blks, tos, fgmade, fgatt, threes, threesatt, ftmade, ftatt, mins, gs
-      FROM daily
-      ORDER BY gs DESC
-      LIMIT %s)
-    ORDER BY gs DESC
-  """
-  best_gamescores = rds_run_query(-1, best_gamescores_sql, (gamescore_cutoff, min_alerts))
+  df = pd.DataFrame.from_records(daily)
+
+  if df.empty:
+    return {date: {}}
+
+  df = df.sort_values(by='gs', ascending=False).reset_index(drop=True)
+
+  # Every game over the cutoff, and at least the best few
+  best_df = df[(df['gs'] >= gamescore_cutoff) | (df.index < min_alerts)]
+  best_gamescores = best_df.reindex(columns=ALERT_COLUMNS).to_dict(orient='records')
 
   # Getting ejections
-  ejections_sql = """
-    SELECT fullname
-    FROM daily
-    WHERE ejs > 0
-  """
-  ejections = rds_run_query(-1, ejections_sql)
+  ejections = df.loc[df['ejs'] > 0, ['fullName']].to_dict(orient='records')
 
   # Creating daily alert json object
-  context = get_current_context()
-  date = context['data_interval_end'].to_date_string()
-
   alert_data = {}
   alert_data[date] = {}
 
@@ -104,7 +99,7 @@ def calculate_and_upload_daily_alert(daily_score_df: str, team_info_df: str):
 
     data['abbrev'] = 'WAIVER' if data['teamId'] == 0 else team_df.loc[team_df.teamId == data.teamId].iloc[0]['abbrev']
 
-    r = authed_session.put(url, data=data.to_json())
+    r = get_authed_session().put(url, data=data.to_json())
 
     print(r.status_code)
 
@@ -128,6 +123,6 @@ def calculate_and_upload_daily_alert(daily_score_df: str, team_info_df: str):
 
       data['abbrev'] = 'WAIVER' if data['teamId'] == 0 else team_df.loc[team_df.teamId == data.teamId].iloc[0]['abbrev']
 
-      r = authed_session.put(url, data=data.to_json())
+      r = get_authed_session().put(url, data=data.to_json())
 
       print(r.status_code)
\ No newline at end of file
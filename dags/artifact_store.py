@@ -0,0 +1,85 @@
+import os
+import json
+
+
+# Local directory or s3://bucket/prefix where task outputs are written
+ARTIFACT_ROOT = os.environ.get('FANTASY_ARTIFACT_ROOT', '/tmp/fantasy_artifacts')
+
+
+def get_durable_root(root: str = None, setting: str = 'FANTASY_ARTIFACT_ROOT'):
+  """
+  Root of artifacts kept beyond the invocation, which must be an s3 root in
+  Lambda as local files are lost with the container
+  """
+  root = root or ARTIFACT_ROOT
+
+  if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') and not root.startswith('s3://'):
+    raise ValueError(f"{setting} must be an s3:// root in Lambda, got {root}")
+
+  return root
+
+
+def build_artifact_uri(*parts, root: str = None):
+  return '/'.join([(root or ARTIFACT_ROOT).rstrip('/')] + [str(p) for p in parts])
+
+
+def write_bytes_artifact(body: bytes, *parts, root: str = None):
+  """
+  Writes raw bytes to the artifact store, or another local or s3 root,
+  returning the artifact uri
+  """
+  uri = build_artifact_uri(*parts, root=root)
+
+  if uri.startswith('s3://'):
+    import boto3
+
+    bucket, key = uri[len('s3://'):].split('/', 1)
+    boto3.client('s3').put_object(Bucket=bucket, Key=key, Body=body)
+  else:
+    os.makedirs(os.path.dirname(uri), exist_ok=True)
+    with open(uri, 'wb') as f:
+      f.write(body)
+
+  return uri
+
+
+def read_bytes_artifact(uri: str):
+  """
+  Reads raw bytes written by write_bytes_artifact
+  """
+  if uri.startswith('s3://'):
+    import boto3
+
+    bucket, key = uri[len('s3://'):].split('/', 1)
+    obj = boto3.client('s3').get_object(Bucket=bucket, Key=key)
+    return obj['Body'].read()
+
+  with open(uri, 'rb') as f:
+    return f.read()
+
+
+def write_json_artifact(data, *parts):
+  """
+  Writes json data to the artifact store, returning its uri for downstream
+  tasks instead of passing the data itself through XCom
+  """
+  return write_bytes_artifact(json.dumps(data).encode('UTF-8'), *parts)
+
+
+def is_missing_artifact_error(e: Exception):
+  """
+  Whether a read failed because the artifact doesn't exist yet, as opposed
+  to a throttled, denied or broken read that must not be taken for empty
+  """
+  if isinstance(e, FileNotFoundError):
+    return True
+
+  error = (getattr(e, 'response', None) or {}).get('Error', {})
+  return error.get('Code') in ('NoSuchKey', '404')
+
+
+def read_json_artifact(uri: str):
+  """
+  Reads json data written by write_json_artifact
+  """
+  return json.loads(read_bytes_artifact(uri).decode('UTF-8'))
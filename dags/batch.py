@@ -0,0 +1,118 @@
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import finish_metrics
+
+
+# Leagues handed to a single worker invocation by the batch drivers
+LEAGUES_PER_BATCH = 10
+
+
+def chunk_leagues(leagues: list, size: int = LEAGUES_PER_BATCH):
+  """
+  Splits a list of leagues into consecutive batches
+  """
+  return [leagues[i:i + size] for i in range(0, len(leagues), size)]
+
+
+def process_league_safe(process_fn, params: dict):
+  """
+  Runs a single league handler, capturing failures as a result entry
+  """
+  result = {
+    'leagueId': params.get('leagueId'),
+    'leagueYear': params.get('leagueYear'),
+  }
+
+  try:
+    res = process_fn({"queryStringParameters": params}, None)
+    result['status'] = 'SUCCESS' if res and res.get('statusCode') == 200 else 'FAILED'
+
+    if res and res.get('rosteredPlayerIds') is not None:
+      result['rosteredPlayerIds'] = res['rosteredPlayerIds']
+    if res and res.get('metrics'):
+      result['metrics'] = res['metrics']
+  except Exception as e:
+    print(f"League {params.get('leagueId')} failed: {e}")
+    traceback.print_exc()
+    result['status'] = 'FAILED'
+    result['error'] = str(e)
+    result['metrics'] = finish_metrics('FAILED')
+
+  return result
+
+
+# Modules holding HTTP sessions, reset in every forked worker. Database
+# connections are only opened by the drivers, never inside a worker
+WORKER_SESSION_MODULES = ('extract_espn', 'extract_yahoo', 'upload_to_cloud')
+
+
+def init_league_worker():
+  """
+  Process pool initializer giving each forked worker its own HTTP sessions
+  """
+  for module_name in WORKER_SESSION_MODULES:
+    module = sys.modules.get(module_name)
+
+    if module is not None:
+      module.reset_session()
+
+
+def get_pool_result(future, params: dict):
+  """
+  Result of a league run in the process pool. A worker killed mid run (out
+  of memory, segfault) breaks the pool, and every league without a result
+  yet fails on its own instead of failing the whole batch. They aren't
+  rerun here, the culprit would take the batch process down with it
+  """
+  try:
+    return future.result()
+  except BrokenProcessPool as e:
+    print(f"League {params.get('leagueId')} lost to a broken process pool: {e}")
+
+    return {
+      'leagueId': params.get('leagueId'),
+      'leagueYear': params.get('leagueYear'),
+      'status': 'FAILED',
+      'error': f"Worker process died: {e}",
+    }
+
+
+def run_league_batch(process_fn, leagues: list, max_workers: int = 1):
+  """
+  Processes a batch of leagues in one warm worker, sharing module level
+  caches and HTTP sessions. With max_workers > 1 leagues are spread over a
+  process pool, falling back to sequential runs where multiprocessing is
+  unavailable (eg. no /dev/shm on Lambda)
+  """
+  if max_workers > 1 and len(leagues) > 1:
+    try:
+      with ProcessPoolExecutor(max_workers=max_workers, initializer=init_league_worker) as executor:
+        futures = [executor.submit(process_league_safe, process_fn, params) for params in leagues]
+
+        return [get_pool_result(f, params) for f, params in zip(futures, leagues)]
+    except (OSError, NotImplementedError) as e:
+      print(f"Process pool unavailable, processing sequentially: {e}")
+
+  return [process_league_safe(process_fn, params) for params in leagues]
+
+
+def get_successful_league_ids(results: list):
+  return [r['leagueId'] for r in results if r.get('status') == 'SUCCESS']
+
+
+def get_league_metrics(results: list):
+  return [r['metrics'] for r in results if r.get('metrics')]
+
+
+def get_league_rosters(results: list):
+  """
+  Rostered player ids reported by each successful league, for the ownership
+  index
+  """
+  return {
+    r['leagueId']: r['rosteredPlayerIds'] for r in results
+    if r.get('status') == 'SUCCESS' and r.get('rosteredPlayerIds') is not None
+  }
@@ -0,0 +1,332 @@
+"""
+Offline benchmark of the transform stage, no network or AWS access needed.
+
+  python dags/bench/bench_transforms.py
+  python dags/bench/bench_transforms.py --players 2000 --seasons 3
+  python dags/bench/bench_transforms.py --fixtures recorded/
+  python dags/bench/bench_transforms.py --update-baseline
+
+Runs every transform against synthetic payloads, or payloads recorded with
+PAYLOAD_RECORD_DIR set while running the lambdas (one directory per league),
+and reports latency percentiles, throughput and peak allocations. With
+several seasons or recorded leagues, results are prefixed by the season or
+league directory. Output digests are compared against a baseline file so
+optimizations can't silently change results, any mismatch fails the run.
+Timings slower than the baseline by more than the threshold are reported,
+but only fail with --fail-on-regression, since a committed baseline is
+rarely from the same machine. Outputs deliberately changed are re-recorded
+with --update-baseline, the digests they replace are kept in each entry's
+history.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import hashlib
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+DAGS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DAGS_DIR)
+
+import transform_raw_data
+import transform_raw_data_yahoo
+import transform_data
+import transform_data_yahoo
+from util import df_to_records
+
+from fixtures import load_recorded_leagues, make_espn_seasons, make_yahoo_payloads
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+ESPN_ENDPOINTS = ['settings', 'teams', 'rosters', 'scoreboard', 'draft', 'players', 'daily']
+YAHOO_ENDPOINTS = ['settings', 'teams', 'rosters', 'scoreboard', 'draft', 'players', 'players_id_map', 'daily']
+
+
+
+def get_digest(df):
+  """
+  Order sensitive hash of a transform's output
+  """
+  records = df_to_records(df) if isinstance(df, pd.DataFrame) else df
+  body = json.dumps(records, sort_keys=True, default=str)
+
+  return hashlib.sha1(body.encode('UTF-8')).hexdigest()
+
+
+def measure(fn, make_input, repeat: int):
+  """
+  Times fn over fresh copies of its input, copies are made outside the
+  timed section. Peak allocations are traced on a separate untimed call
+  """
+  times = []
+  output = None
+
+  for _ in range(repeat):
+    args = make_input()
+
+    start = time.perf_counter()
+    output = fn(*args)
+    times.append(time.perf_counter() - start)
+
+  args = make_input()
+  tracemalloc.start()
+  fn(*args)
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+
+  times_ms = np.array(times) * 1000
+  rows = len(output) if output is not None else 0
+
+  return {
+    'p50Ms': round(float(np.percentile(times_ms, 50)), 3),
+    'p95Ms': round(float(np.percentile(times_ms, 95)), 3),
+    'p99Ms': round(float(np.percentile(times_ms, 99)), 3),
+    'rows': rows,
+    'rowsPerSec': round(rows / (np.median(times_ms) / 1000), 1) if np.median(times_ms) > 0 else None,
+    'peakBytes': peak,
+    'digest': get_digest(output)
+  }, output
+
+
+def bench_espn(raw: dict, repeat: int):
+  results = {}
+  league_data = {'platform': 'espn'}
+
+  for endpoint in ESPN_ENDPOINTS:
+    if endpoint not in raw:
+      continue
+
+    results[f'espn.raw.{endpoint}'], league_data[endpoint] = measure(
+      transform_raw_data.transform_raw_to_df,
+      lambda: (endpoint, copy.deepcopy(raw[endpoint])),
+      repeat
+    )
+
+  def league_copy():
+    return ({k: v.copy() if isinstance(v, pd.DataFrame) else v for k, v in league_data.items()},)
+
+  if all(k in league_data for k in ['players', 'draft', 'rosters']):
+    results['espn.players_truncate'], _ = measure(transform_data.transform_players_truncate, league_copy, repeat)
+
+  if all(k in league_data for k in ['daily', 'rosters']):
+    results['espn.unrostered_daily'], _ = measure(transform_data.transform_unrostered_daily, league_copy, repeat)
+
+  return results, league_data
+
+
+def bench_yahoo(raw: dict, repeat: int):
+  results = {}
+  league_data = {'platform': 'yahoo'}
+
+  for endpoint in YAHOO_ENDPOINTS:
+    if endpoint not in raw:
+      continue
+
+    results[f'yahoo.raw.{endpoint}'], league_data[endpoint] = measure(
+      transform_raw_data_yahoo.transform_yahoo_raw_to_df,
+      lambda: (endpoint, copy.deepcopy(raw[endpoint])),
+      repeat
+    )
+
+  def league_copy():
+    return ({k: v.copy(deep=True) if isinstance(v, pd.DataFrame) else v for k, v in league_data.items()},)
+
+  if any(k not in league_data for k in ['players', 'settings', 'draft', 'rosters', 'players_id_map']):
+    return results, league_data
+
+  results['yahoo.adjust_player_ratings'], league_data['players'] = measure(
+    transform_data_yahoo.adjust_player_ratings, league_copy, repeat
+  )
+  results['yahoo.truncate_and_map_player_ids'], _ = measure(
+    transform_data_yahoo.truncate_and_map_player_ids, league_copy, repeat
+  )
+
+  if 'daily' in league_data:
+    results['yahoo.map_daily_player_ids'], _ = measure(
+      transform_data_yahoo.map_daily_player_ids, league_copy, repeat
+    )
+
+  return results, league_data
+
+
+def get_payloads(args):
+  """
+  Payloads to run as {label: {platform: {endpoint: data}}}, recorded leagues
+  when a fixture directory is given, synthetic seasons otherwise. The label
+  is None for a single season. Synthetic Yahoo player data is the ESPN
+  output, as in production
+  """
+  if args.fixtures:
+    leagues = load_recorded_leagues(args.fixtures)
+
+    if not leagues:
+      sys.exit(f"No recorded payloads found in {args.fixtures}")
+
+    return leagues
+
+  espn_seasons = make_espn_seasons(args.seasons, args.teams, args.weeks, args.players, seed=args.seed)
+  current_year = max(espn_seasons)
+
+  seasons = {}
+  for year, espn in espn_seasons.items():
+    players_records = df_to_records(transform_raw_data.transform_players_to_df(espn['players']))
+    daily_records = df_to_records(transform_raw_data.transform_daily_to_df(espn['daily']))
+
+    # Seeded like the ESPN season, the current season matches a single season run
+    seed = args.seed + current_year - year
+    yahoo = make_yahoo_payloads(args.teams, args.weeks, args.players, players_records, daily_records, seed=seed)
+
+    seasons[year if args.seasons > 1 else None] = {'espn': espn, 'yahoo': yahoo}
+
+  return seasons
+
+
+def get_fixture_key(args):
+  """
+  Baselines are only comparable for the same fixtures
+  """
+  if args.fixtures:
+    return args.fixtures
+
+  fixture_key = f'synthetic-{args.teams}-{args.weeks}-{args.players}-{args.seed}'
+  if args.seasons > 1:
+    fixture_key += f'-{args.seasons}seasons'
+
+  return fixture_key
+
+
+def run_benchmarks(args):
+  results = {}
+
+  for label, payloads in get_payloads(args).items():
+    prefix = f'{label}.' if label is not None else ''
+
+    if 'espn' in payloads:
+      results.update({prefix + k: v for k, v in bench_espn(payloads['espn'], args.repeat)[0].items()})
+    if 'yahoo' in payloads:
+      results.update({prefix + k: v for k, v in bench_yahoo(payloads['yahoo'], args.repeat)[0].items()})
+
+  return results
+
+
+def update_baseline(results: dict, baseline: dict, reason: str = None):
+  """
+  New baseline entries from the results, a changed digest is appended to
+  the entry's history with the reason for the change
+  """
+  updated = {}
+
+  for name, result in results.items():
+    previous = baseline.get(name, {})
+    history = list(previous.get('history', []))
+
+    if previous.get('digest') and previous['digest'] != result['digest']:
+      history.append({'digest': previous['digest'], 'reason': reason})
+
+    updated[name] = {**result, 'history': history} if history else result
+
+  return updated
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float):
+  """
+  Returns digest mismatches and timing regressions against the baseline
+  """
+  mismatches = []
+  regressions = []
+
+  for name, result in results.items():
+    expected = baseline.get(name)
+
+    if not expected:
+      continue
+
+    if expected['digest'] != result['digest']:
+      mismatches.append(name)
+
+    if expected['p50Ms'] > 0 and result['p50Ms'] > expected['p50Ms'] * (1 + threshold):
+      regressions.append((name, expected['p50Ms'], result['p50Ms']))
+
+  return mismatches, regressions
+
+
+def print_results(results: dict):
+  header = f"{'transform':40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rows':>8} {'rows/s':>12} {'peak KiB':>10}"
+  print(header)
+  print('-' * len(header))
+
+  for name, r in results.items():
+    rows_per_sec = f"{r['rowsPerSec']:.0f}" if r['rowsPerSec'] is not None else '-'
+    print(f"{name:40} {r['p50Ms']:>10.3f} {r['p95Ms']:>10.3f} {r['p99Ms']:>10.3f} {r['rows']:>8} {rows_per_sec:>12} {r['peakBytes'] / 1024:>10.1f}")
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Offline transform benchmarks')
+  parser.add_argument('--fixtures', help='directory of payloads recorded with PAYLOAD_RECORD_DIR')
+  parser.add_argument('--teams', type=int, default=12)
+  parser.add_argument('--weeks', type=int, default=20)
+  parser.add_argument('--players', type=int, default=1000)
+  parser.add_argument('--seasons', type=int, default=1, help='synthetic seasons of league history')
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--repeat', type=int, default=20)
+  parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+  parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 slowdown, 0.2 is 20%%')
+  parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 on timing regressions too')
+  parser.add_argument('--update-baseline', action='store_true')
+  parser.add_argument('--reason', help='why outputs changed, kept in the history of updated digests')
+  parser.add_argument('--output', help='write results as json')
+  args = parser.parse_args()
+
+  results = run_benchmarks(args)
+
+  print_results(results)
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(results, f, indent=2)
+
+  fixture_key = get_fixture_key(args)
+
+  baselines = {}
+  if os.path.exists(args.baseline):
+    with open(args.baseline) as f:
+      baselines = json.load(f)
+
+  if args.update_baseline:
+    baselines[fixture_key] = update_baseline(results, baselines.get(fixture_key, {}), args.reason)
+
+    with open(args.baseline, 'w') as f:
+      json.dump(baselines, f, indent=2, sort_keys=True)
+
+    print(f"Updated baseline {fixture_key} in {args.baseline}")
+    return 0
+
+  if fixture_key not in baselines:
+    print(f"No baseline for {fixture_key}, run with --update-baseline to create one")
+    return 0
+
+  mismatches, regressions = compare_to_baseline(results, baselines[fixture_key], args.threshold)
+
+  for name in mismatches:
+    print(f"OUTPUT CHANGED: {name}")
+
+  for name, before, after in regressions:
+    print(f"REGRESSION: {name} p50 {before:.3f} ms -> {after:.3f} ms")
+
+  if regressions and not args.fail_on_regression:
+    print("Timings are advisory, rerun the baseline on this machine to compare")
+
+  if not mismatches and not regressions:
+    print("Outputs match baseline, no regressions")
+
+  return 1 if mismatches or (regressions and args.fail_on_regression) else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
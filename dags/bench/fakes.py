@@ -0,0 +1,408 @@
+import io
+import os
+import re
+import sys
+import json
+import time
+import types
+import sqlite3
+import threading
+import traceback
+
+
+class FakeNoSuchKey(Exception):
+  """
+  Missing key error carrying the error code of botocore's ClientError
+  """
+  response = {'Error': {'Code': 'NoSuchKey'}}
+
+
+class FakeS3:
+  """
+  In-memory S3 serving both the boto3 client and resource calls the dags
+  make
+  """
+  def __init__(self):
+    self.objects = {}
+    self.lock = threading.Lock()
+
+  def put_object(self, Bucket, Key, Body, Metadata=None, **kwargs):
+    body = Body.encode('UTF-8') if isinstance(Body, str) else bytes(Body)
+
+    with self.lock:
+      self.objects[(Bucket, Key)] = (body, dict(Metadata or {}))
+
+    return {'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+  def get_object(self, Bucket, Key, **kwargs):
+    with self.lock:
+      obj = self.objects.get((Bucket, Key))
+
+    if obj is None:
+      raise FakeNoSuchKey(f"s3://{Bucket}/{Key} does not exist")
+
+    body, metadata = obj
+    return {'Body': io.BytesIO(body), 'Metadata': dict(metadata), 'ContentLength': len(body)}
+
+  def Object(self, bucket, key):
+    return FakeS3Object(self, bucket, key)
+
+
+class FakeS3Object:
+  def __init__(self, s3: FakeS3, bucket: str, key: str):
+    self.s3 = s3
+    self.bucket = bucket
+    self.key = key
+
+  def get(self):
+    return self.s3.get_object(Bucket=self.bucket, Key=self.key)
+
+
+class FakeLambdaContext:
+  """
+  Lambda context with a wall clock time budget
+  """
+  def __init__(self, timeout_ms: int = 900000):
+    self.timeout_ms = timeout_ms
+    self.started = time.monotonic()
+
+  def get_remaining_time_in_millis(self):
+    return int(self.timeout_ms - (time.monotonic() - self.started) * 1000)
+
+
+class FakeLambda:
+  """
+  Synchronous Lambda invoke running registered handlers in process. Payloads
+  and responses go through json as they would over the wire
+  """
+  def __init__(self, handlers: dict = None, invoke_latency_ms: float = 0, timeout_ms: int = 900000):
+    self.handlers = dict(handlers or {})
+    self.invoke_latency_ms = invoke_latency_ms
+    self.timeout_ms = timeout_ms
+    self.invocations = {}
+    self.lock = threading.Lock()
+
+  def invoke(self, FunctionName, InvocationType='RequestResponse', Payload='{}', **kwargs):
+    with self.lock:
+      self.invocations[FunctionName] = self.invocations.get(FunctionName, 0) + 1
+
+    if self.invoke_latency_ms:
+      time.sleep(self.invoke_latency_ms / 1000)
+
+    handler = self.handlers.get(FunctionName)
+    if handler is None:
+      raise ValueError(f"No harness handler for lambda {FunctionName}")
+
+    event = json.loads(Payload) if Payload else {}
+
+    try:
+      res = handler(event, FakeLambdaContext(self.timeout_ms))
+    except Exception as e:
+      traceback.print_exc()
+      error = json.dumps({'errorMessage': str(e), 'errorType': type(e).__name__})
+      return {'StatusCode': 200, 'FunctionError': 'Unhandled', 'Payload': io.BytesIO(error.encode('UTF-8'))}
+
+    return {'StatusCode': 200, 'Payload': io.BytesIO(json.dumps(res, default=str).encode('UTF-8'))}
+
+
+class FakeDynamo:
+  """
+  League items written through the upload API, only sizes are kept unless
+  asked for, as large load profiles would hold gigabytes of items
+  """
+  def __init__(self, keep_items: bool = False):
+    self.keep_items = keep_items
+    self.items = {}
+    self.item_bytes = {}
+    self.lock = threading.Lock()
+
+  def put(self, body: bytes):
+    item = json.loads(body)
+    key = (str(item.get('leagueId')), str(item.get('leagueYear')))
+
+    with self.lock:
+      self.item_bytes[key] = len(body)
+      if self.keep_items:
+        self.items[key] = item
+
+    return key
+
+
+class FakeFirebase:
+  """
+  Realtime database as a nested dict, supporting the get and multi-path
+  patch requests the dags make
+  """
+  def __init__(self, data: dict = None):
+    self.data = data or {}
+    self.lock = threading.Lock()
+
+  def split(self, path: str):
+    return [p for p in path.strip('/').split('/') if p]
+
+  def get(self, path: str):
+    with self.lock:
+      node = self.data
+      for part in self.split(path):
+        if not isinstance(node, dict) or part not in node:
+          return None
+        node = node[part]
+
+      return node
+
+  def set(self, path: str, value):
+    with self.lock:
+      parts = self.split(path)
+      node = self.data
+
+      for part in parts[:-1]:
+        node = node.setdefault(part, {})
+
+      node[parts[-1]] = value
+
+  def patch(self, path: str, updates: dict):
+    for key, value in updates.items():
+      self.set(f"{path}/{key}", value)
+
+
+def install_boto3_fakes(s3: FakeS3, lambda_client: FakeLambda):
+  """
+  Routes boto3 clients and resources to the fakes, before any dags module
+  creates one at import. A bare module stands in for boto3 when it isn't
+  installed. Returns a function undoing the patch
+  """
+  try:
+    import boto3
+    original = (boto3.client, boto3.resource)
+  except ImportError:
+    boto3 = sys.modules['boto3'] = types.ModuleType('boto3')
+    original = None
+
+  def restore():
+    if original is None:
+      sys.modules.pop('boto3', None)
+    else:
+      boto3.client, boto3.resource = original
+
+  def client(service_name, *args, **kwargs):
+    if service_name == 's3':
+      return s3
+    if service_name == 'lambda':
+      return lambda_client
+    raise ValueError(f"No harness fake for boto3 client {service_name}")
+
+  def resource(service_name, *args, **kwargs):
+    if service_name == 's3':
+      return s3
+    raise ValueError(f"No harness fake for boto3 resource {service_name}")
+
+  boto3.client = client
+  boto3.resource = resource
+
+  return restore
+
+
+# SQLite stand-in for the leagueids and linkedids tables. Timestamps are
+# stored as epoch seconds so the postgres interval arithmetic of the refresh
+# queries translates to plain numbers
+
+INTERVAL_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagueids (
+  leagueid TEXT NOT NULL,
+  platform TEXT NOT NULL,
+  active INTEGER NOT NULL DEFAULT 1,
+  created REAL,
+  lastviewed REAL,
+  lastupdated REAL,
+  viewcount INTEGER NOT NULL DEFAULT 0,
+  cookieswid TEXT,
+  cookieespns2 TEXT,
+  yahoorefreshtoken TEXT,
+  PRIMARY KEY (leagueid, platform)
+);
+CREATE TABLE IF NOT EXISTS linkedids (
+  linkedid TEXT PRIMARY KEY,
+  mainid TEXT NOT NULL
+);
+"""
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagueids (
+  leagueid TEXT NOT NULL,
+  platform TEXT NOT NULL,
+  active BOOLEAN NOT NULL DEFAULT TRUE,
+  created DATE,
+  lastviewed TIMESTAMP,
+  lastupdated TIMESTAMP,
+  viewcount INT NOT NULL DEFAULT 0,
+  cookieswid TEXT,
+  cookieespns2 TEXT,
+  yahoorefreshtoken TEXT,
+  PRIMARY KEY (leagueid, platform)
+);
+CREATE TABLE IF NOT EXISTS linkedids (
+  linkedid TEXT PRIMARY KEY,
+  mainid TEXT NOT NULL
+);
+"""
+
+
+def split_part(value, delimiter, n):
+  parts = str(value).split(delimiter)
+  return parts[n - 1] if 0 < n <= len(parts) else ''
+
+
+def translate_query(query: str, params=None):
+  """
+  Rewrites the postgres constructs used by the refresh queries for sqlite,
+  array parameters of = ANY(%s) are expanded into IN lists
+  """
+  now = repr(time.time())
+
+  query = query.replace('public.', '')
+  query = re.sub(r'NOW\(\)|CURRENT_TIMESTAMP', now, query, flags=re.I)
+  query = re.sub(
+    r"INTERVAL\s+'(\d+)\s+(second|minute|hour|day)s?'",
+    lambda m: str(int(m[1]) * INTERVAL_SECONDS[m[2].lower()]),
+    query,
+    flags=re.I
+  )
+  query = re.sub(r'EXTRACT\(EPOCH FROM ([^()]*)\)', r'(\1)', query, flags=re.I)
+  query = re.sub(r'(\w+\([^()]*\))::int', r'CAST(\1 AS INTEGER)', query)
+
+  pieces = query.split('%s')
+  translated = pieces[0]
+  values = []
+
+  for piece, value in zip(pieces[1:], params or []):
+    if isinstance(value, (list, tuple)):
+      translated = re.sub(r'=\s*ANY\($', 'IN (', translated, flags=re.I)
+      translated += ', '.join(['?'] * len(value)) or 'NULL'
+      values.extend(value)
+    else:
+      translated += '?'
+      values.append(value)
+
+    translated += piece
+
+  return translated, values
+
+
+class SqliteCursor:
+  def __init__(self, cursor):
+    self.cursor = cursor
+
+  def execute(self, query: str, params=None):
+    self.cursor.execute(*translate_query(query, params))
+
+  def fetchall(self):
+    return [dict(row) for row in self.cursor.fetchall()]
+
+  @property
+  def rowcount(self):
+    return self.cursor.rowcount
+
+
+class SqliteConnection:
+  """
+  psycopg2 style connection over sqlite, rows are always returned as dicts
+  like a RealDictCursor
+  """
+  def __init__(self, path: str = ':memory:'):
+    self.conn = sqlite3.connect(path, check_same_thread=False)
+    self.conn.row_factory = sqlite3.Row
+    self.conn.create_function('split_part', 3, split_part)
+    self.conn.executescript(SQLITE_SCHEMA)
+
+  def cursor(self, cursor_factory=None):
+    return SqliteCursor(self.conn.cursor())
+
+  def commit(self):
+    self.conn.commit()
+
+  def close(self):
+    self.conn.close()
+
+
+def connect_database(database_url: str = None):
+  """
+  A local postgres for postgres:// urls, sqlite otherwise (in memory by
+  default, or a file path)
+  """
+  if database_url and database_url.startswith(('postgres://', 'postgresql://')):
+    import psycopg2
+
+    conn = psycopg2.connect(database_url)
+
+    cursor = conn.cursor()
+    cursor.execute(POSTGRES_SCHEMA)
+    cursor.execute("TRUNCATE leagueids, linkedids")
+    conn.commit()
+
+    return conn
+
+  return SqliteConnection(database_url or ':memory:')
+
+
+def open_database(database_url: str = None, connect=None):
+  """
+  A new connection to an existing harness database, connect being the real
+  psycopg2.connect for postgres urls
+  """
+  if database_url and database_url.startswith(('postgres://', 'postgresql://')):
+    return connect(database_url)
+
+  return SqliteConnection(database_url or ':memory:')
+
+
+class ProcessConnections:
+  """
+  psycopg2.connect stand-in returning one connection per process, so forked
+  batch workers open their own instead of using the parent's. The database
+  must be a file or a server for workers to see the parent's rows
+  """
+  def __init__(self, conn, database_url: str = None, connect=None):
+    self.database_url = database_url
+    self.connect = connect
+    self.connections = {os.getpid(): conn}
+
+  def __call__(self, *args, **kwargs):
+    pid = os.getpid()
+
+    if pid not in self.connections:
+      self.connections[pid] = open_database(self.database_url, self.connect)
+
+    return self.connections[pid]
+
+
+def seed_leagues(conn, leagues: list, linked_ids: list = None):
+  """
+  Inserts league rows, timestamps given as epoch seconds
+  """
+  from datetime import datetime
+
+  cursor = conn.cursor()
+  postgres = not isinstance(conn, SqliteConnection)
+
+  def ts(value):
+    return datetime.utcfromtimestamp(value) if postgres and value is not None else value
+
+  for league in leagues:
+    cursor.execute(
+      """
+      INSERT INTO leagueids (leagueid, platform, active, lastviewed, lastupdated, viewcount, cookieswid, cookieespns2, yahoorefreshtoken)
+      VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+      """,
+      (
+        league['leagueid'], league['platform'], True if postgres else 1,
+        ts(league['lastviewed']), ts(league['lastupdated']), league['viewcount'],
+        league.get('cookieswid'), league.get('cookieespns2'), league.get('yahoorefreshtoken')
+      )
+    )
+
+  for main_id, linked_id in linked_ids or []:
+    cursor.execute("INSERT INTO linkedids (linkedid, mainid) VALUES (%s, %s)", (linked_id, main_id))
+
+  conn.commit()
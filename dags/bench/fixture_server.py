@@ -0,0 +1,298 @@
+import json
+import time
+import random
+import zlib
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from fixtures import ESPN_VIEW_ENDPOINTS, make_espn_payloads, make_yahoo_payloads
+
+
+ESPN_HOST = 'lm-api-reads.fantasy.espn.com'
+YAHOO_HOST = 'fantasysports.yahooapis.com'
+YAHOO_LOGIN_HOST = 'api.login.yahoo.com'
+FIREBASE_HOST = 'fantasy-cc6ec-default-rtdb.firebaseio.com'
+DYNAMO_API_HOST = 'p5v5a0pnfi.execute-api.us-east-1.amazonaws.com'
+
+REDIRECT_HOSTS = [ESPN_HOST, YAHOO_HOST, YAHOO_LOGIN_HOST, FIREBASE_HOST, DYNAMO_API_HOST]
+
+# Leagues the dags read shared data from, never given injected errors
+DEFAULT_ESPN_LEAGUE_ID = '1978554631'
+YAHOO_PLAYER_LIST_LEAGUE = '454.l.52531'
+
+YAHOO_PLAYERS_PAGE_SIZE = 25
+
+# Harness refresh tokens are the prefix and the league key
+REFRESH_TOKEN_PREFIX = 'refresh-'
+
+
+class FixtureSet:
+  """
+  Synthetic league payloads, a few variants of different league sizes shared
+  by all leagues so ten thousand leagues don't need ten thousand payload sets
+  """
+  def __init__(self, year: int, scoring_period: int, team_counts: list = (8, 10, 12, 14), num_weeks: int = 20, num_players: int = 1000, seed: int = 0):
+    self.year = year
+    self.scoring_period = scoring_period
+
+    self.common = make_espn_payloads(12, num_weeks, num_players, year, seed)
+
+    self.espn_variants = []
+    for i, num_teams in enumerate(team_counts):
+      payloads = make_espn_payloads(num_teams, num_weeks, num_players, year, seed + i + 1)
+      payloads.pop('players')
+
+      self.espn_variants.append(payloads)
+
+    # Yahoo leagues name the same players as the ESPN common data
+    names = [p['player']['fullName'] for p in self.common['players']['players']]
+    players_records = [{'playerName': name} for name in names]
+
+    self.yahoo_variants = []
+    for i, num_teams in enumerate(team_counts):
+      payloads = make_yahoo_payloads(num_teams, num_weeks, num_players, players_records, seed=seed + i + 1)
+      payloads.pop('players')
+      payloads.pop('daily')
+
+      self.yahoo_variants.append(payloads)
+
+    self.yahoo_players_id_map = self.yahoo_variants[0]['players_id_map']
+
+  def get_variant(self, variants: list, league_id: str):
+    return variants[zlib.crc32(str(league_id).encode('UTF-8')) % len(variants)]
+
+
+class FixtureServer:
+  """
+  Local HTTP server standing in for the ESPN and Yahoo APIs, the Yahoo login,
+  the DynamoDB upload API and Firebase. League data responses are delayed by
+  latency_ms plus up to jitter_ms and fail with error_rate probability
+  """
+  def __init__(self, fixtures: FixtureSet, dynamo, firebase, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, seed: int = 0):
+    self.fixtures = fixtures
+    self.dynamo = dynamo
+    self.firebase = firebase
+    self.latency_ms = latency_ms
+    self.jitter_ms = jitter_ms
+    self.error_rate = error_rate
+
+    self.rng = random.Random(seed)
+    self.lock = threading.Lock()
+    self.requests = Counter()
+    self.errors = Counter()
+    self.bytes_sent = 0
+
+    self.httpd = None
+    self.thread = None
+
+  @property
+  def base_url(self):
+    host, port = self.httpd.server_address[:2]
+    return f"http://{host}:{port}"
+
+  def start(self):
+    server = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def log_message(self, format, *args):
+        pass
+
+      def handle_method(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        status, data = server.route(self.command, self.path, body, self.headers)
+        payload = json.dumps(data).encode('UTF-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+        with server.lock:
+          server.bytes_sent += len(payload)
+
+      do_GET = do_POST = do_PUT = do_PATCH = handle_method
+
+    self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    self.httpd.daemon_threads = True
+
+    self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    self.thread.start()
+
+    return self
+
+  def stop(self):
+    if self.httpd is not None:
+      self.httpd.shutdown()
+      self.httpd.server_close()
+
+  def count(self, name: str):
+    with self.lock:
+      self.requests[name] += 1
+
+  def simulate_network(self, name: str):
+    """
+    Sleeps for the configured latency, returning True when the request
+    should fail
+    """
+    with self.lock:
+      delay = self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+      failed = self.rng.random() < self.error_rate
+
+      if failed:
+        self.errors[name] += 1
+
+    if delay > 0:
+      time.sleep(delay / 1000)
+
+    return failed
+
+  def route(self, method: str, path: str, body: bytes, headers: dict = None):
+    host, _, rest = path.lstrip('/').partition('/')
+    parts = urlsplit('/' + rest)
+    query = parse_qs(parts.query)
+
+    try:
+      if host == ESPN_HOST:
+        return self.route_espn(parts.path, query)
+      if host == YAHOO_HOST:
+        return self.route_yahoo(parts.path, headers or {})
+      if host == YAHOO_LOGIN_HOST:
+        return self.route_yahoo_login(body)
+      if host == FIREBASE_HOST:
+        return self.route_firebase(method, parts.path, body)
+      if host == DYNAMO_API_HOST:
+        self.count('dynamo.put')
+        self.dynamo.put(body)
+        return 200, {}
+    except Exception as e:
+      print(f"Fixture server error for {method} {path}: {e}")
+      return 500, {'error': str(e)}
+
+    return 404, {'error': f"No fixture route for {host}"}
+
+  def route_espn(self, path: str, query: dict):
+    segments = [s for s in path.split('/') if s]
+
+    # /apis/v3/games/fba/seasons/
+    if segments[-1] == 'seasons':
+      self.count('espn.seasons')
+      return 200, [{'id': self.fixtures.year}]
+
+    league_id = segments[-1]
+    view = '+'.join(query.get('view', []))
+    self.count(f'espn.{view}')
+
+    if view == 'scoringperiodid':
+      return 200, {'scoringPeriodId': self.fixtures.scoring_period + 1}
+
+    if league_id == DEFAULT_ESPN_LEAGUE_ID:
+      payloads = self.fixtures.common
+    else:
+      if self.simulate_network(f'espn.{view}'):
+        return 503, {'messages': ['Injected error']}
+
+      payloads = self.fixtures.get_variant(self.fixtures.espn_variants, league_id)
+
+    # Common players are fetched with and without ratings
+    endpoint = 'players' if view == 'kona_player_info' else ESPN_VIEW_ENDPOINTS.get(view)
+
+    if endpoint in ('players', 'daily'):
+      return 200, self.fixtures.common[endpoint]
+    if endpoint in payloads:
+      return 200, payloads[endpoint]
+
+    return 404, {'messages': [f'No fixture for view {view}']}
+
+  def route_yahoo(self, path: str, headers: dict):
+    segments = [s for s in path.split('/') if s]
+
+    # /fantasy/v2/users;use_login=1/games/leagues/, the harness token names the league
+    if segments[2].startswith('users'):
+      self.count('yahoo.users')
+
+      token = headers.get('Authorization', '').split(' ')[-1]
+      league_key = token.split(REFRESH_TOKEN_PREFIX)[-1]
+      league = {'league': {'season': str(self.fixtures.year - 1), 'league_key': league_key}}
+
+      return 200, {'fantasy_content': {'users': [
+        {'user': {'games': [{'game': {'code': 'nba', 'leagues': [league]}}]}}
+      ]}}
+
+    league_key = segments[3]
+    resource = segments[4]
+
+    if league_key == YAHOO_PLAYER_LIST_LEAGUE and resource.startswith('players'):
+      self.count('yahoo.players')
+
+      start = int(resource.split('start=')[1]) if 'start=' in resource else 0
+      page = self.fixtures.yahoo_players_id_map[start:start + YAHOO_PLAYERS_PAGE_SIZE]
+
+      return 200, {'fantasy_content': {'league': {'players': [
+        {'player': {'player_id': p['playerId'], 'name': {'full': p['playerName']}}} for p in page
+      ]}}}
+
+    if resource == 'settings':
+      endpoint = 'settings'
+    elif resource == 'teams':
+      endpoint = 'rosters' if 'roster' in segments[5:] else 'teams'
+    elif resource.startswith('scoreboard'):
+      endpoint = 'scoreboard'
+    elif resource == 'draftresults':
+      endpoint = 'draft'
+    else:
+      return 404, {'error': f'No fixture for {resource}'}
+
+    self.count(f'yahoo.{endpoint}')
+
+    if self.simulate_network(f'yahoo.{endpoint}'):
+      return 503, {'error': 'Injected error'}
+
+    return 200, self.fixtures.get_variant(self.fixtures.yahoo_variants, league_key)[endpoint]
+
+  def route_yahoo_login(self, body: bytes):
+    self.count('yahoo.token')
+
+    form = parse_qs(body.decode('UTF-8'))
+    code = (form.get('refresh_token') or form.get('code') or [''])[0]
+
+    return 200, {'access_token': f'token-{code}', 'refresh_token': code}
+
+  def route_firebase(self, method: str, path: str, body: bytes):
+    path = path[:-len('.json')] if path.endswith('.json') else path
+    self.count(f'firebase.{method.lower()}')
+
+    if method == 'PATCH':
+      self.firebase.patch(path, json.loads(body))
+      return 200, {}
+
+    return 200, self.firebase.get(path)
+
+
+def install_redirect(base_url: str, hosts: list = REDIRECT_HOSTS):
+  """
+  Sends requests for the given hosts to the fixture server instead, for
+  every requests session including ones created inside the dags
+  """
+  original_send = requests.adapters.HTTPAdapter.send
+
+  def send(adapter, request, **kwargs):
+    parts = urlsplit(request.url)
+
+    if parts.hostname in hosts:
+      request.url = f"{base_url}/{parts.hostname}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+      kwargs['proxies'] = {}
+
+    return original_send(adapter, request, **kwargs)
+
+  requests.adapters.HTTPAdapter.send = send
+
+  return original_send
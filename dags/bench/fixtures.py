@@ -0,0 +1,333 @@
+import os
+import json
+import gzip
+import random
+
+import consts
+
+
+# ESPN views recorded by extract_from_espn_api, mapped to transform endpoints
+ESPN_VIEW_ENDPOINTS = {
+  'mSettings': 'settings',
+  'mTeam': 'teams',
+  'mRoster': 'rosters',
+  'mScoreboard': 'scoreboard',
+  'mDraftDetail': 'draft',
+  'kona_player_info+mStatRatings': 'players',
+  'kona_playercard': 'daily',
+}
+
+# Default ESPN 9 category league
+CATEGORY_IDS = [
+  consts.PTS, consts.BLKS, consts.STLS, consts.ASTS, consts.REBS,
+  consts.TOS, consts.THREES, consts.FG_PER, consts.FT_PER
+]
+
+STAT_IDS = [
+  consts.PTS, consts.BLKS, consts.STLS, consts.ASTS, consts.OREBS, consts.DREBS,
+  consts.REBS, consts.EJS, consts.TOS, consts.FG_MADE, consts.FG_ATT,
+  consts.FT_MADE, consts.FT_ATT, consts.THREES, consts.THREEA, consts.FG_PER,
+  consts.FT_PER, consts.MINS
+]
+
+PERIOD_KEYS = [consts.SEASON, consts.LAST7, consts.LAST15, consts.LAST30]
+
+# Yahoo stat ids of the same categories
+YAHOO_STAT_IDS = {espn: yahoo for yahoo, espn in consts.STAT_IDS_MAP_TO_ESPN.items() if espn != -1}
+
+
+def load_recorded_fixtures(fixture_dir: str):
+  """
+  Loads the payloads of one recorded league directory, as
+  {platform: {endpoint: data}}
+  """
+  fixtures = {}
+
+  if not fixture_dir or not os.path.isdir(fixture_dir):
+    return fixtures
+
+  for filename in sorted(os.listdir(fixture_dir)):
+    if not (filename.endswith('.json') or filename.endswith('.json.gz')):
+      continue
+
+    platform, name = filename.split('.json')[0].split('_', 1)
+    endpoint = ESPN_VIEW_ENDPOINTS.get(name, name) if platform == 'espn' else name
+
+    path = os.path.join(fixture_dir, filename)
+    opener = gzip.open if filename.endswith('.gz') else open
+
+    with opener(path, 'rt') as f:
+      fixtures.setdefault(platform, {})[endpoint] = json.load(f)
+
+  return fixtures
+
+
+def load_recorded_leagues(fixture_dir: str):
+  """
+  Payloads of every league directory saved with PAYLOAD_RECORD_DIR, keyed by
+  directory name (league id, and season for ESPN). A directory holding
+  payloads itself loads as a single unnamed league
+  """
+  leagues = {}
+
+  if not fixture_dir or not os.path.isdir(fixture_dir):
+    return leagues
+
+  fixtures = load_recorded_fixtures(fixture_dir)
+  if fixtures:
+    leagues[None] = fixtures
+
+  for name in sorted(os.listdir(fixture_dir)):
+    path = os.path.join(fixture_dir, name)
+
+    if os.path.isdir(path):
+      fixtures = load_recorded_fixtures(path)
+
+      if fixtures:
+        leagues[name] = fixtures
+
+  return leagues
+
+
+def random_stats(rng, scale: float = 1.0):
+  stats = {id: round(rng.uniform(0, 20) * scale, 2) for id in STAT_IDS}
+
+  stats[consts.FG_ATT] = round(stats[consts.FG_MADE] / rng.uniform(0.35, 0.6), 2)
+  stats[consts.FT_ATT] = round(stats[consts.FT_MADE] / rng.uniform(0.6, 0.9), 2)
+  stats[consts.FG_PER] = round(stats[consts.FG_MADE] / stats[consts.FG_ATT], 4) if stats[consts.FG_ATT] else 0
+  stats[consts.FT_PER] = round(stats[consts.FT_MADE] / stats[consts.FT_ATT], 4) if stats[consts.FT_ATT] else 0
+
+  return stats
+
+
+def make_espn_payloads(num_teams: int = 12, num_weeks: int = 20, num_players: int = 1000, year: int = 2025, seed: int = 0, previous_seasons: list = None):
+  """
+  Synthetic ESPN API payloads in the shapes the transforms read
+  """
+  rng = random.Random(seed)
+
+  team_ids = list(range(1, num_teams + 1))
+  roster_size = 13
+
+  players = []
+  for p in range(num_players):
+    stats = [
+      {'seasonId': year, 'id': f'0{key}{year}', 'averageStats': random_stats(rng)}
+      for key in PERIOD_KEYS
+    ]
+    ratings = {
+      key: {
+        'totalRating': rng.uniform(-5, 15),
+        'totalRanking': rng.randint(1, num_players),
+        'statRankings': [{'forStat': int(id), 'rating': rng.uniform(-2, 3)} for id in CATEGORY_IDS]
+      }
+      for key in PERIOD_KEYS
+    }
+
+    players.append({
+      'id': 1000 + p,
+      'onTeamId': 0,
+      'player': {
+        'fullName': f'Player {p}',
+        'injuryStatus': 'ACTIVE',
+        'proTeamId': rng.randint(1, 30),
+        'ownership': {'percentOwned': rng.uniform(0, 100)},
+        'stats': stats
+      },
+      'ratings': ratings
+    })
+
+  owned = [1000 + p for p in range(min(num_players, num_teams * roster_size))]
+
+  rosters = {'teams': [
+    {'id': team_id, 'roster': {'entries': [
+      {'playerId': player_id, 'lineupSlotId': rng.randint(0, 12), 'acquisitionType': 'DRAFT'}
+      for player_id in owned[i::num_teams]
+    ]}}
+    for i, team_id in enumerate(team_ids)
+  ]}
+
+  teams = {
+    'teams': [
+      {
+        'id': team_id,
+        'name': f'Team {team_id}',
+        'abbrev': f'T{team_id}',
+        'playoffSeed': team_id,
+        'record': {'overall': {'wins': rng.randint(0, num_weeks), 'losses': rng.randint(0, num_weeks)}},
+        'primaryOwner': f'member{team_id}'
+      }
+      for team_id in team_ids
+    ],
+    'members': [{'id': f'member{team_id}', 'firstName': 'First', 'lastName': f'Last{team_id}'} for team_id in team_ids]
+  }
+
+  current_week = max(1, num_weeks - 1)
+  schedule = []
+  match_id = 1
+  for week in range(1, num_weeks + 1):
+    order = team_ids[:]
+    rng.shuffle(order)
+
+    for home, away in zip(order[::2], order[1::2]):
+      def side(team_id):
+        scores = None
+        if week < current_week:
+          scores = {id: {'score': v} for id, v in random_stats(rng, 10).items()}
+
+        return {'teamId': team_id, 'totalPoints': rng.uniform(500, 1500), 'cumulativeScore': {'scoreByStat': scores}}
+
+      schedule.append({
+        'id': match_id,
+        'home': side(home),
+        'away': side(away),
+        'winner': rng.choice(['HOME', 'AWAY']) if week < current_week else 'UNDECIDED'
+      })
+      match_id += 1
+
+  scoreboard = {
+    'schedule': schedule,
+    'teams': [{'id': team_id} for team_id in team_ids],
+    'status': {'currentMatchupPeriod': current_week}
+  }
+
+  draft = {'draftDetail': {'picks': [
+    {'overallPickNumber': i + 1, 'roundId': i // num_teams + 1, 'teamId': team_ids[i % num_teams], 'playerId': player_id}
+    for i, player_id in enumerate(owned)
+  ]}}
+
+  settings = {
+    'status': {'isActive': True, 'currentMatchupPeriod': current_week, 'previousSeasons': list(previous_seasons or [])},
+    'settings': {
+      'scoringSettings': {
+        'scoringType': 'H2H_MOST_CATEGORIES',
+        'scoringItems': [{'statId': int(id)} for id in CATEGORY_IDS]
+      },
+      'scheduleSettings': {'playoffTeamCount': min(6, num_teams), 'matchupPeriodCount': num_weeks}
+    }
+  }
+
+  daily = {'players': [
+    {
+      'id': player['id'],
+      'onTeamId': rng.choice(team_ids + [0]),
+      'player': {'fullName': player['player']['fullName'], 'stats': [{'stats': random_stats(rng)}]}
+    }
+    for player in players[:250]
+  ]}
+
+  return {
+    'settings': settings,
+    'teams': teams,
+    'rosters': rosters,
+    'scoreboard': scoreboard,
+    'draft': draft,
+    'players': {'players': players},
+    'daily': daily
+  }
+
+
+def make_espn_seasons(num_seasons: int = 1, num_teams: int = 12, num_weeks: int = 20, num_players: int = 1000, year: int = 2025, seed: int = 0):
+  """
+  Payloads of a league's current and previous seasons keyed by year, as
+  processed when a league with history is onboarded. The current season
+  matches make_espn_payloads with the same seed
+  """
+  years = list(range(year - num_seasons + 1, year + 1))
+
+  return {
+    season: make_espn_payloads(num_teams, num_weeks, num_players, season, seed + year - season, [y for y in years if y < season])
+    for season in years
+  }
+
+
+def make_yahoo_payloads(num_teams: int = 12, num_weeks: int = 20, num_players: int = 1000, players_records: list = None, daily_records: list = None, seed: int = 0):
+  """
+  Synthetic Yahoo API payloads. Player, id map and daily data are the
+  records produced from ESPN data, as served from S3
+  """
+  rng = random.Random(seed)
+
+  team_ids = list(range(1, num_teams + 1))
+  roster_size = 13
+  league_key = '454.l.1'
+
+  players_records = players_records or []
+  names = [p['playerName'] for p in players_records] or [f'Player {p}' for p in range(num_players)]
+  players_id_map = [{'playerName': name, 'playerId': str(5000 + i)} for i, name in enumerate(names)]
+
+  owned = [m['playerId'] for m in players_id_map[:num_teams * roster_size]]
+
+  def team(team_id, extra):
+    return {'team': {'team_id': str(team_id), **extra}}
+
+  settings = {'fantasy_content': {'league': {
+    'start_week': 1,
+    'current_week': max(1, num_weeks - 1),
+    'end_week': num_weeks,
+    'scoring_type': 'head',
+    'settings': {
+      'num_playoff_teams': min(6, num_teams),
+      'playoff_start_week': num_weeks + 1,
+      'stat_categories': {'stats': [{'stat': {'stat_id': int(YAHOO_STAT_IDS[id])}} for id in CATEGORY_IDS if id in YAHOO_STAT_IDS]}
+    }
+  }}}
+
+  teams = {'fantasy_content': {'league': {'teams': [
+    team(team_id, {
+      'name': f'Team {team_id}',
+      'team_standings': {'rank': team_id, 'outcome_totals': {'wins': rng.randint(0, num_weeks), 'losses': rng.randint(0, num_weeks)}},
+      'managers': [{'manager': {'nickname': f'Manager {team_id}'}}]
+    })
+    for team_id in team_ids
+  ]}}}
+
+  rosters = {'fantasy_content': {'league': {'teams': [
+    team(team_id, {'roster': {'players': [
+      {'player': {'player_id': player_id, 'selected_position': {'position': 'UTIL'}}}
+      for player_id in owned[i::num_teams]
+    ]}})
+    for i, team_id in enumerate(team_ids)
+  ]}}}
+
+  matchups = []
+  for week in range(1, num_weeks + 1):
+    order = team_ids[:]
+    rng.shuffle(order)
+
+    for home, away in zip(order[::2], order[1::2]):
+      matchups.append({'matchup': {'week': str(week), 'teams': [
+        team(team_id, {
+          'win_probability': rng.random(),
+          'team_stats': {'stats': [
+            {'stat': {'stat_id': YAHOO_STAT_IDS[id], 'value': str(v if id in consts.PERCENT_COMPONENTS else int(v))}}
+            for id, v in random_stats(rng, 10).items() if id in YAHOO_STAT_IDS
+          ]}
+        })
+        for team_id in (home, away)
+      ]}})
+
+  scoreboard = {'fantasy_content': {'league': {'scoreboard': {'matchups': matchups}}}}
+
+  draft = {'fantasy_content': {'league': {'draft_results': [
+    {'draft_result': {
+      'pick': i + 1,
+      'round': i // num_teams + 1,
+      'team_key': f'{league_key}.t.{team_ids[i % num_teams]}',
+      'player_key': f'454.p.{player_id}'
+    }}
+    for i, player_id in enumerate(owned)
+  ]}}}
+
+  daily = [{**d, 'playerName': d.get('fullName')} for d in (daily_records or [])]
+
+  return {
+    'settings': settings,
+    'teams': teams,
+    'rosters': rosters,
+    'scoreboard': scoreboard,
+    'draft': draft,
+    'players': players_records,
+    'players_id_map': players_id_map,
+    'daily': daily
+  }
@@ -0,0 +1,300 @@
+"""
+End-to-end local run of the league refresh, no AWS, Supabase, Firebase,
+ESPN or Yahoo access needed.
+
+  python dags/bench/harness.py --platform espn --profile smoke
+  python dags/bench/harness.py --platform espn --profile smoke --batch-workers 4
+  python dags/bench/harness.py --platform yahoo --profile medium --batch-workers 4
+  python dags/bench/harness.py --profile large --latency-ms 200 --error-rate 0.05
+  python dags/bench/harness.py --database-url postgresql://localhost/fantasy
+
+update_espn_leagues or process_all_yahoo_leagues runs unchanged against a
+SQLite (or local postgres) leagueids table, in-memory S3, Lambda, DynamoDB
+and Firebase fakes, and a local HTTP server replaying synthetic ESPN and
+Yahoo payloads with the profile's latency and error rate. Concurrency and
+caching changes can then be compared under realistic network conditions.
+Analytics settings such as PLAYOFF_SIMULATIONS are read from the
+environment as in production.
+
+With --batch-workers above 1 the batch handlers fork a process pool inside
+the harness process. Each worker resets its HTTP sessions through
+batch.init_league_worker as in production, and psycopg2.connect returns a
+connection per process, the database being a temporary sqlite file rather
+than in memory so workers see the seeded rows. Fake S3 writes made by a
+worker stay in that worker, the harness only reads league results, which
+come back through the pool.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+import numpy as np
+import requests
+import requests.adapters
+
+DAGS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DAGS_DIR)
+
+import artifact_store
+from fakes import (
+  FakeS3,
+  FakeLambda,
+  FakeLambdaContext,
+  FakeDynamo,
+  FakeFirebase,
+  install_boto3_fakes,
+  connect_database,
+  seed_leagues,
+  ProcessConnections
+)
+from fixture_server import FixtureSet, FixtureServer, install_redirect, REFRESH_TOKEN_PREFIX
+
+
+# Leagues refreshed per run and the network conditions of the APIs
+LOAD_PROFILES = {
+  'smoke': {'leagues': 10, 'latencyMs': 0, 'jitterMs': 0, 'errorRate': 0, 'invokeLatencyMs': 0},
+  'small': {'leagues': 100, 'latencyMs': 50, 'jitterMs': 50, 'errorRate': 0.01, 'invokeLatencyMs': 20},
+  'medium': {'leagues': 1000, 'latencyMs': 80, 'jitterMs': 100, 'errorRate': 0.02, 'invokeLatencyMs': 30},
+  'large': {'leagues': 10000, 'latencyMs': 120, 'jitterMs': 200, 'errorRate': 0.03, 'invokeLatencyMs': 50},
+}
+
+BATCH_FUNCTIONS = {
+  'espn': 'process_espn_leagues_batch',
+  'yahoo': 'process_yahoo_leagues_batch',
+}
+
+
+def make_league_rows(platform: str, num_leagues: int, seed: int = 0):
+  """
+  leagueids rows due for a refresh, viewed within the week and updated more
+  than two hours ago. Yahoo leagues also get their linkedids row
+  """
+  rng = random.Random(seed)
+  now = time.time()
+
+  leagues = []
+  linked_ids = []
+
+  for i in range(num_leagues):
+    league = {
+      'platform': platform,
+      'lastviewed': now - rng.uniform(0, 6.5) * 86400,
+      'lastupdated': now - rng.uniform(2.5, 72) * 3600,
+      'viewcount': rng.randint(2, 200),
+    }
+
+    if platform == 'espn':
+      league['leagueid'] = str(10000000 + i)
+      league['cookieswid'] = f'{{harness-swid-{i}}}'
+      league['cookieespns2'] = f'harness-espn-s2-{i}'
+    else:
+      league['leagueid'] = f'454.l.{100000 + i}'
+      league['yahoorefreshtoken'] = REFRESH_TOKEN_PREFIX + league['leagueid']
+      linked_ids.append((league['leagueid'], league['leagueid']))
+
+    leagues.append(league)
+
+  return leagues, linked_ids
+
+
+def collect_batch_results(handler, results: list, max_workers: int):
+  """
+  Wraps a batch lambda handler, keeping each league's result for the report
+  """
+  def wrapper(event, context):
+    event.setdefault('maxWorkers', max_workers)
+
+    res = handler(event, context)
+    results.extend(res.get('body') or [])
+
+    return res
+
+  return wrapper
+
+
+def get_percentiles(values: list):
+  if not values:
+    return {}
+
+  return {f'p{p}': round(float(np.percentile(values, p)), 2) for p in (50, 95, 99)}
+
+
+@contextlib.contextmanager
+def patched(obj, name: str, value):
+  """
+  Sets an attribute for the duration of a run, restoring it afterwards
+  """
+  original = getattr(obj, name)
+  setattr(obj, name, value)
+
+  try:
+    yield original
+  finally:
+    setattr(obj, name, original)
+
+
+@contextlib.contextmanager
+def artifact_root(root: str):
+  """
+  Points the artifact store at a root for the duration of a run, also for
+  an artifact_store imported before the harness
+  """
+  previous = os.environ.get('FANTASY_ARTIFACT_ROOT')
+  os.environ['FANTASY_ARTIFACT_ROOT'] = root
+
+  try:
+    with patched(artifact_store, 'ARTIFACT_ROOT', root):
+      yield root
+  finally:
+    if previous is None:
+      os.environ.pop('FANTASY_ARTIFACT_ROOT', None)
+    else:
+      os.environ['FANTASY_ARTIFACT_ROOT'] = previous
+
+
+def run_harness(platform: str, profile: dict, database_url: str = None, lambda_timeout_s: int = 900, batch_workers: int = 1, year: int = 2025, scoring_period: int = 100, keep_items: bool = False, seed: int = 0, log_file=None):
+  """
+  Runs one refresh of a platform against the fakes, returning a report.
+  Everything patched for the run is restored when it returns, the dags
+  modules it imported keep the fakes they were created with
+  """
+  s3 = FakeS3()
+  dynamo = FakeDynamo(keep_items)
+  firebase = FakeFirebase()
+  lambda_client = FakeLambda(
+    {'get_secret': lambda event, context: {'body': 'harness-secret'}},
+    profile['invokeLatencyMs'],
+    lambda_timeout_s * 1000
+  )
+
+  fixtures = FixtureSet(year, scoring_period, seed=seed)
+  results = []
+
+  with contextlib.ExitStack() as stack:
+    stack.enter_context(artifact_root(
+      os.environ.get('FANTASY_ARTIFACT_ROOT') or tempfile.mkdtemp(prefix='fantasy_harness_')
+    ))
+
+    server = FixtureServer(fixtures, dynamo, firebase, profile['latencyMs'], profile['jitterMs'], profile['errorRate'], seed).start()
+    stack.callback(server.stop)
+
+    original_send = install_redirect(server.base_url)
+    stack.callback(setattr, requests.adapters.HTTPAdapter, 'send', original_send)
+    stack.callback(install_boto3_fakes(s3, lambda_client))
+
+    # Forked workers can't reach an in memory database
+    if database_url is None and batch_workers > 1:
+      database_url = os.path.join(tempfile.mkdtemp(prefix='fantasy_harness_db_'), 'leagues.sqlite')
+
+    conn = connect_database(database_url)
+    leagues, linked_ids = make_league_rows(platform, profile['leagues'], seed)
+    seed_leagues(conn, leagues, linked_ids)
+
+    import psycopg2
+    stack.enter_context(patched(psycopg2, 'connect', ProcessConnections(conn, database_url, psycopg2.connect)))
+
+    # Common data of the previous scoring period was already posted
+    firebase.set(f'v1/{year}/common/scoring_period', str(scoring_period - 1))
+
+    stack.enter_context(contextlib.redirect_stdout(log_file or sys.stdout))
+
+    # The dags fetch the league year and scoring period at import, so they
+    # are only imported once the fakes are in place
+    import upload_to_cloud
+    stack.enter_context(patched(upload_to_cloud, 'get_authed_session', requests.Session))
+
+    import process_espn
+    lambda_client.handlers[BATCH_FUNCTIONS['espn']] = collect_batch_results(process_espn.process_espn_leagues_batch, results, batch_workers)
+
+    if platform == 'yahoo':
+      import process_yahoo
+      lambda_client.handlers[BATCH_FUNCTIONS['yahoo']] = collect_batch_results(process_yahoo.process_yahoo_leagues_batch, results, batch_workers)
+
+      # Yahoo leagues read the player data the ESPN refresh publishes
+      process_espn.process_espn_common()
+      driver = process_yahoo.process_all_yahoo_leagues
+    else:
+      driver = process_espn.update_espn_leagues
+
+    start = time.perf_counter()
+    driver({}, FakeLambdaContext(lambda_timeout_s * 1000))
+    wall_seconds = time.perf_counter() - start
+
+  succeeded = [r for r in results if r.get('status') == 'SUCCESS']
+  league_ms = [r['metrics']['totalMs'] for r in results if r.get('metrics')]
+
+  return {
+    'platform': platform,
+    'profile': profile,
+    'batchWorkers': batch_workers,
+    'wallSeconds': round(wall_seconds, 2),
+    'leagues': len(leagues),
+    'processed': len(results),
+    'succeeded': len(succeeded),
+    'failed': len(results) - len(succeeded),
+    'deferred': len(leagues) - len(results),
+    'leaguesPerSecond': round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None,
+    'leagueMs': get_percentiles(league_ms),
+    'dynamoItems': len(dynamo.item_bytes),
+    'dynamoBytes': sum(dynamo.item_bytes.values()),
+    'lambdaInvocations': dict(lambda_client.invocations),
+    'requests': dict(server.requests),
+    'injectedErrors': dict(server.errors),
+    'bytesServed': server.bytes_sent,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description='End-to-end local refresh harness')
+  parser.add_argument('--platform', choices=list(BATCH_FUNCTIONS.keys()), default='espn')
+  parser.add_argument('--profile', choices=list(LOAD_PROFILES.keys()), default='smoke')
+  parser.add_argument('--leagues', type=int, help='overrides the profile league count')
+  parser.add_argument('--latency-ms', type=float)
+  parser.add_argument('--jitter-ms', type=float)
+  parser.add_argument('--error-rate', type=float)
+  parser.add_argument('--invoke-latency-ms', type=float)
+  parser.add_argument('--batch-workers', type=int, default=1, help='maxWorkers of each batch invocation')
+  parser.add_argument('--lambda-timeout-s', type=int, default=900)
+  parser.add_argument('--database-url', help='postgres url or sqlite file, in memory sqlite by default')
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--verbose', action='store_true', help='show the dags output')
+  parser.add_argument('--output', help='write the report as json')
+  args = parser.parse_args()
+
+  profile = dict(LOAD_PROFILES[args.profile])
+  overrides = {
+    'leagues': args.leagues,
+    'latencyMs': args.latency_ms,
+    'jitterMs': args.jitter_ms,
+    'errorRate': args.error_rate,
+    'invokeLatencyMs': args.invoke_latency_ms,
+  }
+  profile.update({k: v for k, v in overrides.items() if v is not None})
+
+  with open(os.devnull, 'w') as devnull:
+    report = run_harness(
+      args.platform,
+      profile,
+      database_url=args.database_url,
+      lambda_timeout_s=args.lambda_timeout_s,
+      batch_workers=args.batch_workers,
+      seed=args.seed,
+      log_file=None if args.verbose else devnull
+    )
+
+  print(json.dumps(report, indent=2))
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(report, f, indent=2)
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,92 @@
+import json
+import time
+import boto3
+import pandas as pd
+
+import consts
+from transform_data_yahoo import adjust_player_ratings
+
+
+bucket_name = 'nba-player-stats'
+
+# Common (non league specific) artifacts written by process_espn_common
+common_artifact_keys = {
+  'players': 'espn_players.json',
+  'daily': 'daily.json',
+  'rollingStats': 'rolling_stats.json',
+}
+
+s3 = boto3.resource('s3')
+
+S3_ARTIFACT_TTL_SECONDS = 1800
+s3_artifact_cache = {}
+
+
+def load_s3_artifact(bucket: str, key: str, with_metadata: bool = False):
+  """
+  Loads a shared json artifact from S3, cached in memory for a short time
+  """
+  cached = s3_artifact_cache.get((bucket, key))
+
+  if not cached or time.time() - cached[0] >= S3_ARTIFACT_TTL_SECONDS:
+    obj = s3.Object(bucket, key).get()
+    data = json.loads(obj["Body"].read().decode("utf-8"))
+
+    cached = (time.time(), data, obj.get("Metadata", {}))
+    s3_artifact_cache[(bucket, key)] = cached
+
+  if with_metadata:
+    return cached[1], cached[2]
+  return cached[1]
+
+
+def load_common_espn_data(scoring_period: str):
+  """
+  Loads the common player and daily data, keeping only artifacts produced
+  for the current scoring period
+  """
+  common_data = {}
+
+  for endpoint, key in common_artifact_keys.items():
+    try:
+      data, metadata = load_s3_artifact(bucket_name, key, with_metadata=True)
+    except Exception as e:
+      print(f"Common artifact {key} unavailable: {e}")
+      continue
+
+    artifact_period = metadata.get('scoringperiod')
+    if artifact_period != str(scoring_period):
+      print(f"Common artifact {key} stale ({artifact_period} != {scoring_period})")
+      continue
+
+    common_data[endpoint] = data
+
+  return common_data
+
+
+def get_common_endpoint_df(common_data: dict, endpoint: str, settings: pd.DataFrame):
+  """
+  Builds the league dataframe for an endpoint from common data, returns None
+  when the common data cannot serve the league and must be fetched instead
+  """
+  if endpoint not in common_data:
+    return None
+
+  df = pd.DataFrame.from_records(common_data[endpoint])
+
+  if endpoint != 'players' or df.empty:
+    return df
+
+  # Common ratings only cover the default league categories
+  league_ids = {str(id) for id in settings.iloc[0]["categoryIds"] if str(id) not in (consts.MINS, consts.FPTS)}
+  common_ratings = df["statRatingsSeason"].dropna()
+  common_ids = set(common_ratings.iloc[0].keys()) if not common_ratings.empty else set()
+
+  if not league_ids.issubset(common_ids):
+    print(f"League categories {sorted(league_ids - common_ids)} not in common players")
+    return None
+
+  if league_ids != common_ids:
+    df = adjust_player_ratings({"players": df, "settings": settings})
+
+  return df
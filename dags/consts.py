@@ -77,4 +77,56 @@ STAT_IDS_MAP_TO_ESPN = {
   STLS_Y: STLS,
   BLKS_Y: BLKS,
   TOS_Y: TOS
-}
\ No newline at end of file
+}
+
+# Scoreboard column for each ESPN category id
+CATEGORY_COLUMNS = {
+  PTS: 'pts',
+  BLKS: 'blks',
+  STLS: 'stls',
+  ASTS: 'asts',
+  OREBS: 'orebs',
+  DREBS: 'drebs',
+  REBS: 'rebs',
+  EJS: 'ejs',
+  FLAGS: 'flags',
+  PFS: 'pfs',
+  TECHS: 'techs',
+  TOS: 'tos',
+  DQS: 'dqs',
+  FG_MADE: 'fgMade',
+  FG_ATT: 'fgAtt',
+  FT_MADE: 'ftMade',
+  FT_ATT: 'ftAtt',
+  THREES: 'threes',
+  FG_PER: 'fgPer',
+  FT_PER: 'ftPer',
+}
+
+# Categories where the lower value wins
+INVERSE_CATEGORIES = [EJS, FLAGS, PFS, TECHS, TOS, DQS]
+
+# Made and attempted components of percentage categories
+PERCENT_COMPONENTS = {
+  FG_PER: (FG_MADE, FG_ATT),
+  FT_PER: (FT_MADE, FT_ATT),
+}
+
+# League scoring types of ESPN and Yahoo settings by how matchups are decided
+POINTS = 'points'
+EACH_CATEGORY = 'eachCategory'
+MOST_CATEGORIES = 'mostCategories'
+ROTO = 'roto'
+
+SCORING_TYPES = {
+  'H2H_POINTS': POINTS,
+  'headpoint': POINTS,
+  'H2H_EACH_CATEGORY': EACH_CATEGORY,
+  'head': EACH_CATEGORY,
+  'H2H_MOST_CATEGORIES': MOST_CATEGORIES,
+  'headone': MOST_CATEGORIES,
+  'ROTO': ROTO,
+  'roto': ROTO,
+}
+
+POINTS_SCORING_TYPES = [k for k, v in SCORING_TYPES.items() if v == POINTS]
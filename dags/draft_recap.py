@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from util import df_to_records
+from instrumentation import timed
+
+
+DRAFT_PERIODS = ['Season', 'Last7', 'Last15', 'Last30']
+STEALS_BUSTS_COUNT = 5
+
+
+def get_expected_ratings(ratings: np.ndarray, pick_order: np.ndarray):
+  """
+  Rating a pick is expected to return, the rating of the player ranked at
+  the same position among all drafted players
+  """
+  known = np.sort(ratings[~np.isnan(ratings)])[::-1]
+
+  if known.size == 0:
+    return np.full(ratings.shape, np.nan)
+
+  return known[np.minimum(pick_order, known.size - 1)]
+
+
+def get_draft_values(draft: pd.DataFrame, players: pd.DataFrame, period: str):
+  """
+  Pick vs ranking difference and rating surplus over the pick's slot for
+  every pick in a period
+  """
+  rating_col, ranking_col = 'totalRating' + period, 'totalRanking' + period
+
+  if rating_col not in players.columns or ranking_col not in players.columns:
+    return None
+
+  ratings = players.drop_duplicates(subset=["playerId"]).set_index("playerId")
+  ratings = ratings[[rating_col, ranking_col]].reindex(draft["playerId"])
+
+  rating = ratings[rating_col].to_numpy(dtype=float)
+  ranking = ratings[ranking_col].to_numpy(dtype=float)
+
+  # Keeper leagues can skip pick numbers, slots follow pick order
+  pick_order = draft["pickNumber"].rank(method="first").to_numpy(dtype=int) - 1
+
+  return pd.DataFrame({
+    'rating' + period: rating,
+    'ranking' + period: ranking,
+    'difference' + period: draft["pickNumber"].to_numpy(dtype=float) - ranking,
+    'surplus' + period: rating - get_expected_ratings(rating, pick_order)
+  }, index=draft.index)
+
+
+def summarize_draft_period(picks: pd.DataFrame, period: str):
+  """
+  Per round and per team surplus with the biggest steals and busts
+  """
+  surplus_col, difference_col = 'surplus' + period, 'difference' + period
+  valued = picks.dropna(subset=[surplus_col])
+
+  def summarize(group_col):
+    grouped = valued.groupby(group_col)
+
+    summary = pd.DataFrame({
+      'totalSurplus': grouped[surplus_col].sum(),
+      'avgSurplus': grouped[surplus_col].mean(),
+      'avgDifference': grouped[difference_col].mean()
+    }).round(2).reset_index()
+
+    return df_to_records(summary)
+
+  ordered = valued.sort_values(surplus_col, ascending=False)
+
+  return {
+    'rounds': summarize('round'),
+    'teams': summarize('teamId'),
+    'steals': ordered[ordered[surplus_col] > 0]["pickNumber"].head(STEALS_BUSTS_COUNT).tolist(),
+    'busts': ordered[ordered[surplus_col] < 0]["pickNumber"].tail(STEALS_BUSTS_COUNT)[::-1].tolist()
+  }
+
+
+@timed('analytics.draftRecap')
+def compute_draft_recap(league_data: dict):
+  """
+  Joins draft picks to player ratings for every period, returning the picks
+  with their values and a summary per period
+  """
+  draft = league_data["draft"]
+  players = league_data["players"]
+
+  if draft.empty or players.empty:
+    return pd.DataFrame(), {}
+
+  draft = draft.sort_values("pickNumber").reset_index(drop=True)
+
+  names = players.drop_duplicates(subset=["playerId"]).set_index("playerId")["playerName"]
+  picks = draft.assign(playerName=names.reindex(draft["playerId"]).to_numpy())
+
+  summary = {}
+  for period in DRAFT_PERIODS:
+    values = get_draft_values(draft, players, period)
+
+    if values is None:
+      continue
+
+    picks = pd.concat([picks, values.round(2)], axis=1)
+    summary[period] = summarize_draft_period(picks, period)
+
+  return picks, summary
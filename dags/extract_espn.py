@@ -2,10 +2,25 @@ import os
 import requests
 import json
 
+from instrumentation import record_bytes
+from util import record_payload
+
 
 # Initializing parameters
 base_url = 'https://lm-api-reads.fantasy.espn.com/apis/v3/games/fba/seasons/{}/segments/0/leagues/{}'
 
+# Shared across leagues processed by the same warm worker
+session = requests.Session()
+
+
+def reset_session():
+  """
+  Replaces the session in a forked batch worker, pooled keep-alive sockets
+  inherited from the parent must not be read by two processes
+  """
+  global session
+  session = requests.Session()
+
 
 def extract_from_espn_api(league_info: dict, view: list, header: dict = {}):
   """
@@ -23,15 +38,18 @@ def extract_from_espn_api(league_info: dict, view: list, header: dict = {}):
 
   league_url = base_url.format(league_year, league_id)
 
-  r = requests.get(
+  r = session.get(
     league_url,
     params = {"view": view},
     headers = header,
     cookies = cookies
   )  
 
+  record_bytes('+'.join(view), len(r.content))
+
   if r.status_code == 200:
     data = r.json()
+    record_payload('espn', '+'.join(view), data, league_id, league_year)
 
     print(f"Successfully fetched {view} from ESPN API")
     return data
@@ -1,10 +1,24 @@
-import json
-import boto3
 import requests
 
+from common_artifacts import load_s3_artifact
+from instrumentation import record_bytes
+from util import record_payload
+
 
 base_url = "https://fantasysports.yahooapis.com/fantasy/v2/{}?format=json_f"
 
+# Shared across leagues processed by the same warm worker
+session = requests.Session()
+
+
+def reset_session():
+    """
+    Replaces the session in a forked batch worker, pooled keep-alive sockets
+    inherited from the parent must not be read by two processes
+    """
+    global session
+    session = requests.Session()
+
 
 def extract_from_yahoo_api(access_token: str, league_key: str, endpoint: str, url_params: list):
     if url_params:
@@ -18,10 +32,12 @@ def extract_from_yahoo_api(access_token: str, league_key: str, endpoint: str, ur
         url = base_url.format(url_suffix)
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        res = requests.get(url, headers=headers)
+        res = session.get(url, headers=headers)
+        record_bytes(endpoint, len(res.content))
         
         if res.status_code == 200:
           data = res.json()
+          record_payload('yahoo', endpoint, data, league_key)
 
           print(f"Successfully fetched {url_params} from Yahoo API")
           return data
@@ -32,25 +48,21 @@ def extract_from_yahoo_api(access_token: str, league_key: str, endpoint: str, ur
     
     # Handling player data, grabbing from ESPN process. Only for 2025 ?
     elif int(league_key[0:3].replace(".", "")) >= 454:
-        s3 = boto3.resource("s3")
-
+        # Recorded too, so benchmarks get the player data the transforms read
         if endpoint == "players":
-            obj = s3.Object("nba-player-stats", "espn_players.json")
-            players = json.loads(obj.get()["Body"].read().decode("utf-8"))
-
-            return players
+            data = load_s3_artifact("nba-player-stats", "espn_players.json")
         
         elif endpoint == "players_id_map":
-            obj = s3.Object("nba-player-stats", "yahoo_players_map.json")
-            players_id_map = json.loads(obj.get()["Body"].read().decode("utf-8"))
-
-            return players_id_map
+            data = load_s3_artifact("nba-player-stats", "yahoo_players_map.json")
         
         elif endpoint == "daily":
-            obj = s3.Object("nba-player-stats", "daily.json")
-            daily = json.loads(obj.get()["Body"].read().decode("utf-8"))
-                               
-            return daily
+            data = load_s3_artifact("nba-player-stats", "daily.json")
+
+        else:
+            return None
+
+        record_payload('yahoo', endpoint, data, league_key)
+        return data
 
     else:
        return {}
\ No newline at end of file
@@ -1,39 +1,15 @@
-import os
-import json
 import pendulum
 from datetime import datetime, timedelta
 
 from airflow import DAG
-from airflow.utils.task_group import TaskGroup
+from airflow.decorators import task
 from airflow.models import Variable
 
-from load_settings import (
-  get_league_id_list,
-  get_scoring_period_id
-)
-from rds_operations import (
-  create_rds_tables,
-  truncate_rds_tables,
-  insert_data_into_rds_tables,
-  rds_run_query_task
-)
-from bigquery_operations import (
-  create_tables,
-  check_table_exists
-)
-from extract_espn import (
-  extract_from_espn_api
-)
-from transform_data import (
-  transform_raw_to_df,
-)
-from analyze_data import create_common_daily_alert
-from upload_to_aws import (
-  upload_league_data_to_dynamo
-)
-from upload_to_cloud import (
-  upload_to_firebase
+from artifact_store import (
+  write_json_artifact,
+  read_json_artifact
 )
+from batch import chunk_leagues
 
 
 local_tz = pendulum.timezone('US/Eastern')
@@ -46,133 +22,159 @@ default_args = {
   'retry_delay': timedelta(seconds=3),
 }
 
+default_league_info = {
+  'leagueId': '891817951',
+  'leagueYear': '2025',
+}
 
-with DAG(
-  'fantasy_dag', 
-  default_args=default_args, 
-  schedule_interval='0 8 * * *', 
-  catchup=False,
-  template_searchpath='/sql/',
-) as dag:
-  # Parameters
-  default_league_info = {
-    'leagueId': '891817951',
-    'leagueYear': '2025',
-  }
-
-  ### Tasks
-  # Initializing tables in RDS (alternative)
-  with TaskGroup(group_id='init_rds') as init_rds:
-    rds_create = create_rds_tables()
-    rds_truncate = truncate_rds_tables()
-
-    rds_create >> rds_truncate
-
-  # Getting league ids from 
-  init_league_ids = get_league_id_list()
-  scoring_period = get_scoring_period_id(default_league_info)
-
-  # Extracting common data from ESPN (not league specific)
-  common_endpoints = {
-    'ratings': ['kona_player_info', 'mStatRatings'],
-    #'daily': ['kona_playercard']
-  }
-  common_headers = {
-    'ratings': '''{"players":{"limit":1000,"sortPercOwned":{"sortAsc":false,"sortPriority":1},"sortDraftRanks":{"sortPriority":100,"sortAsc":true,"value":"STANDARD"}}}''',
-    #'daily': '''{"players":{"filterStatsForCurrentSeasonScoringPeriodId":{"value":[%s]},"sortStatIdForScoringPeriodId":{"additionalValue":%s,"sortAsc":false,"sortPriority":2,"value":0},"limit":250}}''' % (scoring_period, scoring_period)
-  }
-
-  common_data = {}
-
-  with TaskGroup(group_id='extract_common') as extract_common_tg:
-    # Extracting common data (non league specific)
-    for endpoint in common_endpoints.keys():
+# Mapped ETL tasks share this pool to cap concurrent ESPN requests, it is
+# created by the airflow-init service of docker-compose-airflow.yml. Uploads
+# make no ESPN calls and stay out of it
+ESPN_POOL = 'espn_api'
+LEAGUES_PER_TASK = 25
+MAX_ACTIVE_LEAGUE_TASKS = 8
+
+# Extracting common data from ESPN (not league specific)
+common_endpoints = {
+  'players': ['kona_player_info', 'mStatRatings'],
+  'daily': ['kona_playercard'],
+}
+# The daily header is formatted with the scoring period at runtime
+common_headers = {
+  'players': '''{"players":{"limit":1000,"sortPercOwned":{"sortAsc":false,"sortPriority":1},"sortDraftRanks":{"sortPriority":100,"sortAsc":true,"value":"STANDARD"}}}''',
+  'daily': '''{"players":{"filterStatsForCurrentSeasonScoringPeriodId":{"value":[%s]},"sortStatIdForScoringPeriodId":{"additionalValue":%s,"sortAsc":false,"sortPriority":2,"value":0},"limit":250}}''',
+}
 
-      common_endpoinit_group = []
-      with TaskGroup(group_id=f'common_endpoint_{endpoint}') as common_etl:
-        header = {'x-fantasy-filter': common_headers[endpoint]}
+# Full ETL for each league
+data_endpoints = {
+  'settings': ['mSettings'],
+  'teams': ['mTeam'],
+  'rosters': ['mRoster'],
+  'scoreboard': ['mScoreboard'],
+  'draft': ['mDraftDetail']
+}
 
-        raw_data = extract_from_espn_api(default_league_info, common_endpoints[endpoint], header)
-        df = transform_raw_to_df(endpoint, raw_data)
-        insert_data_into_rds_tables(-1, endpoint, df)
 
-        common_data[endpoint] = df
-    
-  with TaskGroup(group_id='queries_common') as common_queries:
-    # Running queries on common data
-    daily_alert = create_common_daily_alert()
-    upload_to_firebase(daily_alert, 'alert')
+# Modules doing network or pandas work are imported inside tasks, parsing
+# this file only builds the graph
+@task
+def get_scoring_period():
+  from load_settings import get_scoring_period_id
 
-  extract_common_tg >> common_queries
+  return get_scoring_period_id(default_league_info)
 
-  # Taskgroup for full ETL for each league
-  data_endpoints = {
-    'settings': ['mSettings'],
-    'teams': ['mTeam'],
-    'scoreboard': ['mScoreboard'], 
-    'draftRecap': ['mDraftDetail']
-  }
 
+@task
+def get_league_batches():
   all_league_info = Variable.get(
     'league_ids',
     default_var=[default_league_info],
     deserialize_json=True
   )
 
-  league_groups = []
-  
-  # Creating taskgroups dynamically for each league
-  for league_data in all_league_info:
-    league_id = league_data['leagueId']
+  return chunk_leagues(all_league_info, LEAGUES_PER_TASK)
 
-    with TaskGroup(group_id=f'etl_league_{league_id}') as etl_league:
-      endpoint_groups = []
 
-      for endpoint in data_endpoints.keys():
-        api_endpoint = data_endpoints[endpoint]
+@task
+def extract_common(scoring_period: str, ds=None):
+  from extract_espn import extract_from_espn_api
+  from transform_raw_data import transform_raw_to_df
+  from util import df_to_records
 
-        with TaskGroup(group_id=f'etl_endpoint_{endpoint}') as etl_endpoint:
-          # Extract and Transform data from ESPN
-          raw_data = extract_from_espn_api(league_data, api_endpoint)
-          df = transform_raw_to_df(endpoint, raw_data)
-          #insert_data_into_rds_tables(i, endpoint, df)
+  common_data = {}
 
-          # Saving to data dict
-          league_data[endpoint] = df
+  for endpoint, view in common_endpoints.items():
+    header_value = common_headers[endpoint]
+    if endpoint == 'daily':
+      header_value = header_value % (scoring_period, scoring_period)
 
-        endpoint_groups.append(etl_endpoint)
+    header = {'x-fantasy-filter': header_value}
 
-      # All endpoints extracted and transformed
-      # Performing queries
-      # with TaskGroup(group_id=f'queries') as queries_tg:
-      #   draft_query = rds_run_query_task(i, 'rds/join_draft_and_ratings.sql')
+    raw_data = extract_from_espn_api(default_league_info, view, header)
+    common_data[endpoint] = df_to_records(transform_raw_to_df(endpoint, raw_data))
 
-      #   league_data['draftRecap'] = draft_query
+  return write_json_artifact(common_data, ds, scoring_period, 'common.json')
 
 
-      # Uploading to DynamoDB after all endpoints processed
-      # upload_dynamo = upload_league_data_to_dynamo(league_data)
-      # last_updated = rds_run_query_task(i, 'rds/update_leagues_table.sql')
+@task
+def upload_daily_alert(common_uri: str, data_interval_end=None):
+  """
+  Posts the day's best gamescores and ejections to the message board
+  """
+  from analyze_data import create_common_daily_alert
+  from upload_to_cloud import upload_to_firebase
 
-      # endpoint_groups >> queries_tg >> upload_dynamo >> last_updated
+  common_data = read_json_artifact(common_uri)
+  alert_data = create_common_daily_alert(common_data['daily'], data_interval_end.to_date_string())
 
-    league_groups.append(etl_league)
+  if any(alert_data.values()):
+    upload_to_firebase('alert', alert_data)
 
 
-  init_league_ids >> scoring_period >> extract_common_tg
-  extract_common_tg >> league_groups
-  init_rds >> league_groups
+@task(pool=ESPN_POOL, max_active_tis_per_dag=MAX_ACTIVE_LEAGUE_TASKS)
+def etl_league_batch(batch: list, common_uri: str, ds=None):
+  """
+  Extracts and transforms a batch of leagues, returning artifact references
+  """
+  import pandas as pd
+  from extract_espn import extract_from_espn_api
+  from transform_raw_data import transform_raw_to_df
+  from transform_data import transform_players_truncate
+  from util import df_to_records
 
-  # Initializing tables in bigquery
-  bq_table = create_tables()
-  check_table_team_exists = check_table_exists('teams')
-  check_table_scoreboard_exists = check_table_exists('scoreboard')
-  check_table_draft_exists = check_table_exists('draft')
-  check_table_ratings_exists = check_table_exists('ratings')
+  common_data = read_json_artifact(common_uri)
+
+  league_refs = []
+  for league_info in batch:
+    league_id = league_info['leagueId']
+
+    try:
+      league_data = {
+        'leagueId': league_id,
+        'leagueYear': int(league_info['leagueYear']),
+        'platform': 'espn',
+        'updatedAt': datetime.utcnow().isoformat()
+      }
+
+      for endpoint, view in data_endpoints.items():
+        raw_data = extract_from_espn_api(league_info, view)
+        league_data[endpoint] = transform_raw_to_df(endpoint, raw_data)
+
+      league_data['players'] = pd.DataFrame.from_records(common_data['players'])
+      league_data['players'] = transform_players_truncate(league_data)
+
+      for key in league_data.keys():
+        if isinstance(league_data[key], pd.DataFrame):
+          league_data[key] = df_to_records(league_data[key])
+
+      uri = write_json_artifact(league_data, ds, 'leagues', f'{league_id}.json')
+      league_refs.append({'leagueId': league_id, 'uri': uri})
+    except Exception as e:
+      print(f"League {league_id} failed: {e}")
+
+  return league_refs
+
+
+@task(max_active_tis_per_dag=MAX_ACTIVE_LEAGUE_TASKS)
+def upload_league_batch(league_refs: list):
+  from upload_to_aws import upload_league_data_to_dynamo
+
+  for ref in league_refs:
+    upload_league_data_to_dynamo(read_json_artifact(ref['uri']))
+
+  return [ref['leagueId'] for ref in league_refs]
+
+
+with DAG(
+  'fantasy_dag',
+  default_args=default_args,
+  schedule_interval='0 8 * * *',
+  catchup=False,
+) as dag:
+  scoring_period = get_scoring_period()
+  common_uri = extract_common(scoring_period)
+  upload_daily_alert(common_uri)
 
-  bq_table >> [
-    check_table_team_exists,
-    check_table_scoreboard_exists,
-    check_table_draft_exists,
-    check_table_ratings_exists
-  ]
\ No newline at end of file
+  # One mapped task per batch of leagues, expanded at runtime
+  league_refs = etl_league_batch.partial(common_uri=common_uri).expand(batch=get_league_batches())
+  upload_league_batch.expand(league_refs=league_refs)
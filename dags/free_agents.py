@@ -0,0 +1,113 @@
+import numpy as np
+
+import consts
+from projections import build_projection, get_category_values
+from instrumentation import timed
+
+
+RECOMMENDATION_PERIOD = 'Last15'
+RECOMMENDATIONS_PER_TEAM = 5
+WEAK_CATEGORIES_PER_TEAM = 3
+
+# Every category keeps some weight, weak categories (negative z-scores) more
+CATEGORY_WEIGHT_FLOOR = 0.25
+
+
+def get_team_z_scores(values: np.ndarray, inverse: np.ndarray):
+  """
+  League relative z-scores of team category values, positive is better
+  """
+  stds = values.std(axis=0)
+  stds = np.where(stds > 0, stds, 1.0)
+
+  z = (values - values.mean(axis=0)) / stds
+  z = np.where(inverse, -z, z)
+
+  return z, stds
+
+
+def get_candidate_values(totals: np.ndarray, candidates: np.ndarray, category_ids: list, component_ids: list):
+  """
+  Team category values after adding each candidate, shape (teams, candidates,
+  cats). Percentages are recomputed from the summed made and attempted
+  """
+  combined = totals[:, None, :] + candidates[None, :, :]
+
+  return get_category_values(combined, category_ids, component_ids)
+
+
+@timed('analytics.freeAgents')
+def compute_free_agent_recommendations(league_data: dict, players=None, period: str = RECOMMENDATION_PERIOD, top_n: int = RECOMMENDATIONS_PER_TEAM, ownership_trends: dict = None):
+  """
+  Ranks every unrostered player for every team by the weighted z-score gain
+  adding them gives, weighting each team's weak categories the most.
+  Recommendations carry the player's ownership share and its change across
+  our leagues when ownership trends are given
+  """
+  ownership_trends = ownership_trends or {}
+
+  players = league_data["players"] if players is None else players
+  settings = league_data["settings"]
+
+  if players.empty or settings.empty or settings.iloc[0].get("scoringType") in consts.POINTS_SCORING_TYPES:
+    return {}
+
+  projection = build_projection({**league_data, 'players': players}, period)
+
+  if projection is None:
+    return {}
+
+  category_ids, component_ids = projection['categoryIds'], projection['componentIds']
+  inverse = np.array([id in consts.INVERSE_CATEGORIES for id in category_ids])
+
+  # Candidates are unrostered players with stats for the period
+  matrix = projection['matrix']
+  candidate_idx = np.flatnonzero((projection['owner'] < 0) & matrix.any(axis=1))
+
+  if candidate_idx.size == 0:
+    return {}
+
+  candidates = matrix[candidate_idx]
+
+  values = get_category_values(projection['totals'], category_ids, component_ids)
+  z, stds = get_team_z_scores(values, inverse)
+  weights = np.clip(-z, 0, None) + CATEGORY_WEIGHT_FLOOR
+
+  after = get_candidate_values(projection['totals'], candidates, category_ids, component_ids)
+  gains = (after - values[:, None, :]) / stds
+  gains = np.where(inverse, -gains, gains)
+
+  scores = (gains * weights[:, None, :]).sum(axis=-1)
+
+  # Top n per team without a full sort of every candidate
+  top_n = min(top_n, candidate_idx.size)
+  top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+  top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+  categories = [consts.CATEGORY_COLUMNS[id] for id in category_ids]
+  names = players["playerName"].tolist() if "playerName" in players.columns else [None] * len(players)
+
+  teams = []
+  for i, team_id in enumerate(projection['teamIds']):
+    weak = np.argsort(z[i])[:WEAK_CATEGORIES_PER_TEAM]
+
+    teams.append({
+      'teamId': int(team_id),
+      'weakCategories': [categories[c] for c in weak],
+      'players': [
+        {
+          'playerId': projection['playerIds'][candidate_idx[k]],
+          'playerName': names[candidate_idx[k]],
+          'score': round(float(scores[i, k]), 3),
+          'gains': {c: round(float(g), 3) for c, g in zip(categories, gains[i, k])},
+          'ownership': ownership_trends.get(str(projection['playerIds'][candidate_idx[k]]))
+        }
+        for k in top[i]
+      ]
+    })
+
+  return {
+    'period': period,
+    'categories': categories,
+    'teams': teams
+  }
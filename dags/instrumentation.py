@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import resource
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Timers and counters are always on, tracemalloc only when asked for as it
+# slows allocation heavy transforms
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION', '1') != '0'
+TRACE_MEMORY = os.environ.get('INSTRUMENT_MEMORY', '0') == '1'
+
+# Metrics of the league currently being processed by this worker
+current_metrics = None
+
+
+def start_metrics(**tags):
+  """
+  Starts collecting metrics for one league run, tagged eg. with leagueId
+  """
+  global current_metrics
+
+  if not INSTRUMENTATION_ENABLED:
+    return None
+
+  if TRACE_MEMORY:
+    if not tracemalloc.is_tracing():
+      tracemalloc.start()
+    tracemalloc.reset_peak()
+
+  current_metrics = {
+    'tags': tags,
+    'startedAt': time.perf_counter(),
+    'startProcessPeakBytes': get_process_peak_bytes(),
+    'stages': {},
+    'bytes': {},
+    'sectionBytes': {},
+    'rows': {}
+  }
+
+  return current_metrics
+
+
+def add_metric(group: str, name: str, value):
+  if current_metrics is not None:
+    current_metrics[group][name] = current_metrics[group].get(name, 0) + value
+
+
+@contextmanager
+def stage(name: str):
+  """
+  Times a block as a named stage, repeated stages accumulate
+  """
+  if current_metrics is None:
+    yield
+    return
+
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    add_metric('stages', name, round((time.perf_counter() - start) * 1000, 2))
+
+
+def timed(name: str = None):
+  """
+  Decorator timing every call of a function as a stage
+  """
+  def decorator(fn):
+    stage_name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+      with stage(stage_name):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
+
+
+def record_bytes(name: str, num_bytes: int):
+  add_metric('bytes', name, num_bytes)
+
+
+def record_section_bytes(name: str, num_bytes: int):
+  add_metric('sectionBytes', name, num_bytes)
+
+
+def record_rows(name: str, df):
+  add_metric('rows', name, len(df) if df is not None else 0)
+
+
+def get_process_peak_bytes():
+  """
+  Peak RSS over the whole process lifetime, earlier runs of a warm container
+  included
+  """
+  # ru_maxrss is in kilobytes on linux
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_memory_metrics(start_process_peak: int):
+  """
+  Memory of one run, as the growth of the process peak since the run started
+  (0 when the run stayed under an earlier peak) next to the process peak
+  itself, plus the peak traced python allocations of the run when tracing
+  """
+  process_peak = get_process_peak_bytes()
+
+  memory = {
+    'peakMemoryGrowthBytes': max(process_peak - start_process_peak, 0),
+    'processPeakMemoryBytes': process_peak,
+  }
+
+  if TRACE_MEMORY and tracemalloc.is_tracing():
+    memory['tracedPeakBytes'] = tracemalloc.get_traced_memory()[1]
+
+  return memory
+
+
+def finish_metrics(status: str = 'SUCCESS'):
+  """
+  Ends the league run, emitting its metrics as one json log line and
+  returning them for the batch summary
+  """
+  global current_metrics
+
+  if current_metrics is None:
+    return None
+
+  metrics = current_metrics
+  current_metrics = None
+
+  summary = {
+    'type': 'league_metrics',
+    **metrics['tags'],
+    'status': status,
+    'totalMs': round((time.perf_counter() - metrics['startedAt']) * 1000, 2),
+    **get_memory_metrics(metrics['startProcessPeakBytes']),
+    'stages': metrics['stages'],
+    'bytes': metrics['bytes'],
+    'sectionBytes': metrics['sectionBytes'],
+    'rows': metrics['rows']
+  }
+
+  print(json.dumps(summary))
+
+  return summary
+
+
+def summarize_metrics(metrics_list: list):
+  """
+  Aggregates league metrics of a batch run, totals and maxima per stage
+  """
+  metrics_list = [m for m in metrics_list if m]
+
+  stages = {}
+  for metrics in metrics_list:
+    for name, ms in metrics.get('stages', {}).items():
+      entry = stages.setdefault(name, {'totalMs': 0, 'maxMs': 0})
+      entry['totalMs'] = round(entry['totalMs'] + ms, 2)
+      entry['maxMs'] = max(entry['maxMs'], ms)
+
+  return {
+    'leaguesMeasured': len(metrics_list),
+    'totalMs': round(sum(m.get('totalMs', 0) for m in metrics_list), 2),
+    'bytesReceived': sum(sum(m.get('bytes', {}).values()) for m in metrics_list),
+    'bytesSerialized': sum(sum(m.get('sectionBytes', {}).values()) for m in metrics_list),
+    'peakMemoryGrowthBytes': max([m.get('peakMemoryGrowthBytes', 0) for m in metrics_list], default=0),
+    'processPeakMemoryBytes': max([m.get('processPeakMemoryBytes', 0) for m in metrics_list], default=0),
+    'stages': stages
+  }
@@ -0,0 +1,201 @@
+import time
+import base64
+import zlib
+import numpy as np
+
+from artifact_store import is_missing_artifact_error
+from common_artifacts import bucket_name, load_s3_artifact, s3_artifact_cache
+from upload_to_aws import upload_data_to_s3
+
+
+# Shared artifact rebuilt by each platform's batch refresh
+OWNERSHIP_INDEX_KEY = 'ownership_{}.json'
+
+# Leagues not refreshed for this long drop out of the index
+OWNERSHIP_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+def encode_bits(bits: np.ndarray):
+  """
+  Packs a boolean matrix row-wise into zlib compressed base64 text
+  """
+  return base64.b64encode(zlib.compress(np.packbits(bits, axis=-1).tobytes())).decode('ascii')
+
+
+def decode_bits(text: str, shape: tuple):
+  """
+  Inverse of encode_bits for a matrix of the given (rows, bits) shape
+  """
+  packed = np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=np.uint8)
+  packed = packed.reshape(shape[0], -1)
+
+  return np.unpackbits(packed, axis=-1, count=shape[1]).astype(bool)
+
+
+def get_rostered_player_ids(league_data: dict):
+  """
+  Player ids on any roster of a processed league, reported back to the batch
+  driver for the ownership index
+  """
+  rosters = league_data.get("rosters")
+
+  if rosters is None or rosters.empty:
+    return []
+
+  return sorted({str(id) for id in rosters["playerId"]})
+
+
+def build_ownership_index(league_rosters: dict, league_updated: dict = None):
+  """
+  Ownership over every indexed league, as league roster bitsets over players
+  and player bitmaps over leagues
+  """
+  league_updated = league_updated or {}
+
+  league_ids = sorted(league_rosters)
+  player_ids = sorted({id for ids in league_rosters.values() for id in ids})
+  player_index = {id: j for j, id in enumerate(player_ids)}
+
+  owned = np.zeros((len(league_ids), len(player_ids)), dtype=bool)
+  for i, league_id in enumerate(league_ids):
+    owned[i, [player_index[id] for id in league_rosters[league_id]]] = True
+
+  return {
+    'leagueIds': league_ids,
+    'leagueUpdated': [league_updated.get(id) for id in league_ids],
+    'playerIds': player_ids,
+    'leagueBits': encode_bits(owned),
+    'playerBits': encode_bits(owned.T),
+    'ownedCounts': owned.sum(axis=0).tolist()
+  }
+
+
+def load_ownership_index(artifact: dict):
+  """
+  Decodes an index artifact to its league x player ownership matrix
+  """
+  league_ids, player_ids = artifact['leagueIds'], artifact['playerIds']
+
+  return {
+    'leagueIds': league_ids,
+    'playerIds': player_ids,
+    'leagueIndex': {id: i for i, id in enumerate(league_ids)},
+    'playerIndex': {id: j for j, id in enumerate(player_ids)},
+    'owned': decode_bits(artifact['leagueBits'], (len(league_ids), len(player_ids)))
+  }
+
+
+def get_owned_mask(index: dict, league_id: str, player_ids: list):
+  """
+  Whether each player is rostered in a league, aligned to player_ids.
+  Players and leagues missing from the index are unowned
+  """
+  mask = np.zeros(len(player_ids), dtype=bool)
+  i = index['leagueIndex'].get(league_id)
+
+  if i is None:
+    return mask
+
+  cols = np.array([index['playerIndex'].get(str(id), -1) for id in player_ids], dtype=int)
+  known = cols >= 0
+  mask[known] = index['owned'][i, cols[known]]
+
+  return mask
+
+
+def get_player_leagues(index: dict, player_id: str):
+  """
+  League ids rostering a player, from the player's bitmap
+  """
+  j = index['playerIndex'].get(str(player_id))
+
+  if j is None:
+    return []
+
+  return [index['leagueIds'][i] for i in np.flatnonzero(index['owned'][:, j])]
+
+
+def get_ownership_trends(current: dict, previous: dict = None):
+  """
+  Share of indexed leagues rostering each player and its change since the
+  previous index
+  """
+  num_leagues = max(len(current['leagueIds']), 1)
+  shares = {id: count / num_leagues for id, count in zip(current['playerIds'], current['ownedCounts'])}
+
+  previous_shares = {}
+  if previous:
+    previous_leagues = max(len(previous['leagueIds']), 1)
+    previous_shares = {id: count / previous_leagues for id, count in zip(previous['playerIds'], previous['ownedCounts'])}
+
+  return {
+    id: {
+      'share': round(share, 4),
+      'change': round(share - previous_shares.get(id, 0), 4)
+    }
+    for id, share in shares.items()
+  }
+
+
+def upload_ownership_index(platform: str, league_rosters: dict, version: str):
+  """
+  Builds the ownership index for a refresh and uploads it with trends since
+  the previous index
+  """
+  if not league_rosters:
+    return None
+
+  key = OWNERSHIP_INDEX_KEY.format(platform)
+  now = int(time.time())
+
+  # Deferred leagues only survive through the previous index, it is not
+  # replaced when it exists but can't be read
+  try:
+    previous = load_s3_artifact(bucket_name, key)
+  except Exception as e:
+    if not is_missing_artifact_error(e):
+      print(f"Failed reading ownership index {key}, not updating it: {e}")
+      return None
+
+    print(f"No previous ownership index {key}: {e}")
+    previous = None
+
+  league_rosters = dict(league_rosters)
+  league_updated = {id: now for id in league_rosters}
+
+  # Leagues not refreshed in this run keep their last known rosters
+  if previous:
+    prev = load_ownership_index(previous)
+    prev_updated = previous.get('leagueUpdated') or [None] * len(prev['leagueIds'])
+
+    for i, (league_id, updated) in enumerate(zip(prev['leagueIds'], prev_updated)):
+      if league_id in league_rosters or not updated or now - updated > OWNERSHIP_MAX_AGE_SECONDS:
+        continue
+
+      league_rosters[league_id] = [prev['playerIds'][j] for j in np.flatnonzero(prev['owned'][i])]
+      league_updated[league_id] = updated
+
+  index = build_ownership_index(league_rosters, league_updated)
+  index['trends'] = get_ownership_trends(index, previous)
+
+  upload_data_to_s3(index, key, bucket_name, {"version": str(version)})
+  s3_artifact_cache[(bucket_name, key)] = (time.time(), index, {"version": str(version)})
+
+  return index
+
+
+def load_ownership_trends(platform: str):
+  """
+  Share of our leagues rostering each player and its change, from the
+  platform's latest index. Empty before the first index or when it can't be
+  read, the trends only annotate league results
+  """
+  key = OWNERSHIP_INDEX_KEY.format(platform)
+
+  try:
+    return load_s3_artifact(bucket_name, key).get('trends') or {}
+  except Exception as e:
+    if not is_missing_artifact_error(e):
+      print(f"Failed reading ownership index {key}: {e}")
+
+    return {}
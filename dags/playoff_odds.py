@@ -0,0 +1,252 @@
+import os
+import time
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import consts
+from win_probability import get_team_distributions
+from instrumentation import timed
+
+
+# Simulated seasons, run in batches to bound memory and the time budget
+DEFAULT_SIMULATIONS = int(os.environ.get('PLAYOFF_SIMULATIONS', 20000))
+BATCH_SIZE = 2000
+
+# Batches stop being added once the budget is spent, keeping the refresh
+# lambda within its timeout for large leagues
+TIME_BUDGET_SECONDS = float(os.environ.get('PLAYOFF_TIME_BUDGET_SECONDS', 5))
+
+NO_PLAYOFF_SCORING_TYPES = [k for k, v in consts.SCORING_TYPES.items() if v == consts.ROTO]
+
+# Standings of each category leagues count category wins, not matchups
+EACH_CATEGORY_SCORING_TYPES = [k for k, v in consts.SCORING_TYPES.items() if v == consts.EACH_CATEGORY]
+
+
+def get_remaining_schedule(scoreboard, team_ids: list, current_week: int, last_week: int):
+  """
+  Known matchups for each remaining regular season week as (home, away)
+  team index arrays, weeks without a published schedule map to None
+  """
+  index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+  remaining = scoreboard[(scoreboard["week"] >= current_week) & (scoreboard["week"] <= last_week)]
+  remaining = remaining[remaining["teamId"] < remaining["awayId"]]
+
+  schedule = {}
+  for week in range(current_week, last_week + 1):
+    rows = remaining[remaining["week"] == week].drop_duplicates(subset=["teamId"])
+    rows = rows[rows["teamId"].isin(index) & rows["awayId"].isin(index)]
+
+    if rows.empty:
+      schedule[week] = None
+    else:
+      home = np.array([index[t] for t in rows["teamId"]])
+      away = np.array([index[t] for t in rows["awayId"]])
+      schedule[week] = (home, away)
+
+  return schedule
+
+
+def get_random_pairings(rng, num_sims: int, num_teams: int):
+  """
+  One random pairing of all teams per simulation, shape (sims, teams // 2)
+  for each side. With an odd number of teams the last team has a bye
+  """
+  perm = rng.permuted(np.tile(np.arange(num_teams), (num_sims, 1)), axis=1)
+  num_pairs = num_teams // 2
+
+  return perm[:, 0:2 * num_pairs:2], perm[:, 1:2 * num_pairs:2]
+
+
+def play_week(rng, values, pts, home, away, inverse):
+  """
+  Decides simulated matchups from drawn category values of shape
+  (sims, teams, cats), returning True where the home team won and the
+  categories each side won. Categories won decide the matchup, ties are
+  broken by points
+  """
+  rows = np.arange(values.shape[0])[:, None]
+
+  if home.ndim == 1:
+    home = np.broadcast_to(home, (values.shape[0], home.shape[0]))
+    away = np.broadcast_to(away, (values.shape[0], away.shape[0]))
+
+  signs = np.sign(values[rows, home] - values[rows, away])
+  signs = np.where(inverse, -signs, signs)
+  score = signs.sum(axis=-1)
+
+  if pts is None:
+    tiebreak = rng.random(score.shape) < 0.5
+  else:
+    tiebreak = pts[rows, home] > pts[rows, away]
+
+  won = (score > 0) | ((score == 0) & tiebreak)
+
+  return won, (signs > 0).sum(axis=-1), (signs < 0).sum(axis=-1), home, away
+
+
+def simulate_batch(params: dict):
+  """
+  Simulates the rest of the regular season for a batch of seasons, returning
+  counts of each team finishing in each seed and the sum of final wins.
+  Wins are category wins in each category leagues, matchup wins otherwise
+  """
+  rng = np.random.default_rng(params['seed'])
+  num_sims = params['numSims']
+
+  means, stds = params['means'], params['stds']
+  pts_index = params['ptsIndex']
+  num_teams, num_cats = means.shape
+
+  wins = np.tile(params['baseWins'].astype(float), (num_sims, 1))
+  rows = np.arange(num_sims)[:, None]
+
+  for week_matchups in params['schedule']:
+    draws = means + stds * rng.standard_normal((num_sims, num_teams, num_cats))
+
+    values = draws[..., :params['numCategories']]
+    pts = None if pts_index is None else draws[..., pts_index]
+
+    if week_matchups is None:
+      home, away = get_random_pairings(rng, num_sims, num_teams)
+    else:
+      home, away = week_matchups
+
+    home_won, home_cats, away_cats, home, away = play_week(rng, values, pts, home, away, params['inverse'])
+
+    if params['eachCategory']:
+      wins[rows, home] += home_cats
+      wins[rows, away] += away_cats
+    else:
+      wins[rows, home] += home_won
+      wins[rows, away] += ~home_won
+
+  # Final standings by wins, current seed breaks ties
+  order = np.argsort(-(wins * (num_teams + 1) - params['seeds']), axis=1, kind='stable')
+  ranks = np.empty_like(order)
+  ranks[rows, order] = np.arange(num_teams)
+
+  seed_counts = np.bincount(
+    (np.arange(num_teams)[None, :] * num_teams + ranks).ravel(),
+    minlength=num_teams * num_teams
+  ).reshape(num_teams, num_teams)
+
+  return seed_counts, wins.sum(axis=0)
+
+
+def run_simulations(params: dict, num_sims: int, seed: int, max_workers: int = 1):
+  """
+  Splits the simulations into independently seeded batches, spread over a
+  process pool when max_workers > 1. Falls back to sequential batches where
+  multiprocessing is unavailable, stopping early once the time budget is
+  spent
+  """
+  num_batches = max(1, -(-num_sims // BATCH_SIZE))
+  seeds = np.random.SeedSequence(seed).spawn(num_batches)
+
+  batches = [
+    {**params, 'seed': s, 'numSims': min(BATCH_SIZE, num_sims - i * BATCH_SIZE)}
+    for i, s in enumerate(seeds)
+  ]
+
+  if max_workers > 1 and len(batches) > 1:
+    try:
+      with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(simulate_batch, batches)), num_sims
+    except (OSError, NotImplementedError) as e:
+      print(f"Process pool unavailable, simulating sequentially: {e}")
+
+  start = time.time()
+  results = []
+  simulated = 0
+
+  for batch in batches:
+    if results and time.time() - start > TIME_BUDGET_SECONDS:
+      print(f"Playoff odds time budget spent after {simulated} simulations")
+      break
+
+    results.append(simulate_batch(batch))
+    simulated += batch['numSims']
+
+  return results, simulated
+
+
+@timed('analytics.playoffOdds')
+def compute_playoff_odds(league_data: dict, num_sims: int = DEFAULT_SIMULATIONS, max_workers: int = 1):
+  """
+  Monte Carlo of the remaining regular season, drawing each team's weekly
+  category results from the normal distribution of its previous weeks.
+  Returns playoff and seed probabilities per team
+  """
+  settings = league_data["settings"]
+  teams = league_data["teams"]
+
+  scoring_type = None if settings.empty else settings.iloc[0].get("scoringType")
+
+  if settings.empty or teams.empty or scoring_type in NO_PLAYOFF_SCORING_TYPES:
+    return {}
+
+  playoff_teams = int(settings.iloc[0].get("playoffTeams") or 0)
+  last_week = int(settings.iloc[0].get("regularSeasonWeeks") or 0)
+
+  dists = get_team_distributions(league_data)
+
+  if dists is None or not playoff_teams or dists['currentWeek'] > last_week:
+    return {}
+
+  team_ids = dists['teamIds']
+  categories = dists['categories']
+  means, stds = dists['means'], dists['stds']
+
+  if means[categories].isna().all().all():
+    return {}
+
+  # Teams without history play like the league average
+  means = means.fillna(means.mean())
+  stds = stds.fillna(stds.mean())
+
+  stat_columns = categories + [c for c in ['pts'] if c not in categories and c in means.columns]
+  pts_index = stat_columns.index('pts') if 'pts' in stat_columns else None
+
+  teams = teams.set_index("teamId").reindex(team_ids)
+  current_week = dists['currentWeek']
+
+  schedule = get_remaining_schedule(league_data["scoreboard"], team_ids, current_week, last_week)
+
+  params = {
+    'means': means[stat_columns].to_numpy(dtype=float),
+    'stds': stds[stat_columns].to_numpy(dtype=float),
+    'inverse': dists['inverse'],
+    'numCategories': len(categories),
+    'eachCategory': scoring_type in EACH_CATEGORY_SCORING_TYPES,
+    'ptsIndex': pts_index,
+    'baseWins': teams["wins"].fillna(0).to_numpy(),
+    'seeds': teams["seed"].fillna(len(team_ids)).to_numpy(dtype=float),
+    'schedule': [schedule[week] for week in sorted(schedule)]
+  }
+
+  # Seeded per league and week so odds only move when results do
+  seed_key = f"{league_data.get('leagueId')}:{league_data.get('leagueYear')}:{current_week}"
+  seed = zlib.crc32(seed_key.encode())
+
+  results, simulated = run_simulations(params, num_sims, seed, max_workers)
+
+  seed_counts = sum(r[0] for r in results)
+  expected_wins = sum(r[1] for r in results) / simulated
+  seed_probs = seed_counts / simulated
+
+  return {
+    'week': current_week,
+    'simulations': simulated,
+    'playoffTeams': playoff_teams,
+    'teams': [
+      {
+        'teamId': int(team_id),
+        'playoffProb': round(float(seed_probs[i, :playoff_teams].sum()), 4),
+        'seedProbs': np.round(seed_probs[i], 4).tolist(),
+        'expectedWins': round(float(expected_wins[i]), 2)
+      }
+      for i, team_id in enumerate(team_ids)
+    ]
+  }
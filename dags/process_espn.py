@@ -1,6 +1,8 @@
+import os
 import json
 import boto3
 import psycopg2
+import psycopg2.extras
 import pandas as pd
 from datetime import datetime, date
 
@@ -14,20 +16,83 @@ from transform_data import (
   transform_players_truncate,
   transform_unrostered_daily
 )
+from win_probability import (
+  compute_win_probabilities
+)
+from all_play import (
+  compute_all_play
+)
+from playoff_odds import (
+  compute_playoff_odds
+)
+from projections import (
+  compute_team_projections,
+  strip_component_stats
+)
+from free_agents import (
+  compute_free_agent_recommendations
+)
+from draft_recap import (
+  compute_draft_recap
+)
 from upload_to_aws import (
   upload_league_data_to_dynamo, upload_data_to_s3
 )
 from util import (
   invoke_lambda,
   get_current_espn_league_year,
-  get_default_league_info
+  get_default_league_info,
+  update_leagues_last_updated,
+  df_to_records,
+  df_to_section
 )
 from load_settings import (
   get_scoring_period_id,
   get_last_posted_scoring_period
 )
 from upload_to_cloud import (
-  upload_to_firebase
+  upload_to_firebase_batch
+)
+from scheduler import (
+  SCORE_COLUMNS_SQL,
+  prioritize_leagues,
+  iterate_within_budget,
+  DEFAULT_LEAGUE_MS
+)
+from common_artifacts import (
+  load_common_espn_data,
+  get_common_endpoint_df
+)
+from batch import (
+  LEAGUES_PER_BATCH,
+  chunk_leagues,
+  run_league_batch,
+  get_successful_league_ids,
+  get_league_rosters,
+  get_league_metrics
+)
+from instrumentation import (
+  start_metrics,
+  finish_metrics,
+  summarize_metrics,
+  stage,
+  record_rows
+)
+from stats_archive import (
+  archive_player_snapshot
+)
+from rolling_stats import (
+  update_rolling_stats,
+  get_window_stats,
+  get_league_rolling_stats
+)
+from ownership_index import (
+  get_rostered_player_ids,
+  upload_ownership_index,
+  load_ownership_trends
+)
+from profiling import (
+  profiled
 )
 
 current_year = get_current_espn_league_year()
@@ -35,6 +100,15 @@ default_league_info = get_default_league_info()
 
 scoring_period = get_scoring_period_id(default_league_info)
 
+# Common daily box scores are pulled for every player who played, enough
+# for a full slate, so rolling windows don't miss anyone. Alerts and the
+# shared daily artifact keep the top performers
+DAILY_PULL_LIMIT = 1000
+DAILY_TOP_PLAYERS = 250
+
+# Serialization of dataframe sections, records or columnar
+section_format = os.environ.get('LEAGUE_SECTION_FORMAT', 'records')
+
 league_api_endpoints = {
   'settings': ['mSettings'],
   'teams': ['mTeam'],
@@ -50,12 +124,14 @@ league_headers = {
 }
 
 
+@profiled()
 def process_espn_league(event, context):
   params = event["queryStringParameters"]
 
   league_id = params.get('leagueId')
   cookie_espn = params.get('cookieEspnS2')
   process_only_current = params.get('processOnlyCurrent')
+  process_only_history = params.get('processOnlyHistory')
   updated_at = params.get('updatedAt', datetime.utcnow().isoformat())
 
   league_info = {
@@ -65,6 +141,7 @@ def process_espn_league(event, context):
   }
 
   print(f"Processing league {league_id}...")
+  start_metrics(leagueId=league_id, platform="espn")
   
   league_settings = extract_from_espn_api(league_info, ['mSettings'])
   previous_years = sorted(league_settings["status"]["previousSeasons"], reverse=True)
@@ -80,6 +157,12 @@ def process_espn_league(event, context):
       continue
 
   process_keys = [[league_id, current_year]] if process_only_current else all_league_keys
+  if process_only_history:
+    process_keys = all_league_keys[1:]
+
+  # Player and daily data are shared, only fetched when the common artifacts can't serve the league
+  common_data = load_common_espn_data(scoring_period)
+  rostered_player_ids = None
 
   for league_key in process_keys:
     print(f"Starting process for {league_key} | {cookie_espn}")
@@ -96,36 +179,62 @@ def process_espn_league(event, context):
     }
 
     for endpoint in league_api_endpoints.keys():
+      if league_year == current_year:
+        common_df = get_common_endpoint_df(common_data, endpoint, league_data.get('settings'))
+
+        if common_df is not None:
+          league_data[endpoint] = common_df
+          continue
+
       view = league_api_endpoints[endpoint]
 
       header = {}
       if league_headers.get(endpoint):
         header = {'x-fantasy-filter': league_headers.get(endpoint)}
 
-      data_endpoint = extract_from_espn_api(league_info, view, header)
-      league_data[endpoint] = transform_raw_to_df(endpoint, data_endpoint)
+      with stage(f"extract.{endpoint}"):
+        data_endpoint = extract_from_espn_api(league_info, view, header)
+
+      with stage(f"transform.{endpoint}"):
+        league_data[endpoint] = transform_raw_to_df(endpoint, data_endpoint)
+
+      record_rows(endpoint, league_data[endpoint])
 
     # Complex transforms
-    # league_data['draftRecap'] = transform_draft_recap(
-    #   league_data['draft'], 
-    #   league_data['players'],
-    #   league_data['settings']
-    # )
+    league_data['draftRecap'], league_data['draftSummary'] = compute_draft_recap(league_data)
+
+    # Recommendations rank every player, before truncating to rostered ones
+    league_data['freeAgents'] = compute_free_agent_recommendations(league_data, ownership_trends=load_ownership_trends('espn'))
 
-    league_data['players'] = transform_players_truncate(league_data)
-    league_data['daily'] = transform_unrostered_daily(league_data)
+    if league_year == current_year:
+      rostered_player_ids = get_rostered_player_ids(league_data)
+
+    with stage("transform.truncate"):
+      league_data['players'] = transform_players_truncate(league_data)
+      league_data['daily'] = transform_unrostered_daily(league_data)
+
+    # Trailing 3 to 30 day averages of the league's players, current season only
+    if league_year == current_year:
+      league_data['rollingStats'] = get_league_rolling_stats(common_data.get('rollingStats'), league_data['players'])
+
+    # Analytics
+    league_data['winProbabilities'] = compute_win_probabilities(league_data)
+    league_data['allPlay'] = compute_all_play(league_data)
+    league_data['playoffOdds'] = compute_playoff_odds(league_data)
+    league_data['teamProjections'] = compute_team_projections(league_data)
+    league_data['players'] = strip_component_stats(league_data)
 
     # Removing unneeded league data
     #league_data.pop('draft', None)
     #league_data.pop('players', None)
 
     # Data serialization and upload data to dynamo, cleaning nan values
-    for key in league_data.keys():
-      if isinstance(league_data[key], pd.DataFrame):
-        dict_raw = league_data[key].to_dict(orient='records')
-        dict_clean = [{k:v for k, v in x.items() if v == v } for x in dict_raw]
-        
-        league_data[key] = dict_clean
+    with stage("serialize"):
+      for key in league_data.keys():
+        if isinstance(league_data[key], pd.DataFrame):
+          league_data[key] = df_to_section(league_data[key], section_format)
+
+    league_data['sectionFormat'] = section_format
       
     upload_league_data_to_dynamo(league_data)
 
@@ -133,10 +242,28 @@ def process_espn_league(event, context):
 
   return {
     'statusCode': 200,
-    'body': 'Success'
+    'body': 'Success',
+    'rosteredPlayerIds': rostered_player_ids,
+    'metrics': finish_metrics()
+  }
+
+
+def process_espn_leagues_batch(event, context):
+  """
+  Processes a batch of leagues in one invocation, reporting each individually
+  """
+  leagues = event.get("leagues", [])
+  max_workers = int(event.get("maxWorkers", 1))
+
+  results = run_league_batch(process_espn_league, leagues, max_workers)
+
+  return {
+    'statusCode': 200,
+    'body': results
   }
 
 
+@profiled()
 def process_espn_common():
   last_scoring_period = get_last_posted_scoring_period(current_year)
 
@@ -144,6 +271,8 @@ def process_espn_common():
     print("ESPN common data already processed")
     return
 
+  start_metrics(handler="process_espn_common")
+
   common_api_endpoints = {
     'players': ['kona_player_info'],
     'players_yahoo': ['kona_player_info', 'mStatRatings'],
@@ -152,7 +281,7 @@ def process_espn_common():
   common_headers = {
     'players': '''{"players":{"filterStatsForCurrentSeasonScoringPeriodId": {"value": [0]}, "sortPercOwned": {"sortPriority": 2, "sortAsc": false}, "limit": 250}}''',
     'players_yahoo': '''{"players":{"limit":1000,"sortPercOwned":{"sortAsc":false,"sortPriority":1},"sortDraftRanks":{"sortPriority":100,"sortAsc":true,"value":"STANDARD"}}}''',
-    'daily':   '''{"players":{"filterStatsForCurrentSeasonScoringPeriodId":{"value":[%s]},"sortStatIdForScoringPeriodId":{"additionalValue":%s,"sortAsc":false,"sortPriority":2,"value":0},"limit":250}}''' % (scoring_period, scoring_period),
+    'daily':   '''{"players":{"filterStatsForCurrentSeasonScoringPeriodId":{"value":[%s]},"sortStatIdForScoringPeriodId":{"additionalValue":%s,"sortAsc":false,"sortPriority":2,"value":0},"limit":%s}}''' % (scoring_period, scoring_period, DAILY_PULL_LIMIT),
   }
 
   league_info = default_league_info
@@ -190,13 +319,18 @@ def process_espn_common():
       data = common_data[k]
 
       data_df = transform_raw_to_df('players', data)
-      data_dict = data_df.to_dict(orient='records')
-      data_clean = [{k:v for k, v in x.items() if v == v } for x in data_dict]
+      data_clean = df_to_records(data_df)
+
+      # Daily partition for historical queries, the dated snapshot stays as is
+      try:
+        archive_player_snapshot(data_df, today)
+      except Exception as e:
+        print(f"Player stats archive failed: {e}")
 
       filename = "espn_players.json"
       bucket_name = "nba-player-stats"
 
-      upload_data_to_s3(data_clean, filename, bucket_name)
+      upload_data_to_s3(data_clean, filename, bucket_name, {"scoringperiod": str(scoring_period)})
 
     # Upload daily data to firebase
     elif k == 'daily':
@@ -205,7 +339,19 @@ def process_espn_common():
       studs_gs_cutoff = 30
       scrubs_gs_cutoff = 0
 
-      df = transform_raw_to_df(k, v)
+      df_all = transform_raw_to_df(k, v)
+
+      # Days without games still advance the rolling windows
+      try:
+        rolling_state = update_rolling_stats(df_all, str(scoring_period))
+        rolling_json = df_to_records(get_window_stats(rolling_state))
+
+        upload_data_to_s3(rolling_json, "rolling_stats.json", bucket_name, {"scoringperiod": str(scoring_period)})
+      except Exception as e:
+        print(f"Rolling stats update failed: {e}")
+
+      # Sorted by game score
+      df = df_all.head(DAILY_TOP_PLAYERS)
 
       if df.empty:
         print("No daily stats available")
@@ -246,14 +392,17 @@ def process_espn_common():
           alert_data[today][f'!{alert_type}_stat{i}'] = scoreline
 
       daily_json = df.to_dict(orient='records')
-      upload_data_to_s3(daily_json, "daily.json", bucket_name)
+      upload_data_to_s3(daily_json, "daily.json", bucket_name, {"scoringperiod": str(scoring_period)})
 
-      upload_to_firebase('alert', alert_data)   
-      upload_to_firebase('scoring_period', {"scoring_period": scoring_period}) 
+      upload_to_firebase_batch([
+        ('alert', alert_data),
+        ('scoring_period', {"scoring_period": scoring_period})
+      ])
 
   return {
     'statusCode': 200,
-    'body': "Test response"
+    'body': "Test response",
+    'metrics': finish_metrics()
   }
 
 
@@ -273,11 +422,11 @@ def update_espn_leagues(event, context):
     password=db_pass
   )
 
-  cursor = conn.cursor()
+  cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
   cursor.execute(
-    """
-    SELECT leagueid, cookieswid, cookieespns2
+    f"""
+    SELECT leagueid, cookieswid, cookieespns2, {SCORE_COLUMNS_SQL}
     FROM leagueids  
     WHERE active
       AND platform = 'espn'
@@ -285,40 +434,54 @@ def update_espn_leagues(event, context):
       and (NOW() - lastupdated) > interval '2 hour'
     """
   )
-  res_query = cursor.fetchall()
+  res_query = prioritize_leagues(cursor.fetchall())
 
   num_leagues = len(res_query)
   num_failed = 0
-
-  for league_info in res_query:
-    league_id = league_info[0]
-
-    process_payload = {
-      "queryStringParameters": {
-        "leagueId": league_id,
-        "cookieSwid": league_info[1],
-        "cookieEspnS2": league_info[2],
-        "processOnlyCurrent": True,
-        "updatedAt": datetime.utcnow().isoformat()
-      }
+  updated_league_ids = []
+  league_rosters = {}
+  league_metrics = []
+
+  for league_batch in iterate_within_budget(chunk_leagues(res_query), context, default_ms=DEFAULT_LEAGUE_MS * LEAGUES_PER_BATCH):
+    batch_payload = {
+      "leagues": [
+        {
+          "leagueId": league_info['leagueid'],
+          "cookieSwid": league_info['cookieswid'],
+          "cookieEspnS2": league_info['cookieespns2'],
+          "processOnlyCurrent": True,
+          "updatedAt": datetime.utcnow().isoformat()
+        } for league_info in league_batch
+      ]
     }
 
-    process_res = invoke_lambda(lambda_client, 'process_espn_league', process_payload)
-
-    if not process_res:
-      num_failed += 1
-      print(f"League {league_id.ljust(11)} failed")
-    else:
-      update_payload = {
-        "queryStringParameters": {
-          "leagueId": league_id,
-          "method": 'lastUpdated'
-        }
-      }
-
-      invoke_lambda(lambda_client, "update_league_info", update_payload)
-
-  print(f"Successfully updated, {num_failed}/{num_leagues} failed...")
+    batch_res = invoke_lambda(lambda_client, 'process_espn_leagues_batch', batch_payload)
+    success_ids = get_successful_league_ids(batch_res or [])
+    league_rosters.update(get_league_rosters(batch_res or []))
+    league_metrics.extend(get_league_metrics(batch_res or []))
+
+    for league_info in league_batch:
+      league_id = league_info['leagueid']
+
+      if league_id not in success_ids:
+        num_failed += 1
+        print(f"League {league_id.ljust(11)} failed")
+      else:
+        updated_league_ids.append(league_id)
+
+  update_leagues_last_updated(conn, updated_league_ids)
+  upload_ownership_index("espn", league_rosters, scoring_period)
+
+  num_deferred = num_leagues - len(updated_league_ids) - num_failed
+  print(f"Successfully updated, {num_failed}/{num_leagues} failed, {num_deferred} deferred...")
+  print(json.dumps({
+    'type': 'batch_summary',
+    'platform': 'espn',
+    'numLeagues': num_leagues,
+    'numFailed': num_failed,
+    'numDeferred': num_deferred,
+    **summarize_metrics(league_metrics)
+  }))
 
   return {
     'statusCode': 200,
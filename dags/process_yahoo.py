@@ -1,6 +1,9 @@
+import os
+import json
 import boto3
 import copy
 import psycopg2
+import psycopg2.extras
 import pandas as pd
 from datetime import datetime
 
@@ -9,6 +12,7 @@ from transform_raw_data_yahoo import transform_yahoo_raw_to_df
 from transform_data import transform_unrostered_daily
 from transform_data_yahoo import (
   adjust_player_ratings,
+  map_player_ids,
   truncate_and_map_player_ids
 )
 from yahoo_helper import (
@@ -16,9 +20,35 @@ from yahoo_helper import (
   get_all_league_ids,
   update_player_list
 )
+from win_probability import compute_win_probabilities
+from all_play import compute_all_play
+from playoff_odds import compute_playoff_odds
+from projections import compute_team_projections, strip_component_stats
+from free_agents import compute_free_agent_recommendations
+from draft_recap import compute_draft_recap
 from upload_to_aws import upload_league_data_to_dynamo
-from util import invoke_lambda
+from util import invoke_lambda, update_leagues_last_updated, df_to_section
+from scheduler import (
+    SCORE_COLUMNS_SQL,
+    prioritize_leagues,
+    iterate_within_budget,
+    DEFAULT_LEAGUE_MS
+)
+from batch import (
+    LEAGUES_PER_BATCH,
+    chunk_leagues,
+    run_league_batch,
+    get_successful_league_ids,
+    get_league_rosters,
+    get_league_metrics
+)
+from instrumentation import start_metrics, finish_metrics, summarize_metrics, stage, record_rows
+from ownership_index import get_rostered_player_ids, upload_ownership_index, load_ownership_trends
+from profiling import profiled
+
 
+# Serialization of dataframe sections, records or columnar
+section_format = os.environ.get('LEAGUE_SECTION_FORMAT', 'records')
 
 league_api_endpoints = {
     'settings': ["league", "settings"],
@@ -32,6 +62,7 @@ league_api_endpoints = {
 }
 
 
+@profiled()
 def process_yahoo_league(event, context):
     params = event["queryStringParameters"]
 
@@ -42,6 +73,7 @@ def process_yahoo_league(event, context):
     updated_at = params.get("updatedAt", datetime.utcnow().isoformat())
 
     print(f"Starting processing for {league_id} {league_year}")
+    start_metrics(leagueId=league_id, platform="yahoo")
 
     league_data = {
         'leagueId': league_id,
@@ -58,23 +90,45 @@ def process_yahoo_league(event, context):
 
             url_params[1] = url_params[1].format(week_params)
 
-        data_endpoint = extract_from_yahoo_api(access_token, league_id, endpoint, url_params)
-        league_data[endpoint] = transform_yahoo_raw_to_df(endpoint, data_endpoint)
+        with stage(f"extract.{endpoint}"):
+            data_endpoint = extract_from_yahoo_api(access_token, league_id, endpoint, url_params)
+
+        with stage(f"transform.{endpoint}"):
+            league_data[endpoint] = transform_yahoo_raw_to_df(endpoint, data_endpoint)
+
+        record_rows(endpoint, league_data[endpoint])
 
     # Transforms
     league_data["players"] = adjust_player_ratings(league_data)
-    league_data["players"] = truncate_and_map_player_ids(league_data)
-    league_data['daily'] = transform_unrostered_daily(league_data)
+    # Recommendations rank every player, before truncating to rostered ones
+    league_data['freeAgents'] = compute_free_agent_recommendations(league_data, map_player_ids(league_data), ownership_trends=load_ownership_trends('yahoo'))
+
+    rostered_player_ids = get_rostered_player_ids(league_data)
+
+    with stage("transform.truncate"):
+        league_data["players"] = truncate_and_map_player_ids(league_data)
+
+    league_data['draftRecap'], league_data['draftSummary'] = compute_draft_recap(league_data)
+
+    with stage("transform.truncate"):
+        league_data['daily'] = transform_unrostered_daily(league_data)
+
+    # Analytics
+    league_data['winProbabilities'] = compute_win_probabilities(league_data)
+    league_data['allPlay'] = compute_all_play(league_data)
+    league_data['playoffOdds'] = compute_playoff_odds(league_data)
+    league_data['teamProjections'] = compute_team_projections(league_data)
+    league_data['players'] = strip_component_stats(league_data)
 
     league_data.pop("players_id_map", None)
 
     # Data serialization and upload data to dynamo, cleaning nan values
-    for key in league_data.keys():
-        if isinstance(league_data[key], pd.DataFrame):
-            dict_raw = league_data[key].to_dict(orient='records')
-            dict_clean = [{k:v for k, v in x.items() if v == v } for x in dict_raw]
-            
-            league_data[key] = dict_clean
+    with stage("serialize"):
+        for key in league_data.keys():
+            if isinstance(league_data[key], pd.DataFrame):
+                league_data[key] = df_to_section(league_data[key], section_format)
+
+    league_data['sectionFormat'] = section_format
 
     upload_league_data_to_dynamo(league_data)
 
@@ -82,7 +136,24 @@ def process_yahoo_league(event, context):
     
     return {
         'statusCode': 200,
-        'body': 'Success'
+        'body': 'Success',
+        'rosteredPlayerIds': rostered_player_ids,
+        'metrics': finish_metrics()
+    }
+
+
+def process_yahoo_leagues_batch(event, context):
+    """
+    Processes a batch of leagues in one invocation, reporting each individually
+    """
+    leagues = event.get("leagues", [])
+    max_workers = int(event.get("maxWorkers", 1))
+
+    results = run_league_batch(process_yahoo_league, leagues, max_workers)
+
+    return {
+        'statusCode': 200,
+        'body': results
     }
 
 
@@ -99,13 +170,14 @@ def process_all_yahoo_leagues(event, context):
         user='postgres.lsygyiijbumuybwyuvrn',
         password=db_pass
     )
-    cursor = conn.cursor()
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
     cursor.execute(
-        """
+        f"""
         SELECT DISTINCT
-            coalesce(l2.linkedid, l1.leagueid), 
-            l1.yahoorefreshtoken
+            coalesce(l2.linkedid, l1.leagueid) AS leagueid, 
+            l1.yahoorefreshtoken,
+            {SCORE_COLUMNS_SQL}
         FROM leagueids l1
         LEFT JOIN linkedids l2
             ON l1.leagueid=l2.mainid
@@ -115,43 +187,66 @@ def process_all_yahoo_leagues(event, context):
             AND (NOW() - lastupdated > INTERVAL '2 hour')
             AND coalesce(l2.linkedid, l1.leagueid) LIKE (SELECT MAX(SPLIT_PART(linkedid, '.l.', 1)::int) FROM linkedids) || '%'
             AND viewcount > 1
-        LIMIT 100
         """
     )
-    res_query = cursor.fetchall()
+    res_query = prioritize_leagues(cursor.fetchall())
 
     num_leagues = len(res_query)
     num_failed = 0
-
-    for league_info in res_query:
-        league_id = league_info[0]
-        access_token = get_yahoo_access_token(league_info[1]).get("yahoo_access_token", "")
-
-        if access_token:
-            process_payload = {
-                "queryStringParameters": {
-                    "leagueId": league_id,
-                    "leagueYear": 2025,
-                    "allLeagueKeys": get_all_league_ids(access_token),
-                    "yahooAccessToken": access_token,
-                    "updatedAt": datetime.utcnow().isoformat()
-                }
-            }
-            process_res = invoke_lambda(lambda_client, 'process_yahoo_league', process_payload)
-
-        if not access_token or not process_res:
-            num_failed += 1
-            print(f"League {league_id.ljust(11)} failed")
-        else:
-            update_payload = {
-                "queryStringParameters": {
-                    "leagueId": league_id,
-                    "method": "lastUpdated"
-                }
-            }
-            invoke_lambda(lambda_client, "update_league_info", update_payload)
-
-    print(f"Successfully updated, {num_failed}/{num_leagues} failed...")
+    updated_league_ids = []
+    league_rosters = {}
+    league_metrics = []
+
+    for league_batch in iterate_within_budget(chunk_leagues(res_query), context, default_ms=DEFAULT_LEAGUE_MS * LEAGUES_PER_BATCH):
+        batch_leagues = []
+
+        for league_info in league_batch:
+            league_id = league_info["leagueid"]
+            access_token = get_yahoo_access_token(league_info["yahoorefreshtoken"]).get("yahoo_access_token", "")
+
+            if not access_token:
+                num_failed += 1
+                print(f"League {league_id.ljust(11)} failed")
+                continue
+
+            batch_leagues.append({
+                "leagueId": league_id,
+                "leagueYear": 2025,
+                "allLeagueKeys": get_all_league_ids(access_token),
+                "yahooAccessToken": access_token,
+                "updatedAt": datetime.utcnow().isoformat()
+            })
+
+        if not batch_leagues:
+            continue
+
+        batch_res = invoke_lambda(lambda_client, 'process_yahoo_leagues_batch', {"leagues": batch_leagues})
+        success_ids = get_successful_league_ids(batch_res or [])
+        league_rosters.update(get_league_rosters(batch_res or []))
+        league_metrics.extend(get_league_metrics(batch_res or []))
+
+        for league in batch_leagues:
+            league_id = league["leagueId"]
+
+            if league_id not in success_ids:
+                num_failed += 1
+                print(f"League {league_id.ljust(11)} failed")
+            else:
+                updated_league_ids.append(league_id)
+
+    update_leagues_last_updated(conn, updated_league_ids)
+    upload_ownership_index("yahoo", league_rosters, datetime.utcnow().date().isoformat())
+
+    num_deferred = num_leagues - len(updated_league_ids) - num_failed
+    print(f"Successfully updated, {num_failed}/{num_leagues} failed, {num_deferred} deferred...")
+    print(json.dumps({
+        'type': 'batch_summary',
+        'platform': 'yahoo',
+        'numLeagues': num_leagues,
+        'numFailed': num_failed,
+        'numDeferred': num_deferred,
+        **summarize_metrics(league_metrics)
+    }))
 
     return {
         'statusCode': 200,
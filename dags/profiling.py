@@ -0,0 +1,221 @@
+import os
+import sys
+import io
+import json
+import time
+import pstats
+import marshal
+import cProfile
+import functools
+import threading
+from collections import Counter
+from datetime import datetime
+
+from artifact_store import get_durable_root, write_bytes_artifact
+
+
+# Profiling is off unless asked for with a profile query parameter, or with
+# PROFILE_MODE for every invocation (optionally only PROFILE_LEAGUE_IDS)
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_PROFILE_MODE = 'cprofile'
+
+PROFILE_MODE = os.environ.get('PROFILE_MODE')
+PROFILE_LEAGUE_IDS = {id.strip() for id in os.environ.get('PROFILE_LEAGUE_IDS', '').split(',') if id.strip()}
+
+# Local directory or s3://bucket/prefix, the artifact store root by default.
+# Lambda runs are only profiled with an s3 root, local files die with the container
+PROFILE_OUTPUT_ROOT = os.environ.get('PROFILE_OUTPUT_ROOT')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 5))
+
+# Functions printed to the logs with each cProfile run
+PROFILE_SUMMARY_LINES = 20
+
+
+class StackSampler:
+  """
+  Sampling profiler of one thread, counting its python stacks in the folded
+  format read by flamegraph.pl and speedscope
+  """
+  def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+    self.interval = interval_ms / 1000
+    self.counts = Counter()
+    self.thread_id = None
+    self.stopped = threading.Event()
+    self.thread = None
+
+  def start(self):
+    self.thread_id = threading.get_ident()
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    self.stopped.set()
+    self.thread.join()
+
+  def run(self):
+    while not self.stopped.wait(self.interval):
+      frame = sys._current_frames().get(self.thread_id)
+
+      stack = []
+      while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+
+      if stack:
+        self.counts[';'.join(reversed(stack))] += 1
+
+  def dumps(self):
+    return '\n'.join(f"{stack} {count}" for stack, count in self.counts.most_common()).encode('UTF-8')
+
+
+def get_event_params(args: tuple):
+  """
+  Query string parameters of a lambda handler's event, empty for handlers
+  called without one
+  """
+  if args and isinstance(args[0], dict):
+    return args[0].get('queryStringParameters') or {}
+  return {}
+
+
+def get_profile_mode(params: dict):
+  """
+  Profiler requested for an invocation, None when it isn't profiled
+  """
+  requested = params.get('profile')
+
+  if requested is None:
+    if not PROFILE_LEAGUE_IDS:
+      requested = PROFILE_MODE
+    elif str(params.get('leagueId')) in PROFILE_LEAGUE_IDS:
+      requested = PROFILE_MODE or DEFAULT_PROFILE_MODE
+
+  if requested is None or str(requested).lower() in ('', '0', 'false', 'none'):
+    return None
+
+  return requested if requested in PROFILE_MODES else DEFAULT_PROFILE_MODE
+
+
+def dump_cprofile(profiler: cProfile.Profile):
+  """
+  Profile in the pstats file format, as written by Profile.dump_stats
+  """
+  profiler.create_stats()
+  return marshal.dumps(profiler.stats)
+
+
+def print_cprofile_summary(profiler: cProfile.Profile):
+  out = io.StringIO()
+  pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_SUMMARY_LINES)
+  print(out.getvalue())
+
+
+def get_profile_root():
+  """
+  Root profiles are written to, an s3 root is required in Lambda where a
+  local profile would be lost with the container
+  """
+  return get_durable_root(PROFILE_OUTPUT_ROOT, 'PROFILE_OUTPUT_ROOT or FANTASY_ARTIFACT_ROOT')
+
+
+def write_profile(handler_name: str, mode: str, body: bytes, info: dict):
+  """
+  Writes the profile and a json sidecar with its tags next to it, returning
+  the profile uri
+  """
+  stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+  name = f"{info.get('leagueId') or 'common'}_{info.get('leagueYear') or 'current'}_{stamp}"
+  extension = 'pstats' if mode == 'cprofile' else 'folded'
+
+  root = get_profile_root()
+
+  uri = write_bytes_artifact(body, 'profiles', handler_name, f'{name}.{extension}', root=root)
+  write_bytes_artifact(
+    json.dumps({**info, 'profile': uri}).encode('UTF-8'),
+    'profiles', handler_name, f'{name}.json',
+    root=root
+  )
+
+  return uri
+
+
+def run_profiled(fn, args: tuple, kwargs: dict, handler_name: str, mode: str, params: dict):
+  profiler = cProfile.Profile() if mode == 'cprofile' else StackSampler()
+  status = 'FAILED'
+  res = None
+
+  start = time.perf_counter()
+  if mode == 'cprofile':
+    profiler.enable()
+  else:
+    profiler.start()
+
+  try:
+    res = fn(*args, **kwargs)
+    status = 'SUCCESS'
+    return res
+  finally:
+    if mode == 'cprofile':
+      profiler.disable()
+    else:
+      profiler.stop()
+
+    duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    # Payload sizes from the handler's instrumentation metrics
+    metrics = res.get('metrics') if isinstance(res, dict) else None
+    metrics = metrics or {}
+
+    info = {
+      'handler': handler_name,
+      'mode': mode,
+      'leagueId': params.get('leagueId'),
+      'leagueYear': params.get('leagueYear'),
+      'status': status,
+      'durationMs': duration_ms,
+      'bytes': metrics.get('bytes', {}),
+      'sectionBytes': metrics.get('sectionBytes', {}),
+      'rows': metrics.get('rows', {}),
+    }
+
+    try:
+      if mode == 'cprofile':
+        print_cprofile_summary(profiler)
+        body = dump_cprofile(profiler)
+      else:
+        body = profiler.dumps()
+
+      print(f"Profile of {handler_name} written to {write_profile(handler_name, mode, body, info)}")
+    except Exception as e:
+      print(f"Failed writing profile of {handler_name}: {e}")
+
+
+def profiled(name: str = None):
+  """
+  Decorator profiling a handler when requested, the handler runs unchanged
+  otherwise
+  """
+  def decorator(fn):
+    handler_name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+      params = get_event_params(args)
+      mode = get_profile_mode(params)
+
+      if mode is None:
+        return fn(*args, **kwargs)
+
+      # Checked before profiling so a run isn't profiled for nothing
+      try:
+        get_profile_root()
+      except ValueError as e:
+        print(f"Not profiling {handler_name}: {e}")
+        return fn(*args, **kwargs)
+
+      return run_profiled(fn, args, kwargs, handler_name, mode, params)
+
+    return wrapper
+
+  return decorator
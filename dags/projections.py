@@ -0,0 +1,263 @@
+import numpy as np
+
+import consts
+from util import get_component_stat_ids
+from instrumentation import timed
+
+
+PROJECTION_PERIODS = ['Season', 'Last7', 'Last15', 'Last30']
+
+
+def get_projection_ids(settings):
+  """
+  Scored category ids and the stat ids summed per team, where percentage
+  categories are replaced by their made and attempted components
+  """
+  category_ids = [
+    str(id) for id in settings.iloc[0]["categoryIds"]
+    if str(id) in consts.CATEGORY_COLUMNS
+  ]
+
+  component_ids = [
+    id for id in get_component_stat_ids(category_ids)
+    if id not in consts.PERCENT_COMPONENTS
+  ]
+
+  return category_ids, component_ids
+
+
+def get_player_matrix(players, period: str, component_ids: list):
+  """
+  Dense player x component matrix of per game averages for a period. Players
+  without stats for the period are zero rows. Stats produced before
+  percentage components were kept fall back to one attempt at the player's
+  percentage
+  """
+  col = 'stats' + period
+  matrix = np.zeros((len(players), len(component_ids)))
+
+  if col not in players.columns:
+    return matrix
+
+  index = {id: k for k, id in enumerate(component_ids)}
+  fallbacks = [
+    (per_id, index[made], index[att])
+    for per_id, (made, att) in consts.PERCENT_COMPONENTS.items()
+    if made in index and att in index
+  ]
+
+  for i, stats in enumerate(players[col]):
+    if not isinstance(stats, dict):
+      continue
+
+    matrix[i] = [float(stats.get(id) or 0) for id in component_ids]
+
+    for per_id, made, att in fallbacks:
+      if matrix[i, att] == 0 and stats.get(per_id):
+        matrix[i, made], matrix[i, att] = float(stats[per_id]), 1.0
+
+  return matrix
+
+
+def get_ownership(rosters, team_ids: list, player_ids: list):
+  """
+  Sparse team x player ownership as coordinate arrays, plus each player's
+  owning team index (-1 when unrostered)
+  """
+  team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+  player_index = {player_id: j for j, player_id in enumerate(player_ids)}
+
+  owner = np.full(len(player_ids), -1)
+
+  for row in rosters[["teamId", "playerId"]].itertuples(index=False):
+    i = team_index.get(row.teamId)
+    j = player_index.get(row.playerId)
+
+    if i is not None and j is not None:
+      owner[j] = i
+
+  player_idx = np.flatnonzero(owner >= 0)
+
+  return owner[player_idx], player_idx, owner
+
+
+def aggregate_team_totals(matrix: np.ndarray, team_idx: np.ndarray, player_idx: np.ndarray, num_teams: int):
+  """
+  Ownership x player matrix product, summing rostered players' components
+  """
+  totals = np.zeros((num_teams, matrix.shape[1]))
+  np.add.at(totals, team_idx, matrix[player_idx])
+
+  return totals
+
+
+def get_category_values(totals: np.ndarray, category_ids: list, component_ids: list):
+  """
+  Category values from summed components, percentages are made / attempted
+  """
+  index = {id: k for k, id in enumerate(component_ids)}
+  values = np.zeros(totals.shape[:-1] + (len(category_ids),))
+
+  for c, id in enumerate(category_ids):
+    if id in consts.PERCENT_COMPONENTS:
+      made, att = consts.PERCENT_COMPONENTS[id]
+      att_totals = totals[..., index[att]]
+
+      with np.errstate(divide='ignore', invalid='ignore'):
+        values[..., c] = np.where(att_totals > 0, totals[..., index[made]] / att_totals, 0)
+    else:
+      values[..., c] = totals[..., index[id]]
+
+  return values
+
+
+def build_projection(league_data: dict, period: str = 'Season'):
+  """
+  Team projections for a period with the matrices kept for incremental
+  what-if evaluation
+  """
+  players = league_data["players"]
+  rosters = league_data["rosters"]
+  settings = league_data["settings"]
+  teams = league_data["teams"]
+
+  if players.empty or rosters.empty or settings.empty or teams.empty:
+    return None
+
+  category_ids, component_ids = get_projection_ids(settings)
+
+  if not category_ids:
+    return None
+
+  team_ids = sorted(teams["teamId"].tolist())
+  player_ids = players["playerId"].tolist()
+
+  matrix = get_player_matrix(players, period, component_ids)
+  team_idx, player_idx, owner = get_ownership(rosters, team_ids, player_ids)
+
+  return {
+    'period': period,
+    'teamIds': team_ids,
+    'playerIds': player_ids,
+    'playerIndex': {player_id: j for j, player_id in enumerate(player_ids)},
+    'categoryIds': category_ids,
+    'componentIds': component_ids,
+    'matrix': matrix,
+    'owner': owner,
+    'totals': aggregate_team_totals(matrix, team_idx, player_idx, len(team_ids))
+  }
+
+
+def get_move_deltas(projection: dict, moves: list):
+  """
+  Component deltas per affected team for a list of (playerId, teamId) moves,
+  teamId None dropping the player. Only the moved players' rows are read
+  """
+  team_index = {team_id: i for i, team_id in enumerate(projection['teamIds'])}
+  matrix, owner = projection['matrix'], projection['owner']
+
+  deltas = {}
+  for player_id, team_id in moves:
+    j = projection['playerIndex'][player_id]
+
+    if owner[j] >= 0:
+      deltas.setdefault(int(owner[j]), np.zeros(matrix.shape[1]))
+      deltas[int(owner[j])] -= matrix[j]
+
+    if team_id is not None:
+      i = team_index[team_id]
+      deltas.setdefault(i, np.zeros(matrix.shape[1]))
+      deltas[i] += matrix[j]
+
+  return deltas
+
+
+def evaluate_moves(projection: dict, moves: list):
+  """
+  Category values before and after a trade or waiver move for the affected
+  teams, without modifying the projection
+  """
+  deltas = get_move_deltas(projection, moves)
+  category_ids, component_ids = projection['categoryIds'], projection['componentIds']
+
+  results = {}
+  for i, delta in deltas.items():
+    before = projection['totals'][i]
+    after = before + delta
+
+    results[projection['teamIds'][i]] = {
+      'before': get_category_values(before, category_ids, component_ids),
+      'after': get_category_values(after, category_ids, component_ids)
+    }
+
+  return results
+
+
+def apply_moves(projection: dict, moves: list):
+  """
+  Applies moves to the projection in place, updating only affected totals
+  """
+  team_index = {team_id: i for i, team_id in enumerate(projection['teamIds'])}
+
+  for i, delta in get_move_deltas(projection, moves).items():
+    projection['totals'][i] += delta
+
+  for player_id, team_id in moves:
+    j = projection['playerIndex'][player_id]
+    projection['owner'][j] = -1 if team_id is None else team_index[team_id]
+
+  return projection
+
+
+@timed('analytics.teamProjections')
+def compute_team_projections(league_data: dict):
+  """
+  Projected per game category values of every team's roster for each period
+  """
+  projections = {}
+  categories = None
+  team_ids = None
+
+  for period in PROJECTION_PERIODS:
+    projection = build_projection(league_data, period)
+
+    if projection is None:
+      return {}
+
+    values = get_category_values(projection['totals'], projection['categoryIds'], projection['componentIds'])
+    projections[period] = np.round(values, 4).tolist()
+
+    categories = [consts.CATEGORY_COLUMNS[id] for id in projection['categoryIds']]
+    team_ids = [int(t) for t in projection['teamIds']]
+
+  return {
+    'teamIds': team_ids,
+    'categories': categories,
+    'periods': projections
+  }
+
+
+def strip_component_stats(league_data: dict):
+  """
+  Players with the made and attempted ids of percentage categories removed
+  from their stats, unless scored themselves. They are only kept for the
+  projections, so stored stats stay limited to the league's categories
+  """
+  players = league_data["players"]
+  settings = league_data["settings"]
+
+  if players.empty or settings.empty:
+    return players
+
+  category_ids = {str(id) for id in settings.iloc[0]["categoryIds"]}
+  drop_ids = {id for ids in consts.PERCENT_COMPONENTS.values() for id in ids} - category_ids
+
+  players = players.copy()
+  for col in ['stats' + period for period in PROJECTION_PERIODS]:
+    if col in players.columns:
+      players[col] = [
+        {k: v for k, v in stats.items() if k not in drop_ids} if isinstance(stats, dict) else stats
+        for stats in players[col]
+      ]
+
+  return players
@@ -0,0 +1,233 @@
+import io
+import numpy as np
+import pandas as pd
+
+import consts
+from artifact_store import get_durable_root, build_artifact_uri, write_bytes_artifact, read_bytes_artifact, is_missing_artifact_error
+
+
+# Days of box scores kept per player, the longest window that can be asked for
+MAX_WINDOW_DAYS = 30
+ROLLING_WINDOWS = [3, 7, 10, 15, 30]
+
+ROLLING_STATE_PARTS = ('rolling', 'player_box_scores.npz')
+
+# Counting columns of transform_daily_to_df, percentages are derived
+BOX_SCORE_COLUMNS = [
+  'fgMade', 'fgAtt', 'ftMade', 'ftAtt', 'threes', 'threesAtt',
+  'rebs', 'asts', 'stls', 'blks', 'tos', 'ejs', 'pts', 'mins'
+]
+
+# ESPN stat ids of the accumulated columns, matching the players stats dicts
+BOX_SCORE_STAT_IDS = {
+  **{col: id for id, col in consts.CATEGORY_COLUMNS.items() if col in BOX_SCORE_COLUMNS},
+  'threesAtt': consts.THREEA,
+  'mins': consts.MINS,
+}
+
+
+def create_rolling_state(player_ids: list = None):
+  """
+  Empty ring buffer of daily box scores, shape (days, players, columns)
+  """
+  player_ids = list(player_ids or [])
+
+  return {
+    'playerIds': player_ids,
+    'playerIndex': {id: j for j, id in enumerate(player_ids)},
+    'days': [None] * MAX_WINDOW_DAYS,
+    'head': -1,
+    'values': np.zeros((MAX_WINDOW_DAYS, len(player_ids), len(BOX_SCORE_COLUMNS))),
+    'played': np.zeros((MAX_WINDOW_DAYS, len(player_ids)), dtype=bool)
+  }
+
+
+def add_players(state: dict, player_ids: list):
+  """
+  Grows the player axis for players not seen before
+  """
+  new_ids = [id for id in dict.fromkeys(player_ids) if id not in state['playerIndex']]
+
+  if not new_ids:
+    return state
+
+  for id in new_ids:
+    state['playerIndex'][id] = len(state['playerIds'])
+    state['playerIds'].append(id)
+
+  state['values'] = np.concatenate([
+    state['values'],
+    np.zeros((MAX_WINDOW_DAYS, len(new_ids), len(BOX_SCORE_COLUMNS)))
+  ], axis=1)
+  state['played'] = np.concatenate([
+    state['played'],
+    np.zeros((MAX_WINDOW_DAYS, len(new_ids)), dtype=bool)
+  ], axis=1)
+
+  return state
+
+
+def ingest_daily(state: dict, daily: pd.DataFrame, day: str):
+  """
+  Writes one day of box scores into the ring buffer, overwriting the oldest
+  day. Days already ingested are skipped. The daily data must hold every
+  player who played, anyone missing counts as not having played
+  """
+  if day in state['days']:
+    print(f"Rolling stats already include day {day}")
+    return state
+
+  daily = daily if daily is not None else pd.DataFrame()
+  player_ids = daily['playerId'].astype(str).tolist() if not daily.empty else []
+
+  add_players(state, player_ids)
+
+  head = (state['head'] + 1) % MAX_WINDOW_DAYS
+  state['head'] = head
+  state['days'][head] = day
+
+  state['values'][head] = 0
+  state['played'][head] = False
+
+  if player_ids:
+    idx = np.array([state['playerIndex'][id] for id in player_ids])
+    box = daily.reindex(columns=BOX_SCORE_COLUMNS).fillna(0).to_numpy(dtype=float)
+
+    state['values'][head, idx] = box
+    state['played'][head, idx] = True
+
+  return state
+
+
+def get_prefix_sums(state: dict):
+  """
+  Prefix sums over days in chronological order, oldest first, with a zero
+  row so any trailing window is a single difference
+  """
+  order = (np.arange(MAX_WINDOW_DAYS) + state['head'] + 1) % MAX_WINDOW_DAYS
+
+  values = state['values'][order]
+  played = state['played'][order].astype(float)
+
+  zeros_values = np.zeros((1,) + values.shape[1:])
+  zeros_played = np.zeros((1,) + played.shape[1:])
+
+  return (
+    np.concatenate([zeros_values, np.cumsum(values, axis=0)]),
+    np.concatenate([zeros_played, np.cumsum(played, axis=0)])
+  )
+
+
+def get_window_totals(state: dict, windows: list = ROLLING_WINDOWS):
+  """
+  Rolling sums and games played per player for each trailing window of days
+  """
+  prefix_values, prefix_played = get_prefix_sums(state)
+
+  totals = {}
+  for window in windows:
+    window = min(window, MAX_WINDOW_DAYS)
+
+    totals[window] = (
+      prefix_values[-1] - prefix_values[-1 - window],
+      prefix_played[-1] - prefix_played[-1 - window]
+    )
+
+  return totals
+
+
+def get_window_stats(state: dict, windows: list = ROLLING_WINDOWS):
+  """
+  Per game averages for each window as stats dicts keyed by ESPN stat id,
+  in the same shape as the players statsLast7 etc. columns
+  """
+  df = pd.DataFrame({'playerId': state['playerIds']})
+  col_index = {col: k for k, col in enumerate(BOX_SCORE_COLUMNS)}
+
+  for window, (sums, games) in get_window_totals(state, windows).items():
+    with np.errstate(divide='ignore', invalid='ignore'):
+      averages = np.where(games[:, None] > 0, sums / games[:, None], np.nan)
+
+    stats = {id: averages[:, col_index[col]] for col, id in BOX_SCORE_STAT_IDS.items()}
+
+    # Percentages from the window's made and attempted totals
+    for per_id, (made_id, att_id) in consts.PERCENT_COMPONENTS.items():
+      made = sums[:, col_index[consts.CATEGORY_COLUMNS[made_id]]]
+      att = sums[:, col_index[consts.CATEGORY_COLUMNS[att_id]]]
+
+      with np.errstate(divide='ignore', invalid='ignore'):
+        stats[per_id] = np.where(att > 0, made / att, 0)
+
+    df[f'statsLast{window}'] = [
+      {id: round(float(values[j]), 2) for id, values in stats.items()} if games[j] > 0 else None
+      for j in range(len(state['playerIds']))
+    ]
+    df[f'gamesLast{window}'] = games.astype(int)
+
+  return df
+
+
+def save_rolling_state(state: dict):
+  buffer = io.BytesIO()
+
+  np.savez_compressed(
+    buffer,
+    player_ids=np.array(state['playerIds'], dtype=str),
+    days=np.array([d or '' for d in state['days']], dtype=str),
+    head=np.array(state['head']),
+    values=state['values'],
+    played=state['played']
+  )
+
+  return write_bytes_artifact(buffer.getvalue(), *ROLLING_STATE_PARTS, root=get_durable_root())
+
+
+def load_rolling_state():
+  """
+  Loads the persisted ring buffer, a fresh one when none exists yet. Any
+  other read failure is raised, as the empty buffer would then be saved
+  over the real history
+  """
+  uri = build_artifact_uri(*ROLLING_STATE_PARTS, root=get_durable_root())
+
+  try:
+    body = read_bytes_artifact(uri)
+  except Exception as e:
+    if not is_missing_artifact_error(e):
+      raise
+
+    print(f"No rolling stats state, starting empty: {e}")
+    return create_rolling_state()
+
+  data = np.load(io.BytesIO(body))
+
+  state = create_rolling_state(data['player_ids'].tolist())
+  state['days'] = [d or None for d in data['days'].tolist()]
+  state['head'] = int(data['head'])
+  state['values'] = data['values']
+  state['played'] = data['played']
+
+  return state
+
+
+def update_rolling_stats(daily: pd.DataFrame, day: str):
+  """
+  Ingests a day of box scores into the persisted rolling state
+  """
+  state = ingest_daily(load_rolling_state(), daily, day)
+  save_rolling_state(state)
+
+  return state
+
+
+def get_league_rolling_stats(window_stats: list, players: pd.DataFrame):
+  """
+  Rolling window stats of a league's players, from the window stats records
+  published with the common data
+  """
+  if not window_stats or players is None or players.empty:
+    return pd.DataFrame()
+
+  df = pd.DataFrame.from_records(window_stats)
+
+  return df[df['playerId'].isin(players['playerId'].astype(str))].reset_index(drop=True)
@@ -0,0 +1,103 @@
+import math
+import time
+from datetime import datetime, timedelta
+
+
+# Score weights, recency of views and staleness dominate, popularity breaks ties
+WEIGHT_RECENCY = 4.0
+WEIGHT_POPULARITY = 1.0
+WEIGHT_STALENESS = 2.0
+WEIGHT_GAMES_PLAYED = 3.0
+
+VIEW_HALF_LIFE_HOURS = 24
+MAX_STALENESS_HOURS = 72
+
+# Hour (UTC) by which the previous night's games are final
+GAMES_FINAL_HOUR_UTC = 8
+
+# Time kept in reserve for bookkeeping after the last league
+RESERVE_MS = 20000
+DEFAULT_LEAGUE_MS = 15000
+DURATION_SAMPLE_SIZE = 10
+
+# Columns each refresh query must select for scoring
+SCORE_COLUMNS_SQL = """
+  EXTRACT(EPOCH FROM NOW() - lastviewed) / 3600 AS hourssinceview,
+  EXTRACT(EPOCH FROM NOW() - lastupdated) / 3600 AS hourssinceupdate,
+  viewcount
+"""
+
+
+def get_hours_since_games_final(now: datetime = None):
+  """
+  Hours elapsed since the most recent slate of games became final
+  """
+  now = now or datetime.utcnow()
+
+  games_final = now.replace(hour=GAMES_FINAL_HOUR_UTC, minute=0, second=0, microsecond=0)
+  if now < games_final:
+    games_final -= timedelta(days=1)
+
+  return (now - games_final).total_seconds() / 3600
+
+
+def score_league(league: dict, hours_since_games_final: float):
+  """
+  Priority score for refreshing a league, higher is refreshed first
+  """
+  hours_since_view = league.get('hourssinceview')
+  hours_since_update = league.get('hourssinceupdate')
+
+  hours_since_view = float(hours_since_view) if hours_since_view is not None else 0
+  hours_since_update = float(hours_since_update) if hours_since_update is not None else MAX_STALENESS_HOURS
+  view_count = int(league.get('viewcount') or 0)
+
+  recency = 0.5 ** (hours_since_view / VIEW_HALF_LIFE_HOURS)
+  popularity = math.log1p(view_count)
+  staleness = min(hours_since_update, MAX_STALENESS_HOURS) / MAX_STALENESS_HOURS
+  games_played = 1 if hours_since_update > hours_since_games_final else 0
+
+  score = WEIGHT_RECENCY * recency + \
+          WEIGHT_POPULARITY * popularity + \
+          WEIGHT_STALENESS * staleness + \
+          WEIGHT_GAMES_PLAYED * games_played
+
+  return round(score, 4)
+
+
+def prioritize_leagues(leagues: list, now: datetime = None):
+  """
+  Sorts league rows from the refresh queries by descending priority score
+  """
+  hours_since_games_final = get_hours_since_games_final(now)
+
+  for league in leagues:
+    league['score'] = score_league(league, hours_since_games_final)
+
+  return sorted(leagues, key=lambda x: x['score'], reverse=True)
+
+
+def iterate_within_budget(leagues: list, context, reserve_ms: int = RESERVE_MS, default_ms: int = DEFAULT_LEAGUE_MS):
+  """
+  Yields leagues in order while the remaining lambda time allows another one.
+  Leagues not reached keep their old lastupdated, so they score higher and are
+  picked up first on the next run
+  """
+  durations = []
+  start = None
+
+  for i, league in enumerate(leagues):
+    now = time.monotonic()
+    if start is not None:
+      durations.append((now - start) * 1000)
+
+    if context is not None:
+      recent = durations[-DURATION_SAMPLE_SIZE:]
+      expected_ms = sum(recent) / len(recent) if recent else default_ms
+
+      if context.get_remaining_time_in_millis() - reserve_ms < expected_ms:
+        print(f"Time budget reached, deferring {len(leagues) - i} remaining to next run")
+        return
+
+    start = now
+    yield league
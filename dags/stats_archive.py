@@ -0,0 +1,248 @@
+import io
+import gzip
+import json
+import pandas as pd
+from datetime import date, timedelta
+
+import consts
+from artifact_store import (
+  get_durable_root,
+  build_artifact_uri,
+  write_bytes_artifact,
+  read_bytes_artifact,
+  is_missing_artifact_error
+)
+from transform_raw_data import transform_players_to_df
+
+try:
+  import pyarrow
+except ImportError:
+  pyarrow = None
+
+
+ARCHIVE_PREFIX = ('archive', 'players')
+ARCHIVE_PERIODS = ['Season', 'Last7', 'Last15', 'Last30']
+
+# Identifying columns always read with a query
+KEY_COLUMNS = ['date', 'playerId', 'playerName']
+
+# Partition file per format, the file name records how it was written
+PARQUET_FILE = 'players.parquet'
+JSON_FILE = 'players.json.gz'
+
+
+def get_partition_file():
+  """
+  Parquet when pyarrow is available, gzipped column json otherwise
+  """
+  return PARQUET_FILE if pyarrow is not None else JSON_FILE
+
+
+def get_read_order():
+  """
+  Partition files to probe on read, the writer's format first since a
+  partition may have been written where pyarrow was (not) available
+  """
+  return [PARQUET_FILE, JSON_FILE] if pyarrow is not None else [JSON_FILE, PARQUET_FILE]
+
+
+def flatten_player_stats(players: pd.DataFrame, snapshot_date: str):
+  """
+  Flattens the per period stat and rating dicts of a players dataframe into
+  one column per category and period, eg. ptsLast7 and ptsRatingLast7
+  """
+  columns = {
+    'date': snapshot_date,
+    'playerId': players['playerId'].astype(str),
+    'playerName': players.get('playerName'),
+    'proTeamId': players.get('proTeamId'),
+    'percentOwned': players.get('percentOwned'),
+  }
+
+  stat_ids = list(consts.CATEGORY_COLUMNS.keys()) + [consts.MINS]
+  stat_names = {**consts.CATEGORY_COLUMNS, consts.MINS: 'mins'}
+
+  for period in ARCHIVE_PERIODS:
+    for prefix, suffix in [('stats', ''), ('statRatings', 'Rating')]:
+      col = prefix + period
+
+      if col not in players.columns:
+        continue
+
+      stats = players[col].apply(lambda d: d if isinstance(d, dict) else {})
+
+      for id in stat_ids:
+        values = stats.apply(lambda d, id=id: d.get(id))
+
+        if values.notnull().any():
+          columns[f'{stat_names[id]}{suffix}{period}'] = values.astype(float)
+
+    for col in ['totalRating' + period, 'totalRanking' + period]:
+      if col in players.columns:
+        columns[col] = players[col]
+
+  return pd.DataFrame(columns, index=players.index)
+
+
+def encode_json_columns(df: pd.DataFrame):
+  """
+  Gzipped json lines, a header line with the column names followed by one
+  line of values per column, so reads only parse the requested columns
+  """
+  columns = df.astype(object).where(df.notnull(), None).to_dict(orient='list')
+  lines = [json.dumps(list(columns.keys()))] + [json.dumps(values) for values in columns.values()]
+
+  return gzip.compress('\n'.join(lines).encode('UTF-8'))
+
+
+def decode_json_columns(body: bytes, columns: list = None):
+  lines = gzip.decompress(body).split(b'\n')
+  header = json.loads(lines[0])
+
+  return {
+    col: json.loads(lines[i + 1]) for i, col in enumerate(header)
+    if columns is None or col in columns
+  }
+
+
+def write_partition(df: pd.DataFrame, snapshot_date: str):
+  partition_file = get_partition_file()
+  parts = ARCHIVE_PREFIX + (f'date={snapshot_date}', partition_file)
+
+  if partition_file == PARQUET_FILE:
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    body = buffer.getvalue()
+  else:
+    body = encode_json_columns(df)
+
+  return write_bytes_artifact(body, *parts, root=get_durable_root())
+
+
+def read_partition_file(snapshot_date: str):
+  """
+  Body and file name of a date partition in whichever format it was
+  written, None when neither exists. Other read errors are raised
+  """
+  for partition_file in get_read_order():
+    uri = build_artifact_uri(*ARCHIVE_PREFIX, f'date={snapshot_date}', partition_file, root=get_durable_root())
+
+    try:
+      return read_bytes_artifact(uri), partition_file
+    except Exception as e:
+      if not is_missing_artifact_error(e):
+        raise
+
+  return None, None
+
+
+def read_partition(snapshot_date: str, columns: list = None):
+  """
+  Reads one date partition, only the requested columns when given. Returns
+  None for dates without an archived snapshot
+  """
+  body, partition_file = read_partition_file(snapshot_date)
+
+  if body is None:
+    print(f"No archived snapshot for {snapshot_date}")
+    return None
+
+  if columns is not None:
+    columns = KEY_COLUMNS + [c for c in columns if c not in KEY_COLUMNS]
+
+  if partition_file == JSON_FILE:
+    df = pd.DataFrame(decode_json_columns(body, columns))
+    return df if columns is None else df.reindex(columns=columns)
+
+  if pyarrow is None:
+    raise ImportError(f"pyarrow is needed to read the parquet partition for {snapshot_date}")
+
+  try:
+    return pd.read_parquet(io.BytesIO(body), columns=columns)
+  except (KeyError, ValueError, pyarrow.ArrowInvalid):
+    # Columns missing from older partitions are read as nan
+    return pd.read_parquet(io.BytesIO(body)).reindex(columns=columns)
+
+
+def archive_player_snapshot(players: pd.DataFrame, snapshot_date: str = None):
+  """
+  Archives a day's transformed players dataframe as a date partition
+  """
+  snapshot_date = snapshot_date or date.today().strftime("%Y-%m-%d")
+
+  if players is None or players.empty:
+    return None
+
+  return write_partition(flatten_player_stats(players, snapshot_date), snapshot_date)
+
+
+def get_dates(start: str, end: str):
+  start, end = date.fromisoformat(start), date.fromisoformat(end)
+
+  return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def query_date_range(start: str, end: str, columns: list = None, player_ids: list = None):
+  """
+  Concatenates the archived partitions between two dates (inclusive),
+  reading only the requested columns
+  """
+  frames = []
+
+  for snapshot_date in get_dates(start, end):
+    df = read_partition(snapshot_date, columns)
+
+    if df is None:
+      continue
+
+    if player_ids is not None:
+      df = df[df['playerId'].isin([str(id) for id in player_ids])]
+
+    frames.append(df)
+
+  if not frames:
+    return pd.DataFrame(columns=KEY_COLUMNS + (columns or []))
+
+  return pd.concat(frames, ignore_index=True)
+
+
+def query_player_series(player_id: str, columns: list, start: str, end: str):
+  """
+  Time series of a player's archived columns, one row per date
+  """
+  return query_date_range(start, end, columns, [player_id]).sort_values('date').reset_index(drop=True)
+
+
+def query_leaders(snapshot_date: str, column: str, n: int = 10, ascending: bool = None):
+  """
+  Top n players in a column on a date, inverse categories ranked lowest first
+  """
+  df = read_partition(snapshot_date, [column])
+
+  if df is None or column not in df.columns:
+    return pd.DataFrame(columns=KEY_COLUMNS + [column])
+
+  if ascending is None:
+    inverse_names = [consts.CATEGORY_COLUMNS[id] for id in consts.INVERSE_CATEGORIES]
+    ascending = any(column.startswith(name) and 'Rating' not in column for name in inverse_names)
+
+  return df.dropna(subset=[column]).sort_values(column, ascending=ascending).head(n).reset_index(drop=True)
+
+
+def archive_s3_snapshot(snapshot_date: str, bucket_name: str = 'nba-player-stats'):
+  """
+  Converts an existing dated json snapshot uploaded by process_espn_common
+  into an archive partition
+  """
+  import boto3
+
+  key = f"nba-player-stats-{snapshot_date}.json"
+  obj = boto3.client('s3').get_object(Bucket=bucket_name, Key=key)
+  snapshot = json.loads(obj['Body'].read().decode('UTF-8'))
+
+  raw = snapshot.get('players_yahoo') or snapshot.get('players')
+  if not raw:
+    print(f"Snapshot {key} has no players")
+    return None
+
+  return archive_player_snapshot(transform_players_to_df(raw), snapshot_date)
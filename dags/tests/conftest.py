@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Dag modules import each other as top level modules, as in the lambda
+# package. Both packages have a util module, so api/tests runs as a
+# separate pytest session
+DAGS_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+sys.path.insert(0, DAGS_DIR)
+sys.path.insert(0, os.path.join(DAGS_DIR, 'bench'))
@@ -0,0 +1,44 @@
+import pandas as pd
+
+import consts
+from all_play import compute_all_play
+
+
+def make_league_data(rows, current_week=1):
+  settings = pd.DataFrame([{
+    'currentWeek': current_week,
+    'scoringType': consts.POINTS_SCORING_TYPES[0],
+    'categoryIds': []
+  }])
+  scoreboard = pd.DataFrame(rows, columns=['week', 'teamId', 'fpts', 'pts'])
+
+  return {'scoreboard': scoreboard, 'settings': settings}
+
+
+def test_full_tie_counts_as_tie():
+  league_data = make_league_data([
+    (1, 1, 100.0, 0.0),
+    (1, 2, 100.0, 0.0),
+    (1, 3, 50.0, 0.0)
+  ])
+
+  all_play = compute_all_play(league_data)
+
+  assert all_play['results'] == [['-TW', 'T-W', 'LL-']]
+  assert all_play['wins'] == [[1, 1, 0]]
+  assert all_play['losses'] == [[0, 0, 2]]
+  assert all_play['ties'] == [[1, 1, 0]]
+
+
+def test_points_break_category_ties():
+  league_data = make_league_data([
+    (1, 1, 100.0, 10.0),
+    (1, 2, 100.0, 5.0),
+    (2, 1, 80.0, 0.0),
+    (2, 2, 90.0, 0.0)
+  ], current_week=2)
+
+  all_play = compute_all_play(league_data)
+
+  assert all_play['results'] == [['-W', 'L-'], ['-L', 'W-']]
+  assert all_play['ties'] == [[0, 0], [0, 0]]
@@ -0,0 +1,41 @@
+import os
+import importlib.util
+
+import util
+
+
+API_COLUMNAR = os.path.join(os.path.dirname(__file__), '..', '..', 'api', 'columnar.py')
+
+
+def load_api_columnar():
+  # Loaded by path, api/ and dags/ are packaged as separate lambdas
+  spec = importlib.util.spec_from_file_location('api_columnar', API_COLUMNAR)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+
+  return module
+
+
+RECORDS = [
+  {'teamId': 1, 'teamName': 'A', 'stats': {'0': 10.0, '1': 5.0}},
+  {'teamId': 2, 'stats': {'1': 3.0, '17': 0.45}},
+  {'teamId': 3, 'teamName': 'C', 'rank': 1}
+]
+
+
+def test_api_decodes_stored_sections():
+  columnar = load_api_columnar()
+
+  assert columnar.decode_columnar(util.records_to_columnar(RECORDS)) == RECORDS
+
+
+def test_encoders_match():
+  columnar = load_api_columnar()
+
+  assert util.records_to_columnar(RECORDS) == columnar.encode_columnar(RECORDS)
+
+
+def test_empty_section():
+  columnar = load_api_columnar()
+
+  assert columnar.decode_columnar(util.records_to_columnar([])) == []
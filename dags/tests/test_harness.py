@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+import requests.adapters
+
+import artifact_store
+
+
+def test_smoke_profile(tmp_path, monkeypatch):
+  psycopg2 = pytest.importorskip('psycopg2')
+  pytest.importorskip('google.oauth2')
+
+  import harness
+
+  monkeypatch.setenv('FANTASY_ARTIFACT_ROOT', str(tmp_path))
+  monkeypatch.setenv('PLAYOFF_SIMULATIONS', '2000')
+
+  connect = psycopg2.connect
+  send = requests.adapters.HTTPAdapter.send
+  try:
+    import boto3
+    boto3_client = boto3.client
+  except ImportError:
+    boto3 = boto3_client = None
+  root = artifact_store.ARTIFACT_ROOT
+
+  with open(os.devnull, 'w') as devnull:
+    report = harness.run_harness('espn', dict(harness.LOAD_PROFILES['smoke']), log_file=devnull)
+
+  assert report['succeeded'] == report['leagues'] == 10
+  assert report['dynamoItems'] == 10
+
+  # Patches of the run are undone
+  assert psycopg2.connect is connect
+  assert requests.adapters.HTTPAdapter.send is send
+  assert sys.modules.get('boto3') is boto3
+  assert boto3 is None or boto3.client is boto3_client
+  assert artifact_store.ARTIFACT_ROOT == root
+  assert os.environ['FANTASY_ARTIFACT_ROOT'] == str(tmp_path)
+  assert sys.modules['upload_to_cloud'].get_authed_session is not requests.Session
@@ -0,0 +1,49 @@
+import pandas as pd
+
+import consts
+from projections import compute_team_projections, strip_component_stats
+
+
+def make_league_data():
+  stats = [
+    {consts.PTS: 20.0, consts.FG_PER: 0.5, consts.FG_MADE: 8.0, consts.FG_ATT: 16.0},
+    {consts.PTS: 10.0, consts.FG_PER: 0.25, consts.FG_MADE: 1.0, consts.FG_ATT: 4.0}
+  ]
+  players = pd.DataFrame({
+    'playerId': [1, 2],
+    'statsSeason': stats,
+    'statsLast7': [None, stats[1]]
+  })
+
+  return {
+    'players': players,
+    'rosters': pd.DataFrame({'teamId': [1, 1], 'playerId': [1, 2]}),
+    'settings': pd.DataFrame([{'categoryIds': [int(consts.PTS), int(consts.FG_PER)]}]),
+    'teams': pd.DataFrame({'teamId': [1]})
+  }
+
+
+def test_projections_use_components():
+  projections = compute_team_projections(make_league_data())
+
+  assert projections['categories'] == [consts.CATEGORY_COLUMNS[consts.PTS], consts.CATEGORY_COLUMNS[consts.FG_PER]]
+  assert projections['periods']['Season'] == [[30.0, 0.45]]
+
+
+def test_strip_component_stats():
+  players = strip_component_stats(make_league_data())
+
+  assert players['statsSeason'].tolist() == [
+    {consts.PTS: 20.0, consts.FG_PER: 0.5},
+    {consts.PTS: 10.0, consts.FG_PER: 0.25}
+  ]
+  assert players['statsLast7'].tolist() == [None, {consts.PTS: 10.0, consts.FG_PER: 0.25}]
+
+
+def test_strip_keeps_scored_components():
+  league_data = make_league_data()
+  league_data['settings'] = pd.DataFrame([{'categoryIds': [int(consts.PTS), int(consts.FG_PER), int(consts.FG_MADE)]}])
+
+  players = strip_component_stats(league_data)
+
+  assert set(players['statsSeason'][0]) == {consts.PTS, consts.FG_PER, consts.FG_MADE}
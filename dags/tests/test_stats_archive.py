@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+import artifact_store
+import stats_archive
+
+
+PLAYERS = pd.DataFrame({
+  'playerId': [1, 2],
+  'playerName': ['A', 'B'],
+  'proTeamId': [1, 2],
+  'percentOwned': [90.5, 10.0],
+  'statsLast7': [{'0': 20.0, '6': 5.0}, {'0': 10.0}],
+  'totalRatingLast7': [3.5, None]
+})
+
+
+@pytest.fixture
+def archive_root(tmp_path, monkeypatch):
+  monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+  monkeypatch.setattr(artifact_store, 'ARTIFACT_ROOT', str(tmp_path))
+
+  return tmp_path
+
+
+def set_pyarrow(monkeypatch, available: bool):
+  if available:
+    pyarrow = pytest.importorskip('pyarrow')
+    monkeypatch.setattr(stats_archive, 'pyarrow', pyarrow)
+  else:
+    monkeypatch.setattr(stats_archive, 'pyarrow', None)
+
+
+@pytest.mark.parametrize('write_pyarrow, read_pyarrow', [
+  (False, False),
+  (True, True),
+  (False, True),
+])
+def test_round_trip(archive_root, monkeypatch, write_pyarrow, read_pyarrow):
+  set_pyarrow(monkeypatch, write_pyarrow)
+  stats_archive.archive_player_snapshot(PLAYERS, '2025-01-01')
+
+  set_pyarrow(monkeypatch, read_pyarrow)
+  df = stats_archive.read_partition('2025-01-01')
+
+  assert df['playerId'].tolist() == ['1', '2']
+  assert df['ptsLast7'].tolist() == [20.0, 10.0]
+  assert df['rebsLast7'].tolist()[0] == 5.0 and pd.isna(df['rebsLast7'].tolist()[1])
+
+
+def test_json_partition_reads_requested_columns(archive_root, monkeypatch):
+  set_pyarrow(monkeypatch, False)
+  stats_archive.archive_player_snapshot(PLAYERS, '2025-01-01')
+
+  df = stats_archive.read_partition('2025-01-01', ['ptsLast7', 'missingLast7'])
+
+  assert df.columns.tolist() == stats_archive.KEY_COLUMNS + ['ptsLast7', 'missingLast7']
+  assert df['missingLast7'].isna().all()
+
+
+def test_parquet_partition_without_pyarrow(archive_root, monkeypatch):
+  path = os.path.join(archive_root, *stats_archive.ARCHIVE_PREFIX, 'date=2025-01-01')
+  os.makedirs(path)
+  with open(os.path.join(path, stats_archive.PARQUET_FILE), 'wb') as f:
+    f.write(b'PAR1')
+
+  set_pyarrow(monkeypatch, False)
+
+  with pytest.raises(ImportError):
+    stats_archive.read_partition('2025-01-01')
+
+
+def test_missing_partition(archive_root):
+  assert stats_archive.read_partition('2025-01-01') is None
+
+
+def test_read_errors_are_raised(archive_root, monkeypatch):
+  def read_bytes_artifact(uri):
+    raise PermissionError(uri)
+
+  monkeypatch.setattr(stats_archive, 'read_bytes_artifact', read_bytes_artifact)
+
+  with pytest.raises(PermissionError):
+    stats_archive.read_partition('2025-01-01')
@@ -0,0 +1,35 @@
+import json
+import argparse
+
+import pytest
+
+import bench_transforms
+
+
+@pytest.mark.parametrize('seasons', [1, 3])
+def test_transform_outputs_match_baseline(seasons):
+  args = argparse.Namespace(
+    fixtures=None, teams=12, weeks=20, players=1000, seasons=seasons, seed=0, repeat=1
+  )
+
+  with open(bench_transforms.DEFAULT_BASELINE) as f:
+    baseline = json.load(f)[bench_transforms.get_fixture_key(args)]
+
+  results = bench_transforms.run_benchmarks(args)
+
+  assert set(results) == set(baseline)
+  assert {name: r['digest'] for name, r in results.items()} == {name: b['digest'] for name, b in baseline.items()}
+
+
+def test_update_baseline_keeps_history():
+  baseline = {'espn.raw.teams': {'digest': 'a', 'history': [{'digest': 'x', 'reason': 'older'}]}}
+  results = {'espn.raw.teams': {'digest': 'b', 'p50Ms': 1.0}, 'espn.raw.draft': {'digest': 'c', 'p50Ms': 1.0}}
+
+  updated = bench_transforms.update_baseline(results, baseline, 'teams changed')
+
+  assert updated['espn.raw.teams']['digest'] == 'b'
+  assert updated['espn.raw.teams']['history'] == [
+    {'digest': 'x', 'reason': 'older'},
+    {'digest': 'a', 'reason': 'teams changed'}
+  ]
+  assert 'history' not in updated['espn.raw.draft']
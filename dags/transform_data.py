@@ -38,4 +38,7 @@ def transform_unrostered_daily(league_data: dict):
   daily_unrostered = daily[~daily['playerId'].isin(rosters["playerId"])]
   top_daily_unrostered = daily_unrostered.head(4)
 
+  # Common daily data carries team ids from the default league
+  top_daily_unrostered = top_daily_unrostered.assign(teamId=0)
+
   return top_daily_unrostered
\ No newline at end of file
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from util import get_component_stat_ids
+
 
 def adjust_player_ratings(league_data: dict):
   players = league_data["players"]
@@ -22,11 +24,15 @@ def adjust_player_ratings(league_data: dict):
   category_ids = settings.iloc[0]["categoryIds"]
   category_ids = [id for id in category_ids if id >= 0]
 
+  # Stats keep percentage components for team aggregation, ratings don't
+  stat_ids = get_component_stat_ids(category_ids)
+
   for col in cols_to_fix:
     if col in players.columns:
       mask = players[col].notnull()
+      ids = stat_ids if col.startswith("stats") else category_ids
 
-      players.loc[mask, col] = players.loc[mask, col].apply(lambda d: {str(k):float(d.get(str(k), 0)) for k in category_ids})
+      players.loc[mask, col] = players.loc[mask, col].apply(lambda d, ids=ids: {str(k):float(d.get(str(k), 0)) for k in ids})
 
   mask = players["statRatingsSeason"].notnull()
   players.loc[mask, "totalRatingSeason"] = players.loc[mask, "statRatingsSeason"].apply(lambda d: sum(d.values()))
@@ -35,15 +41,13 @@ def adjust_player_ratings(league_data: dict):
   return players
 
 
-def truncate_and_map_player_ids(league_data: dict):
+def map_player_ids(league_data: dict):
   players = league_data["players"]
   players_id_map = league_data["players_id_map"]
-  draft = league_data["draft"]
-  rosters = league_data["rosters"]
 
-  if draft.empty or players.empty:
+  if players.empty:
     return pd.DataFrame()
-  
+
   # Map yahoo ids
   players["playerName"] = players["playerName"].str.replace(".", "", regex=False)
   players_id_map["playerName"] = players_id_map["playerName"].str.replace(".", "", regex=False)
@@ -51,6 +55,19 @@ def truncate_and_map_player_ids(league_data: dict):
   players = players.drop("playerId", axis=1)
   players = players.merge(players_id_map, on="playerName", how="inner")
 
+  return players
+
+
+def truncate_and_map_player_ids(league_data: dict):
+  players = league_data["players"]
+  draft = league_data["draft"]
+  rosters = league_data["rosters"]
+
+  if draft.empty or players.empty:
+    return pd.DataFrame()
+  
+  players = map_player_ids(league_data)
+
   # Truncate
   is_owned = players["playerId"].isin(rosters["playerId"])
   is_drafted = players["playerId"].isin(draft["playerId"])
@@ -7,7 +7,8 @@ from util import (
   get_current_espn_league_year,
   calculate_gamescore, 
   format_stat_ratings,
-  format_stats
+  format_stats,
+  get_component_stat_ids
 )
 
 
@@ -243,6 +244,7 @@ def transform_players_to_df(ratings: dict):
         if not category_ids:
           category_ids = list(row['statRatings' + period].keys())
           category_ids.append(consts.MINS)
+          category_ids = get_component_stat_ids(category_ids)
 
       # Stats, dynamic filtering out right dict that matches id field
       if player["player"].get("stats"):
@@ -348,6 +350,11 @@ def transform_settings_to_df(settings: dict):
   scoring_type = data['settings']['scoringSettings']['scoringType']
   row['scoringType'] = scoring_type
 
+  # Playoff format, used by the playoff odds simulation
+  schedule_settings = data['settings'].get('scheduleSettings', {})
+  row['playoffTeams'] = schedule_settings.get('playoffTeamCount', 0)
+  row['regularSeasonWeeks'] = schedule_settings.get('matchupPeriodCount', 0)
+
   # Check if points league, fantasy points will be appended as -1
   if scoring_type == 'H2H_POINTS':
     row['categoryIds'].append(int(consts.FPTS))
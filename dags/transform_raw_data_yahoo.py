@@ -92,6 +92,11 @@ def transform_settings_to_df(data: dict):
     row['currentWeek'] = data.get("current_week", 1)
     row["scoringType"] = data["scoring_type"]
 
+    # Playoff format, used by the playoff odds simulation
+    playoff_start_week = int(data["settings"].get("playoff_start_week") or 0)
+    row["playoffTeams"] = int(data["settings"].get("num_playoff_teams") or 0)
+    row["regularSeasonWeeks"] = playoff_start_week - 1 if playoff_start_week else int(data.get("end_week") or 0)
+
     row["categoryIds"] = [int(consts.MINS)]
 
     for stat in data["settings"]["stat_categories"]["stats"]:
@@ -5,6 +5,8 @@ import boto3
 from decimal import Decimal
 from time import sleep
 
+from instrumentation import timed, record_section_bytes
+
 
 AWS_DDB_URL = 'https://p5v5a0pnfi.execute-api.us-east-1.amazonaws.com/v1/data'
 AWS_SQS_URL = 'https://p5v5a0pnfi.execute-api.us-east-1.amazonaws.com/v1/sqs'
@@ -17,12 +19,19 @@ class DecimalEncoder(json.JSONEncoder):
     return json.JSONEncoder.default(self, obj)
 
 
+@timed('upload')
 def upload_league_data_to_dynamo(data: dict):
   """
   Post process the league data and upload to dynamodb
   """
   headers = {'content-type': 'application/json'}
-  payload = json.dumps(data, cls=DecimalEncoder)
+
+  # Sections serialized one by one to measure them, joined as json.dumps would
+  sections = {key: json.dumps(value, cls=DecimalEncoder) for key, value in data.items()}
+  for key, section in sections.items():
+    record_section_bytes(key, len(section))
+
+  payload = '{' + ', '.join(f'{json.dumps(key)}: {section}' for key, section in sections.items()) + '}'
 
   r = requests.put(AWS_DDB_URL, data=payload, headers=headers)
 
@@ -57,16 +66,16 @@ def upload_league_data_to_dynamo_via_sqs(data: dict):
   return
 
 
-def upload_data_to_s3(data: dict, filename: str, bucket_name: str):
+def upload_data_to_s3(data: dict, filename: str, bucket_name: str, metadata: dict = None):
   """
-  Upload files to S3 bucket
+  Upload files to S3 bucket, with optional object metadata
   """
 
   s3 = boto3.client('s3')
 
   try:
     uploadByteStream = bytes(json.dumps(data).encode('UTF-8'))
-    s3.put_object(Bucket=bucket_name, Key=filename, Body=uploadByteStream)
+    s3.put_object(Bucket=bucket_name, Key=filename, Body=uploadByteStream, Metadata=metadata or {})
     print('Upload successful')
   except:
     print('Upload failed')
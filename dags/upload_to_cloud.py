@@ -1,6 +1,5 @@
 import os
 import json
-import requests
 from google.oauth2 import service_account
 from google.auth.transport.requests import AuthorizedSession
 
@@ -10,33 +9,72 @@ from util import get_current_espn_league_year
 LEAGUE_YEAR = get_current_espn_league_year()
 FIREBASE_URL = f'https://fantasy-cc6ec-default-rtdb.firebaseio.com/v1/{LEAGUE_YEAR}/common'
 
+SCOPES = [
+  "https://www.googleapis.com/auth/userinfo.email",
+  "https://www.googleapis.com/auth/firebase.database"
+]
 
-def upload_to_firebase(type: str, payload: dict):
-  auth_file_path = '/tmp/auth.json'
+# Path under FIREBASE_URL for each upload type
+FIREBASE_PATHS = {
+  'alert': 'messageboard',
+  'scoring_period': '',
+}
+
+authed_session = None
+
+
+def get_authed_session():
+  """
+  Builds the firebase session once per container, the access token is
+  reused and refreshed by the session only when expired
+  """
+  global authed_session
 
-  auth_json = json.loads(os.environ['google_auth_json'])
-  
-  with open(auth_file_path, 'w') as outfile:
-      json.dump(auth_json, outfile)
+  if authed_session is None:
+    auth_json = json.loads(os.environ['google_auth_json'])
+    credentials = service_account.Credentials.from_service_account_info(auth_json, scopes=SCOPES)
+    authed_session = AuthorizedSession(credentials)
 
-  scopes = [
-      "https://www.googleapis.com/auth/userinfo.email",
-      "https://www.googleapis.com/auth/firebase.database"
-  ]
-  credentials = service_account.Credentials.from_service_account_file(
-      auth_file_path, scopes=scopes)
-  authed_session = AuthorizedSession(credentials)
+  return authed_session
 
-  if type == 'alert':
-    url = FIREBASE_URL + '/messageboard.json'
-  elif type == "scoring_period":
-    url = FIREBASE_URL + '.json'
 
-  r = authed_session.patch(url, data=json.dumps(payload))
+def reset_session():
+  """
+  Drops the session in a forked batch worker, it is rebuilt on first use
+  instead of sharing the parent's pooled sockets
+  """
+  global authed_session
+  authed_session = None
+
+
+def patch_firebase(url: str, payload: dict):
+  r = get_authed_session().patch(url, data=json.dumps(payload))
 
   if r.status_code == 200:
     print("Data successfully sent to firebase")
   else:
     print(r.status_code, r.text)
 
-  return
\ No newline at end of file
+  return r.status_code == 200
+
+
+def upload_to_firebase(type: str, payload: dict):
+  path = FIREBASE_PATHS[type]
+  url = FIREBASE_URL + (f'/{path}' if path else '') + '.json'
+
+  return patch_firebase(url, payload)
+
+
+def upload_to_firebase_batch(uploads: list):
+  """
+  Writes several (type, payload) uploads in one multi-path patch, each
+  payload key becomes a path under its type's location
+  """
+  updates = {}
+  for type, payload in uploads:
+    path = FIREBASE_PATHS[type]
+
+    for key, value in payload.items():
+      updates[f'{path}/{key}' if path else key] = value
+
+  return patch_firebase(FIREBASE_URL + '.json', updates)
@@ -1,7 +1,14 @@
+import os
 import json
 import requests
 import unicodedata
 
+import consts
+
+
+# Raw API payloads are saved here as benchmark fixtures when set
+PAYLOAD_RECORD_DIR = os.environ.get('PAYLOAD_RECORD_DIR')
+
 
 def invoke_lambda(client, function_name, payload):
   if not isinstance(payload, str):
@@ -42,6 +49,132 @@ def get_default_league_info():
   return league_info
 
 
+def record_payload(platform: str, name: str, data, league_id: str, league_year: str = None):
+  """
+  Saves a raw API payload for offline transform benchmarks, only when
+  PAYLOAD_RECORD_DIR is set. Each league (and season, when given) gets its
+  own directory so leagues processed by one container don't overwrite
+  each other
+  """
+  if not PAYLOAD_RECORD_DIR:
+    return
+
+  league_dir = str(league_id) if league_year is None else f"{league_id}_{league_year}"
+  record_dir = os.path.join(PAYLOAD_RECORD_DIR, league_dir)
+
+  os.makedirs(record_dir, exist_ok=True)
+  with open(os.path.join(record_dir, f"{platform}_{name}.json"), 'w') as f:
+    json.dump(data, f)
+
+
+def update_leagues_last_updated(conn, league_ids: list):
+  """
+  Marks all successfully processed leagues as updated in one statement
+  """
+  if not league_ids:
+    return 0
+
+  cursor = conn.cursor()
+  cursor.execute(
+    """
+    UPDATE public.leagueids
+    SET lastUpdated = NOW()
+    WHERE leagueid = ANY(%s)
+    """,
+    (list(league_ids),)
+  )
+  conn.commit()
+
+  return cursor.rowcount
+
+
+def df_to_records(df):
+  """
+  Serializes a dataframe to a list of dicts, dropping nan values
+  """
+  dict_raw = df.to_dict(orient='records')
+  dict_clean = [{k:v for k, v in x.items() if v == v } for x in dict_raw]
+
+  return dict_clean
+
+
+def records_to_columnar(records: list):
+  """
+  Encodes records as a column header plus value arrays, dict valued stat
+  columns share one list of category ids per column. Must stay in sync with
+  api/columnar.py encode_columnar, which converts sections on read
+  """
+  columns = []
+  maps = {}
+
+  for row in records:
+    for col, val in row.items():
+      if col not in columns:
+        columns.append(col)
+
+      if isinstance(val, dict):
+        keys = maps.setdefault(col, [])
+        keys.extend([k for k in val.keys() if k not in keys])
+
+  values = []
+  for col in columns:
+    keys = maps.get(col)
+
+    if keys is None:
+      values.append([row.get(col) for row in records])
+    else:
+      values.append([
+        [row[col].get(k) for k in keys] if isinstance(row.get(col), dict) else None
+        for row in records
+      ])
+
+  return {
+    'format': 'columnar',
+    'length': len(records),
+    'columns': columns,
+    'values': values,
+    'maps': maps
+  }
+
+
+def df_to_section(df, section_format: str = 'records'):
+  """
+  Serializes a dataframe section as records or columnar arrays
+  """
+  records = df_to_records(df)
+
+  if section_format == 'columnar':
+    return records_to_columnar(records)
+  return records
+
+
+def get_category_columns(settings):
+  """
+  Scoreboard columns and inverse flags for the league's scoring categories
+  """
+  category_ids = [str(id) for id in settings.iloc[0]["categoryIds"]]
+
+  columns = [consts.CATEGORY_COLUMNS[id] for id in category_ids if id in consts.CATEGORY_COLUMNS]
+  inverse = [id in consts.INVERSE_CATEGORIES for id in category_ids if id in consts.CATEGORY_COLUMNS]
+
+  return columns, inverse
+
+
+def get_component_stat_ids(category_ids: list):
+  """
+  Category ids with the made and attempted ids of percentage categories, so
+  player stats can be aggregated into team percentages
+  """
+  stat_ids = [str(id) for id in category_ids]
+
+  for id in list(stat_ids):
+    for component in consts.PERCENT_COMPONENTS.get(id, ()):
+      if component not in stat_ids:
+        stat_ids.append(component)
+
+  return stat_ids
+
+
 def calculate_gamescore(player):
   """
   Calculates fantasy gamescore, differing from the real gamescore by omitting
@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+import consts
+from util import get_category_columns
+from instrumentation import timed
+
+
+# Probabilities are bounded like the client's previous simulation
+MIN_PROBABILITY = 0.01
+MAX_PROBABILITY = 0.99
+
+
+def erf(x):
+  """
+  Vectorized error function (Abramowitz and Stegun 7.1.26, max error 1.5e-7)
+  """
+  sign = np.sign(x)
+  x = np.abs(x)
+
+  t = 1.0 / (1.0 + 0.3275911 * x)
+  poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+
+  return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def get_category_win_probabilities(means: np.ndarray, stds: np.ndarray, inverse: np.ndarray):
+  """
+  Normal approximation of P(team i beats team j) per category for all pairs,
+  from per team weekly means and standard deviations of shape (teams, cats)
+  """
+  mean_diff = means[:, None, :] - means[None, :, :]
+  std_sum = np.sqrt(stds[:, None, :] ** 2 + stds[None, :, :] ** 2)
+
+  with np.errstate(divide='ignore', invalid='ignore'):
+    z = mean_diff / std_sum
+    probs = 0.5 * (1 + erf(z / np.sqrt(2)))
+
+  # Degenerate spreads decided by the means alone
+  no_spread = std_sum == 0
+  probs = np.where(no_spread, 0.5 + 0.5 * np.sign(mean_diff), probs)
+  probs = np.clip(probs, MIN_PROBABILITY, MAX_PROBABILITY)
+
+  probs = np.where(inverse[None, None, :], 1 - probs, probs)
+
+  # Teams without history are a coin flip
+  no_data = np.isnan(mean_diff)
+  probs = np.where(no_data, 0.5, probs)
+
+  return probs
+
+
+def get_win_count_distribution(probs: np.ndarray):
+  """
+  Poisson binomial distribution of categories won, computed with a dynamic
+  program over the last axis. Returns shape (..., cats + 1)
+  """
+  num_cats = probs.shape[-1]
+
+  dist = np.zeros(probs.shape[:-1] + (num_cats + 1,))
+  dist[..., 0] = 1.0
+
+  for c in range(num_cats):
+    p = probs[..., c:c + 1]
+    dist[..., 1:] = dist[..., 1:] * (1 - p) + dist[..., :-1] * p
+    dist[..., 0:1] = dist[..., 0:1] * (1 - p)
+
+  return dist
+
+
+def get_matchup_win_probabilities(cat_probs: np.ndarray, pts_probs: np.ndarray, pts_index: int = None):
+  """
+  Exact probability of winning the matchup from independent category win
+  probabilities, ties in categories won are broken by points
+  """
+  num_cats = cat_probs.shape[-1]
+  dist = get_win_count_distribution(cat_probs)
+
+  majority = num_cats // 2 + 1
+  win_probs = dist[..., majority:].sum(axis=-1)
+
+  if num_cats % 2 == 0:
+    half = num_cats // 2
+
+    if pts_index is None:
+      win_probs = win_probs + dist[..., half] * pts_probs
+    else:
+      # Tie with points won, the other categories split one short of even
+      others = np.delete(cat_probs, pts_index, axis=-1)
+      others_dist = get_win_count_distribution(others)
+      win_probs = win_probs + pts_probs * others_dist[..., half - 1]
+
+  return np.clip(win_probs, MIN_PROBABILITY, MAX_PROBABILITY)
+
+
+def get_team_distributions(league_data: dict):
+  """
+  Per team weekly means and standard deviations of each scored category and
+  points, from results in weeks before the current one. Points leagues are
+  treated as a single fantasy points category
+  """
+  scoreboard = league_data["scoreboard"]
+  settings = league_data["settings"]
+  teams = league_data["teams"]
+
+  if scoreboard.empty or settings.empty or teams.empty:
+    return None
+
+  current_week = int(settings.iloc[0]["currentWeek"])
+
+  if settings.iloc[0].get("scoringType") in consts.POINTS_SCORING_TYPES:
+    columns, inverse = ['fpts'], [False]
+  else:
+    columns, inverse = get_category_columns(settings)
+
+  columns_present = [c for c in columns if c in scoreboard.columns]
+
+  if not columns_present:
+    return None
+
+  inverse = np.array([inv for c, inv in zip(columns, inverse) if c in columns_present], dtype=bool)
+  team_ids = sorted(teams["teamId"].tolist())
+
+  stat_columns = columns_present + (['pts'] if 'pts' not in columns_present and 'pts' in scoreboard.columns else [])
+  history = scoreboard[scoreboard["week"] < current_week]
+  history = history[["teamId"] + stat_columns].apply(pd.to_numeric, errors='coerce')
+  history["teamId"] = history["teamId"].astype(int)
+
+  grouped = history.groupby("teamId")[stat_columns]
+
+  return {
+    'currentWeek': current_week,
+    'teamIds': team_ids,
+    'categories': columns_present,
+    'inverse': inverse,
+    'means': grouped.mean().reindex(team_ids),
+    'stds': grouped.std(ddof=1).reindex(team_ids).fillna(0)
+  }
+
+
+def get_pair_probabilities(league_data: dict):
+  """
+  Category and matchup win probabilities for all team pairs
+  """
+  dists = get_team_distributions(league_data)
+
+  if dists is None:
+    return None
+
+  columns_present = dists['categories']
+  means, stds = dists['means'], dists['stds']
+  team_ids = dists['teamIds']
+
+  cat_probs = get_category_win_probabilities(
+    means[columns_present].to_numpy(dtype=float),
+    stds[columns_present].to_numpy(dtype=float),
+    dists['inverse']
+  )
+
+  pts_index = columns_present.index('pts') if 'pts' in columns_present else None
+  if pts_index is not None:
+    pts_probs = cat_probs[..., pts_index]
+  elif 'pts' in means.columns:
+    pts_probs = get_category_win_probabilities(
+      means[['pts']].to_numpy(dtype=float),
+      stds[['pts']].to_numpy(dtype=float),
+      np.array([False])
+    )[..., 0]
+  else:
+    pts_probs = np.full((len(team_ids), len(team_ids)), 0.5)
+
+  matchup_probs = get_matchup_win_probabilities(cat_probs, pts_probs, pts_index)
+
+  return {
+    'currentWeek': dists['currentWeek'],
+    'teamIds': team_ids,
+    'categories': columns_present,
+    'category': cat_probs,
+    'matchup': matchup_probs
+  }
+
+
+@timed('analytics.winProbabilities')
+def compute_win_probabilities(league_data: dict):
+  """
+  Category and matchup win probabilities for all team pairs in the current
+  week, from each team's category results in previous weeks
+  """
+  settings = league_data["settings"]
+
+  if settings.empty or settings.iloc[0].get("scoringType") in consts.POINTS_SCORING_TYPES:
+    return {}
+
+  pairs = get_pair_probabilities(league_data)
+
+  if pairs is None:
+    return {}
+
+  scoreboard = league_data["scoreboard"]
+  current_week = pairs['currentWeek']
+  team_ids = pairs['teamIds']
+  columns_present = pairs['categories']
+  cat_probs = pairs['category']
+  matchup_probs = pairs['matchup']
+
+  # Current week matchups, indexed into the pair matrices
+  index = {team_id: i for i, team_id in enumerate(team_ids)}
+  current = scoreboard[scoreboard["week"] == current_week]
+
+  matchups = []
+  for row in current[["teamId", "awayId"]].itertuples(index=False):
+    if row.teamId in index and row.awayId in index:
+      i, j = index[row.teamId], index[row.awayId]
+
+      matchups.append({
+        'teamId': int(row.teamId),
+        'awayId': int(row.awayId),
+        'winProb': round(float(matchup_probs[i, j]), 4),
+        'catWinProbs': {c: round(float(p), 4) for c, p in zip(columns_present, cat_probs[i, j])}
+      })
+
+  return {
+    'week': current_week,
+    'teamIds': [int(t) for t in team_ids],
+    'categories': columns_present,
+    'matchup': np.round(matchup_probs, 4).tolist(),
+    'category': np.round(cat_probs, 4).tolist(),
+    'matchups': matchups
+  }